@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from store import DATA_DIR
+
+# ----------------------------------------------------------------------
+# '대체' AI 제안 캐시 (메모리 LRU + SQLite)
+# ----------------------------------------------------------------------
+# 반려 후 재작업, 같은 데이터셋에 대한 반복 요청 등으로 같은 (모델, 대상 모델명, 삭제 데이터)
+# 조합이 Gemini 에 다시 전송되는 경우가 많아, 입력의 해시를 키로 생성 결과를 재사용합니다.
+# 자주 쓰는 항목은 메모리에, 전체는 디스크에 두어 앱을 재시작해도 유지됩니다.
+
+CACHE_PATH = os.path.join(DATA_DIR, "ai_cache.db")
+
+# 캐시 항목 유효 기간 (초, 기본 7일)
+DEFAULT_TTL_SECONDS = int(os.environ.get("R2BF_AI_CACHE_TTL", str(7 * 24 * 3600)))
+
+# 메모리에 유지할 최대 항목 수
+DEFAULT_CAPACITY = 512
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ai_cache (
+    key        TEXT PRIMARY KEY,
+    value      TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+def cache_key(model_id, prompt_version, *inputs):
+    """모델 ID, 프롬프트 버전, 입력값으로 만든 내용 주소 키 (sha256)"""
+    payload = json.dumps([model_id, prompt_version, *inputs], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReplacementCache:
+    """
+    생성 결과 캐시. 메모리 LRU 를 먼저 보고, 없으면 디스크에서 찾아 메모리에 올립니다.
+    두 계층 모두 ttl_seconds 가 지난 항목은 없는 것으로 취급합니다.
+    """
+
+    def __init__(self, path=CACHE_PATH, capacity=DEFAULT_CAPACITY, ttl_seconds=DEFAULT_TTL_SECONDS):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (value, created_at)
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        # 디스크 항목 수 (화면 표시용, 매번 COUNT(*) 하지 않도록 put / purge_expired 에서 갱신)
+        self._count = self._conn.execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _expired(self, created_at):
+        return time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key, value, created_at):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """캐시된 결과 (없거나 만료되었으면 None)"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._conn.execute("SELECT value, created_at FROM ai_cache WHERE key = ?", (key,)).fetchone()
+                entry = tuple(row) if row else None
+            if entry is None or self._expired(entry[1]):
+                self._memory.pop(key, None)
+                self.misses += 1
+                return None
+            self._remember(key, *entry)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        with self._lock:
+            created_at = time.time()
+            if self._conn.execute("SELECT 1 FROM ai_cache WHERE key = ?", (key,)).fetchone() is None:
+                self._count += 1
+            self._conn.execute("INSERT OR REPLACE INTO ai_cache (key, value, created_at) VALUES (?, ?, ?)",
+                               (key, value, created_at))
+            self._remember(key, value, created_at)
+
+    def purge_expired(self):
+        """디스크에서 만료된 항목을 지웁니다. 지운 건수를 반환."""
+        with self._lock:
+            cutoff = time.time() - self.ttl_seconds
+            for key in [k for k, (_, created_at) in self._memory.items() if created_at < cutoff]:
+                del self._memory[key]
+            deleted = self._conn.execute("DELETE FROM ai_cache WHERE created_at < ?", (cutoff,)).rowcount
+            self._count = max(0, self._count - deleted)
+            return deleted
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
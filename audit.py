@@ -0,0 +1,459 @@
+import argparse
+import bisect
+import datetime
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from models import to_micros
+
+# ----------------------------------------------------------------------
+# 처리 로그 무결성 (해시 체인 + Merkle 트리)
+# ----------------------------------------------------------------------
+# 인증서는 규제 기관에 '잊힘'이 실제로 처리되었음을 보이는 증빙이므로, 로그를 고치면 드러나야 합니다.
+#   - 로그 한 건의 해시 = SHA-256(직전 로그 해시 + 로그 내용). 저장소가 기록 시점에 cert_log.hash 로 남깁니다.
+#   - 인증서 해시 = 인증서 내용 + 로그 해시들의 Merkle 루트. 저장소가 바뀔 때마다 certificates.hash 로 남깁니다.
+#     (인증서 내용만 고쳐도 다시 계산한 해시가 기록 시점의 해시와 어긋남)
+#   - 전역 루트 = 발행 순 (created_at, cert_id) 으로 늘어놓은 인증서 해시들의 Merkle 루트.
+# 인증서 하나(또는 로그 한 건)는 전역 루트까지 O(log n) 개의 형제 해시(증명)로 확인할 수 있습니다.
+# 저장소 파일을 통째로 고쳐 해시까지 다시 계산하는 경우에 대비해, 전역 루트를 주기적으로
+# 외부에 공개(publish)해 두면 그 시점의 상태를 나중에 대조할 수 있습니다. verify 는 같은 저널 lsn 에서
+# 공개된 최근 루트가 있으면 다시 계산한 루트와 대조합니다.
+#
+# 사용법:
+#     python audit.py verify --workers 4        # 저장소 전체 검증 (읽기 트랜잭션, 서버 실행 중 가능)
+#     python audit.py root --publish            # 전역 루트 계산 + audit_roots.jsonl 에 기록
+#     python audit.py proof CERT-... --seq 2    # 인증서(로그 한 건) 포함 증명 JSON
+
+ROOTS_PATH = os.path.join(os.environ.get("R2BF_DATA_DIR", "r2bf_data"), "audit_roots.jsonl")
+
+DEFAULT_WORKERS = max(1, min(4, os.cpu_count() or 1))
+DEFAULT_CHUNK_SIZE = 1000
+
+# 각 인증서의 첫 로그가 잇는 '직전 해시'
+GENESIS = hashlib.sha256(b"R2BF-AUDIT-1").hexdigest()
+EMPTY_ROOT = hashlib.sha256(b"").hexdigest()
+
+# RFC 6962 와 같이 잎 / 내부 노드 해시를 구분해 두 종류를 바꿔치기할 수 없게 함
+_LEAF = b"\x00"
+_NODE = b"\x01"
+
+
+def _raw(hex_hash):
+    # 저장된 해시가 변조되어 hex 가 아니어도 검증이 멈추지 않도록 (다른 값이 되어 불일치로 드러남)
+    try:
+        return bytes.fromhex(hex_hash)
+    except (TypeError, ValueError):
+        return str(hex_hash).encode("utf-8")
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def entry_hash(prev_hash, cert_id, seq, timestamp, status, actor, message, reason):
+    """로그 한 건의 체인 해시 (hex). timestamp 는 ISO 문자열 또는 마이크로초 (표기가 달라도 같은 시각이면 같은 해시)"""
+    if isinstance(timestamp, str):
+        timestamp = to_micros(timestamp)
+    payload = _dumps([cert_id, seq, timestamp, getattr(status, "value", status), actor, message, reason])
+    return hashlib.sha256(_raw(prev_hash) + payload).hexdigest()
+
+
+def chain(cert_id, log):
+    """LogEntry 목록 전체의 체인 해시 목록"""
+    hashes, prev = [], GENESIS
+    for seq, entry in enumerate(log):
+        prev = entry_hash(prev, cert_id, seq, entry.timestamp, entry.status, entry.actor, entry.message, entry.reason)
+        hashes.append(prev)
+    return hashes
+
+
+def content_hash(cert_id, requester_id, model_name, deleted_data, replacement_data, completion_date, log_root):
+    """인증서 내용 + 로그 Merkle 루트의 해시 (전역 트리의 잎 값)"""
+    return hashlib.sha256(_dumps([cert_id, requester_id, model_name, deleted_data, replacement_data, completion_date,
+                                  log_root])).hexdigest()
+
+
+def certificate_hash(cert, log_root):
+    return content_hash(cert.cert_id, cert.requester_id, cert.model_name, cert.deleted_data, cert.replacement_data,
+                        cert.completion_date, log_root)
+
+
+# ----------------------------------------------------------------------
+# Merkle 트리
+# ----------------------------------------------------------------------
+# 짝이 없는 마지막 노드는 그대로 윗단으로 올리므로 증명에는 실제 형제 노드만 들어갑니다.
+# 증명은 [("L" 또는 "R", 형제 해시 hex), ...] (아래에서 위로, L: 형제가 왼쪽).
+
+def _leaf(hex_hash):
+    return hashlib.sha256(_LEAF + _raw(hex_hash)).digest()
+
+
+def _node(left, right):
+    return hashlib.sha256(_NODE + left + right).digest()
+
+
+class MerkleTree:
+    """단계별 노드 목록을 모두 들고 있는 Merkle 트리. 잎 추가 / 교체는 O(log n)"""
+
+    def __init__(self, hashes=()):
+        self._build([_leaf(h) for h in hashes])
+
+    def _build(self, leaves):
+        self._levels = [leaves]
+        while len(self._levels[-1]) > 1:
+            nodes = self._levels[-1]
+            self._levels.append([_node(nodes[i], nodes[i + 1]) if i + 1 < len(nodes) else nodes[i]
+                                 for i in range(0, len(nodes), 2)])
+
+    def __len__(self):
+        return len(self._levels[0])
+
+    def root(self):
+        return self._levels[-1][0].hex() if self._levels[0] else EMPTY_ROOT
+
+    def append(self, hex_hash):
+        self._levels[0].append(_leaf(hex_hash))
+        self._update_path(len(self._levels[0]) - 1)
+
+    def insert(self, index, hex_hash):
+        """중간에 끼워 넣기 (뒤쪽 잎의 위치가 모두 밀리므로 O(n))"""
+        leaves = self._levels[0]
+        leaves.insert(index, _leaf(hex_hash))
+        self._build(leaves)
+
+    def update(self, index, hex_hash):
+        self._levels[0][index] = _leaf(hex_hash)
+        self._update_path(index)
+
+    def _update_path(self, index):
+        level = 0
+        while len(self._levels[level]) > 1:
+            nodes = self._levels[level]
+            left = index & ~1
+            parent = _node(nodes[left], nodes[left + 1]) if left + 1 < len(nodes) else nodes[left]
+            if level + 1 == len(self._levels):
+                self._levels.append([])
+            upper = self._levels[level + 1]
+            index //= 2
+            if index < len(upper):
+                upper[index] = parent
+            else:
+                upper.append(parent)
+            level += 1
+
+    def proof(self, index):
+        path = []
+        for nodes in self._levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(nodes):
+                path.append(("L" if sibling < index else "R", nodes[sibling].hex()))
+            index //= 2
+        return path
+
+
+def merkle_root(hashes):
+    # 인증서 하나의 로그처럼 작은 트리를 자주 만들므로 MerkleTree 없이 루트만 계산
+    if not hashes:
+        return EMPTY_ROOT
+    sha256 = hashlib.sha256
+    nodes = [sha256(_LEAF + _raw(h)).digest() for h in hashes]
+    while len(nodes) > 1:
+        nodes = [sha256(_NODE + nodes[i] + nodes[i + 1]).digest() if i + 1 < len(nodes) else nodes[i]
+                 for i in range(0, len(nodes), 2)]
+    return nodes[0].hex()
+
+
+def verify_proof(hex_hash, proof, root):
+    """잎 해시 + 증명으로 계산한 루트가 root 와 같은지 (O(log n))"""
+    node = _leaf(hex_hash)
+    for side, sibling in proof:
+        node = _node(bytes.fromhex(sibling), node) if side == "L" else _node(node, bytes.fromhex(sibling))
+    return node.hex() == root
+
+
+# ----------------------------------------------------------------------
+# 인증서 검증
+# ----------------------------------------------------------------------
+
+def verify_record(cert, hashes):
+    """
+    로그를 다시 해시해 저장된 해시와 대조 -> (처음 어긋난 로그 순번 또는 None, 다시 계산한 인증서 해시).
+    로그 내용이나 해시 어느 쪽을 고쳐도 고친 순번부터 어긋납니다.
+    """
+    computed = chain(cert.cert_id, cert.log)
+    bad_seq = next((seq for seq, (a, b) in enumerate(zip(computed, hashes)) if a != b), None)
+    if bad_seq is None and len(computed) != len(hashes):
+        bad_seq = min(len(computed), len(hashes))
+    return bad_seq, certificate_hash(cert, merkle_root(computed))
+
+
+def verify_chunk(records):
+    """작업 프로세스용: [(cert_id, 어긋난 순번, 인증서 내용 일치 여부, 인증서 해시)]"""
+    results = []
+    for record in records:
+        bad_seq, cert_hash = verify_record(record.cert, record.hashes)
+        results.append((record.cert.cert_id, bad_seq, cert_hash == record.cert_hash, cert_hash))
+    return results
+
+
+# 인증서 한 건의 검증 결과. ok 는 로그 체인, 인증서 내용(기록 시점 해시), 전역 루트 포함 증명이 모두 맞을 때 True
+Verification = namedtuple("Verification", "ok bad_seq content_ok log_root cert_hash proof root")
+
+
+class AuditIndex:
+    """
+    저장소 전체의 전역 Merkle 트리 (증분 갱신, 스레드 안전).
+    잎은 저장소가 기록 시점에 남긴 인증서 해시이며, verify() 는 로그와 인증서 내용을 다시 해시해 그 잎과 대조합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._keys = []  # 발행 순 (created_at, cert_id)
+        self._position = {}  # cert_id -> 잎 위치
+        self._tree = MerkleTree()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def root(self):
+        with self._lock:
+            return self._tree.root()
+
+    def rebuild(self, records):
+        keys, hashes = [], []
+        for record in records:
+            keys.append((record.created_at, record.cert.cert_id))
+            hashes.append(record.cert_hash)
+        tree = MerkleTree(hashes)
+        with self._lock:
+            self._keys = keys
+            self._position = {cert_id: i for i, (_, cert_id) in enumerate(keys)}
+            self._tree = tree
+
+    def add(self, record):
+        cert_id, cert_hash = record.cert.cert_id, record.cert_hash
+        with self._lock:
+            index = self._position.get(cert_id)
+            if index is not None:
+                self._tree.update(index, cert_hash)
+                return
+            key = (record.created_at, cert_id)
+            if not self._keys or key > self._keys[-1]:
+                self._position[cert_id] = len(self._keys)
+                self._keys.append(key)
+                self._tree.append(cert_hash)
+                return
+            # 발행 순 중간에 끼어드는 경우 (드묾): 뒤쪽 위치가 모두 밀리므로 트리를 다시 만듦
+            index = bisect.bisect_left(self._keys, key)
+            self._keys.insert(index, key)
+            self._tree.insert(index, cert_hash)
+            for i in range(index, len(self._keys)):
+                self._position[self._keys[i][1]] = i
+
+    def proof(self, cert_id):
+        """(전역 포함 증명, 전역 루트). 없는 인증서면 (None, 루트)"""
+        with self._lock:
+            index = self._position.get(cert_id)
+            return (None if index is None else self._tree.proof(index)), self._tree.root()
+
+    def verify(self, record):
+        bad_seq, cert_hash = verify_record(record.cert, record.hashes)
+        content_ok = cert_hash == record.cert_hash
+        proof, root = self.proof(record.cert.cert_id)
+        ok = bad_seq is None and content_ok and proof is not None and verify_proof(cert_hash, proof, root)
+        return Verification(ok, bad_seq, content_ok, merkle_root(record.hashes), cert_hash, proof, root)
+
+    def verify_many(self, store, cert_ids):
+        """{cert_id: Verification} (목록 화면 한 페이지 분량을 한 번의 조회로)"""
+        return {record.cert.cert_id: self.verify(record) for record in store.audit_records(cert_ids)}
+
+
+# ----------------------------------------------------------------------
+# 저장소 전체 검증 (다중 프로세스) / 전역 루트 공개
+# ----------------------------------------------------------------------
+
+def _chunks(records, chunk_size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def verify_store(records, workers=DEFAULT_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    발행 순 레코드(store.iter_audit())를 chunk_size 건씩 작업 프로세스에 나누어 검증
+    -> (검증 건수, 실패 [(cert_id, 어긋난 로그 순번 또는 None: 인증서 내용 불일치)], 다시 계산한 전역 루트).
+    작업 프로세스마다 두 묶음까지만 미리 넘기므로 메모리는 저장소 크기가 아닌 묶음 크기에 비례합니다.
+    """
+    cert_hashes, failures = [], []
+
+    def collect(results):
+        for cert_id, bad_seq, content_ok, cert_hash in results:
+            cert_hashes.append(cert_hash)
+            if bad_seq is not None or not content_ok:
+                failures.append((cert_id, bad_seq))
+
+    if workers <= 1:
+        for chunk in _chunks(records, chunk_size):
+            collect(verify_chunk(chunk))
+    else:
+        # Streamlit 서버 안에서 불려도 안전하도록 fork 대신 spawn
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pending = deque()
+            for chunk in _chunks(records, chunk_size):
+                pending.append(pool.submit(verify_chunk, chunk))
+                if len(pending) >= workers * 2:
+                    collect(pending.popleft().result())
+            while pending:
+                collect(pending.popleft().result())
+    return len(cert_hashes), failures, merkle_root(cert_hashes)
+
+
+def publish_root(root, count, lsn, path=ROOTS_PATH):
+    """전역 루트를 공개 기록 파일(한 줄에 JSON 하나)에 덧붙임. 이 파일(또는 그 사본)을 외부에 보관합니다."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    entry = {"published_at": datetime.datetime.now().isoformat(), "lsn": lsn, "certificates": count, "root": root}
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    return entry
+
+
+def published_root(lsn, path=ROOTS_PATH):
+    """lsn 시점에 공개된 가장 최근 기록 (없으면 None)"""
+    latest = None
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("lsn") == lsn:
+                    latest = entry
+    return latest
+
+
+def certificate_proof(store, cert_id, seq=None):
+    """
+    인증서(seq 를 주면 로그 한 건)의 포함 증명. 저장소 밖에서도 verify_bundle() 로 확인할 수 있도록
+    잎 값을 다시 계산하는 데 필요한 내용을 함께 담습니다. (전역 트리를 만들기 위해 저장소 전체를 한 번 읽음)
+    """
+    index = AuditIndex()
+    index.rebuild(store.iter_audit(with_logs=False))
+    records = store.audit_records([cert_id])
+    if not records:
+        raise KeyError(cert_id)
+    record = records[0]
+    cert = record.cert
+    proof, root = index.proof(cert_id)
+    bundle = {
+        "cert_id": cert_id,
+        "certificate": [cert.cert_id, cert.requester_id, cert.model_name, cert.deleted_data,
+                        cert.replacement_data, cert.completion_date],
+        "log_root": merkle_root(record.hashes),
+        "proof": proof,
+        "root": root,
+    }
+    if seq is not None:
+        entry = cert.log[seq]
+        bundle["entry"] = {
+            "seq": seq, "timestamp": entry.timestamp, "status": entry.status.value, "actor": entry.actor,
+            "message": entry.message, "reason": entry.reason,
+            "prev_hash": record.hashes[seq - 1] if seq > 0 else GENESIS,
+            "proof": MerkleTree(record.hashes).proof(seq),
+        }
+    return bundle
+
+
+def verify_bundle(bundle):
+    """certificate_proof() 결과 확인 (저장소 없이, O(log n))"""
+    fields = bundle["certificate"]
+    log_root = bundle["log_root"]
+    entry = bundle.get("entry")
+    if entry is not None:
+        leaf = entry_hash(entry["prev_hash"], fields[0], entry["seq"], entry["timestamp"], entry["status"],
+                          entry["actor"], entry["message"], entry["reason"])
+        if not verify_proof(leaf, entry["proof"], log_root):
+            return False
+    cert_hash = hashlib.sha256(_dumps([*fields, log_root])).hexdigest()
+    return verify_proof(cert_hash, bundle["proof"], bundle["root"])
+
+
+def main():
+    from store import CertificateStore, DB_PATH
+
+    parser = argparse.ArgumentParser(description="R2BF 처리 로그 무결성 검증")
+    commands = parser.add_subparsers(dest="command", required=True)
+    verify_parser = commands.add_parser("verify", help="저장소 전체의 로그 해시 체인 검증")
+    verify_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    verify_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    root_parser = commands.add_parser("root", help="전역 Merkle 루트 계산")
+    root_parser.add_argument("--publish", action="store_true", help=f"{ROOTS_PATH} 에 기록")
+    proof_parser = commands.add_parser("proof", help="인증서 (또는 로그 한 건) 포함 증명 JSON")
+    proof_parser.add_argument("cert_id")
+    proof_parser.add_argument("--seq", type=int, help="로그 순번 (0 부터)")
+    args = parser.parse_args()
+
+    store = CertificateStore(DB_PATH)
+    try:
+        if args.command == "verify":
+            started = time.perf_counter()
+            lsn, records = store.audit_snapshot(args.chunk_size)
+            count, failures, root = verify_store(records, args.workers, args.chunk_size)
+            elapsed = time.perf_counter() - started
+            for cert_id, seq in failures:
+                if seq is None:
+                    print(f"{cert_id}\t인증서 내용이 기록 시점의 해시와 불일치")
+                else:
+                    print(f"{cert_id}\t로그 {seq}번부터 해시 불일치")
+            print(f"인증서 {count}건 검증, 불일치 {len(failures)}건, 전역 루트 {root} "
+                  f"({elapsed:.2f}초, {count / elapsed if elapsed else 0:.0f}건/초)", file=sys.stderr)
+            # 같은 lsn 에서 공개한 루트와 다르면 저장소가 해시까지 통째로 고쳐진 것
+            published = published_root(lsn)
+            if published is None:
+                print(f"lsn={lsn} 시점에 공개된 루트가 없어 대조하지 않았습니다.", file=sys.stderr)
+            elif published["root"] != root:
+                print(f"공개된 루트와 불일치 (lsn={lsn}, {published['published_at']} 공개: {published['root']})")
+                return 1
+            else:
+                print(f"공개된 루트와 일치 (lsn={lsn}, {published['published_at']} 공개)", file=sys.stderr)
+            return 1 if failures else 0
+        if args.command == "root":
+            lsn, records = store.audit_snapshot(with_logs=False)
+            index = AuditIndex()
+            index.rebuild(records)
+            if args.publish:
+                print(json.dumps(publish_root(index.root(), len(index), lsn), ensure_ascii=False))
+            else:
+                print(index.root())
+            return 0
+        try:
+            bundle = certificate_proof(store, args.cert_id, args.seq)
+        except (KeyError, IndexError):
+            print(f"인증서 또는 로그를 찾을 수 없습니다: {args.cert_id} {args.seq if args.seq is not None else ''}",
+                  file=sys.stderr)
+            return 1
+        print(json.dumps(bundle, ensure_ascii=False, indent=2))
+        return 0
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
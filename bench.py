@@ -0,0 +1,774 @@
+"""
+R2BF 대시보드 성능 측정 스크립트
+
+사용 예:
+    python bench.py store --sizes 10000 100000
+    python bench.py search --sizes 100000
+    python bench.py journal --sizes 10000 50000
+    python bench.py memory --sizes 10000 100000
+    python bench.py audit --sizes 10000 100000 --workers 4
+    python bench.py gemini --calls 200 --error-rate 0.2 --slow-rate 0.05
+    python bench.py app --sizes 1000 10000 100000 --sessions 4
+    python bench.py compare bench_results/app-<이전>.json bench_results/app-<현재>.json
+"""
+import argparse
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import audit
+import gemini
+from fake_gemini import FakeGeminiServer
+from journal import Compactor, Journal
+from models import Certificate
+from search import SearchIndex
+from store import PAGE_SIZE, CertificateStore
+
+# 실제 운영과 비슷하게 대부분은 완료 상태이고, 각 큐에는 인증서 수와 무관하게 소수만 남아 있음
+OPEN_STATUSES = [
+    "Pending_Forget",
+    "Pending_Forget_Approval",
+    "Pending_Substitute",
+    "Pending_Substitute_Review_MLOps",
+    "Pending_Substitute_Approval",
+]
+REQUESTERS = ["김감사 (AI 윤리팀)", "이감사 (AI 윤리팀)", "최감사 (준법감시팀)"]
+MODELS = ["신용평가 AI 모델", "채용 추천 AI 모델", "보험 심사 AI 모델", "대출 한도 AI 모델"]
+
+
+def make_synthetic_cert(i, status, base_time=None):
+    """벤치마크용 가상 인증서 (기존 dict 형태, 저장소에는 Certificate.from_dict 로 변환해 넣음)"""
+    base_time = base_time or datetime.datetime(2025, 1, 1)
+    created = (base_time + datetime.timedelta(seconds=i)).isoformat()
+    requester = REQUESTERS[i % len(REQUESTERS)]
+    log = [{"timestamp": created, "status": "Pending_Forget", "actor": requester, "message": "신규 '잊힘' 요청 발행"}]
+    if status != "Pending_Forget":
+        log.append({"timestamp": created, "status": status, "actor": "R2BF 부서", "message": "벤치마크 상태 전이"})
+    return {
+        "cert_id": f"CERT-BENCH-{i:08d}",
+        "requester_id": requester,
+        "operator_id": "박엔진 (MLOps팀)" if status != "Pending_Forget" else None,
+        "approver_id": "R2BF 부서" if status == "Completed" else None,
+        "completion_date": created if status == "Completed" else None,
+        "content": {
+            "model_name": MODELS[i % len(MODELS)],
+            "deleted_data": f"구(舊) 주소 데이터셋 #{i} (편향성 원인)",
+            "replacement_data": "신용 평가는 거주지가 아닌, 개인의 신용 기록을 기반으로 합니다." if status == "Completed" else None
+        },
+        "log": log,
+        "current_status": status,
+        "internal_ai_suggestion": None
+    }
+
+
+def synthetic_certs(n, open_per_status=50):
+    """n 개 중 상태별 open_per_status 개만 큐에 남기고 나머지는 완료 상태로 생성"""
+    open_total = min(n, open_per_status * len(OPEN_STATUSES))
+    stride = max(1, n // max(1, open_total))
+    for i in range(n):
+        slot, offset = divmod(i, stride)
+        if offset == 0 and slot < open_total:
+            status = OPEN_STATUSES[slot % len(OPEN_STATUSES)]
+        else:
+            status = "Completed"
+        yield make_synthetic_cert(i, status)
+
+
+def timed(fn, repeat=5):
+    """repeat 회 실행 중 가장 빠른 시간(ms)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+# ----------------------------------------------------------------------
+# store: session_state dict 스캔 vs SQLite 인덱스 조회
+# ----------------------------------------------------------------------
+
+def rerun_queues_dict(db):
+    """기존 main.py 의 큐 구성 방식 (매 재실행마다 전체 dict 스캔)"""
+    pending_forget = {k: v for k, v in db.items() if v["current_status"] == "Pending_Forget"}
+    combined = {k: v for k, v in db.items()
+                if v["current_status"] in ["Pending_Substitute", "Pending_Substitute_Review_MLOps"]}
+    sorted(combined.items(), key=lambda item: item[1]['log'][0]['timestamp'], reverse=True)
+    forget_approval = {k: v for k, v in db.items() if v["current_status"] == "Pending_Forget_Approval"}
+    sub_approval = {k: v for k, v in db.items() if v["current_status"] == "Pending_Substitute_Approval"}
+    return pending_forget, combined, forget_approval, sub_approval
+
+
+def rerun_queues_store(store):
+    """저장소 인덱스를 사용한 큐 구성 방식"""
+    return (store.by_status("Pending_Forget"),
+            store.by_status("Pending_Substitute", "Pending_Substitute_Review_MLOps"),
+            store.by_status("Pending_Forget_Approval"),
+            store.by_status("Pending_Substitute_Approval"))
+
+
+def browse_page_store(store, before):
+    """'인증서 조회' 탭 한 페이지 (keyset 커서, 헤더 컬럼만)"""
+    return store.page(before=before, with_logs=False)
+
+
+def bench_store(sizes):
+    print(f"{'N':>8} | {'dict 큐 스캔(ms)':>16} | {'SQLite 큐 조회(ms)':>18} | {'조회 탭 페이지(ms)':>18} | {'적재(s)':>8}")
+    for n in sizes:
+        db = {cert["cert_id"]: cert for cert in synthetic_certs(n)}
+        with tempfile.TemporaryDirectory() as tmp:
+            store = CertificateStore(os.path.join(tmp, "bench.db"))
+            start = time.perf_counter()
+            with store.transaction():
+                for cert in db.values():
+                    store.insert(Certificate.from_dict(cert))
+            load_s = time.perf_counter() - start
+
+            dict_ms = timed(lambda: rerun_queues_dict(db))
+            store_ms = timed(lambda: rerun_queues_store(store))
+            # 목록 중간쯤의 페이지 (OFFSET 방식이라면 앞 페이지를 모두 건너뛰어야 하는 위치)
+            middle = make_synthetic_cert(n // 2, "Completed")
+            page_ms = timed(lambda: browse_page_store(store, (middle["log"][0]["timestamp"], middle["cert_id"])))
+            store.close()
+        print(f"{n:>8} | {dict_ms:>16.2f} | {store_ms:>18.2f} | {page_ms:>18.2f} | {load_s:>8.2f}")
+
+
+# ----------------------------------------------------------------------
+# search: 전체 스캔 부분 일치 vs n-gram 역색인
+# ----------------------------------------------------------------------
+
+SEARCH_QUERIES = [
+    ("인증서 ID", "CERT-BENCH-00012345", False),
+    ("모델명", "채용 추천", False),
+    ("삭제 데이터", "데이터셋 4242", False),
+    ("한 글자", "채", False),
+    ("로그 메시지", "잊힘 요청", False),
+    ("퍼지(오타)", "신용펑가 모델", True),
+]
+
+
+def search_scan(certs, term):
+    """기존 main.py 의 검색 방식 (매 재실행마다 전체 인증서 부분 일치)"""
+    term = term.lower()
+    return [cert for cert in certs
+            if (term in cert["cert_id"].lower() or term in cert["requester_id"].lower() or
+                (cert["operator_id"] and term in cert["operator_id"].lower()) or
+                (cert["approver_id"] and term in cert["approver_id"].lower()) or
+                term in cert["content"]["deleted_data"].lower())]
+
+
+def bench_search(sizes):
+    for n in sizes:
+        certs = list(synthetic_certs(n))
+        typed = [Certificate.from_dict(cert) for cert in certs]
+        index = SearchIndex()
+        start = time.perf_counter()
+        index.rebuild(typed)
+        build_s = time.perf_counter() - start
+        print(f"N={n}  색인 구축 {build_s:.2f}s")
+        print(f"  {'검색어':<24} | {'결과':>5} | {'전체 스캔(ms)':>13} | {'역색인(ms)':>10}")
+        for label, query, fuzzy in SEARCH_QUERIES:
+            scan_ms = timed(lambda: search_scan(certs, query), repeat=3)
+            index_ms = timed(lambda: index.search(query, fuzzy=fuzzy), repeat=3)
+            hits = len(index.search(query, fuzzy=fuzzy))
+            print(f"  {label + ': ' + query:<24} | {hits:>5} | {scan_ms:>13.2f} | {index_ms:>10.2f}")
+
+
+# ----------------------------------------------------------------------
+# journal: 저널 기록 / 재생 처리량, 스냅숏 유무에 따른 복구 시간
+# ----------------------------------------------------------------------
+
+def _remove_db(path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def _timed_recover(db_path, journal_dir):
+    """저장소를 새로 열어 recover() 하는 데 걸린 시간(s)과 재생한 레코드 수"""
+    journal = Journal(journal_dir)
+    start = time.perf_counter()
+    store = CertificateStore(db_path, journal=journal)
+    replayed = store.recover()
+    elapsed = time.perf_counter() - start
+    return store, journal, elapsed, replayed
+
+
+def bench_journal(sizes, tail=1000):
+    print(f"{'N':>7} | {'레코드':>7} | {'기록(s)':>7} | {'전체 재생(s)':>11} | {'재생(건/s)':>10} | "
+          f"{'스냅숏(s)':>9} | {'스냅숏+꼬리 복구(s)':>17} | {'일반 재시작(s)':>13}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path, journal_dir = os.path.join(tmp, "bench.db"), os.path.join(tmp, "journal")
+
+            # 인증서마다 발행 + 상태 전이 2회 = 트랜잭션(레코드) 3개
+            journal = Journal(journal_dir)
+            store = CertificateStore(db_path, journal=journal)
+            start = time.perf_counter()
+            for cert in synthetic_certs(n):
+                cert = Certificate.from_dict(dict(cert, current_status="Pending_Forget", log=cert["log"][:1]))
+                store.insert(cert)
+                store.transition(cert.cert_id, "Pending_Forget", "Forgetting_In_Progress", "벤치마크")
+                store.transition(cert.cert_id, "Forgetting_In_Progress", "Pending_Forget_Approval", "벤치마크",
+                                 "'잊힘' 수행 완료")
+            write_s = time.perf_counter() - start
+            records = journal.last_lsn
+            store.close()
+            journal.close()
+
+            # DB 유실 -> 스냅숏 없이 저널 전체 재생
+            _remove_db(db_path)
+            store, journal, replay_s, _ = _timed_recover(db_path, journal_dir)
+
+            # 스냅숏 + 세그먼트 정리 후 꼬리 레코드 추가
+            start = time.perf_counter()
+            Compactor(store, journal).run_once()
+            snapshot_s = time.perf_counter() - start
+            for i in range(tail):
+                store.append_log(f"CERT-BENCH-{i % n:08d}", "2025-01-01T00:00:00", "Pending_Forget_Approval",
+                                 "벤치마크", "꼬리 레코드")
+            store.close()
+            journal.close()
+
+            # DB 유실 -> 스냅숏 + 꼬리만 재생
+            _remove_db(db_path)
+            store, journal, snapshot_recover_s, _ = _timed_recover(db_path, journal_dir)
+            store.close()
+            journal.close()
+
+            # 정상 재시작 (재생할 레코드 없음)
+            store, journal, restart_s, _ = _timed_recover(db_path, journal_dir)
+            store.close()
+            journal.close()
+        print(f"{n:>7} | {records:>7} | {write_s:>7.2f} | {replay_s:>11.2f} | {records / replay_s:>10.0f} | "
+              f"{snapshot_s:>9.2f} | {snapshot_recover_s:>17.2f} | {restart_s:>13.3f}")
+
+
+# ----------------------------------------------------------------------
+# memory: 인증서 dict vs Certificate / LogEntry (__slots__) 메모리 사용량
+# ----------------------------------------------------------------------
+
+# 완료된 인증서의 전체 처리 이력 (반려 1회 포함)
+LIFECYCLE = [
+    ("Forgetting_In_Progress", "박엔진 (MLOps팀)", "'잊힘' 작업 시작", None),
+    ("Pending_Forget_Approval", "박엔진 (MLOps팀)", "'잊힘' 수행 완료. R2BF '잊힘' 승인 대기", None),
+    ("Pending_Substitute", "R2BF 부서", "'잊힘' 승인. MLOps '대체' 작업 대기", None),
+    ("Pending_Substitute_Review_MLOps", "박엔진 (MLOps팀)", "AI '대체' 제안 생성 완료. 검토 대기", None),
+    ("Pending_Substitute_Approval", "박엔진 (MLOps팀)", "'대체' 수행 완료. R2BF '대체' 승인 대기", None),
+    ("Pending_Substitute_Review_MLOps", "R2BF 부서", "'대체' 거부. MLOps 재작업 요청.", "표현이 편향적임"),
+    ("Pending_Substitute_Approval", "박엔진 (MLOps팀)", "'대체' 수행 완료. R2BF '대체' 승인 대기", None),
+    ("Completed", "R2BF 부서", "'대체' 최종 승인. 인증서 발급 완료", None),
+]
+
+
+def _lifecycle_cert(i):
+    cert = make_synthetic_cert(i, "Completed")
+    created = datetime.datetime.fromisoformat(cert["log"][0]["timestamp"])
+    cert["log"] = cert["log"][:1] + [
+        {"timestamp": (created + datetime.timedelta(minutes=step + 1)).isoformat(), "status": status,
+         "actor": actor, "message": message, **({"reason": reason} if reason else {})}
+        for step, (status, actor, message, reason) in enumerate(LIFECYCLE)]
+    return cert
+
+
+def _traced(build):
+    """build() 가 만든 객체들이 계속 차지하는 메모리 (bytes)"""
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objects, current
+
+
+def bench_memory(sizes):
+    print(f"{'N':>8} | {'dict(MB)':>9} | {'Certificate(MB)':>15} | {'건당 dict(B)':>12} | {'건당 Certificate(B)':>19} | {'절감':>6}")
+    for n in sizes:
+        # DB 에서 읽은 것처럼 인증서마다 별도의 문자열 객체를 갖도록 JSON 에서 다시 만듦
+        lines = [json.dumps(_lifecycle_cert(i), ensure_ascii=False) for i in range(n)]
+        dicts, dict_bytes = _traced(lambda: [json.loads(line) for line in lines])
+        del dicts
+        typed, typed_bytes = _traced(lambda: [Certificate.from_dict(json.loads(line)) for line in lines])
+        del typed
+        print(f"{n:>8} | {dict_bytes / 2**20:>9.1f} | {typed_bytes / 2**20:>15.1f} | {dict_bytes / n:>12.0f} | "
+              f"{typed_bytes / n:>19.0f} | {1 - typed_bytes / dict_bytes:>6.0%}")
+
+
+# ----------------------------------------------------------------------
+# audit: 처리 로그 해시 체인 / Merkle 검증
+# ----------------------------------------------------------------------
+
+def bench_audit(sizes, workers):
+    print(f"{'N':>8} | {'전역 트리(s)':>11} | {'1건 검증(ms)':>12} | {'페이지 검증(ms)':>14} | {'증명 길이':>8} | "
+          f"{'전체 1프로세스(s)':>16} | {f'전체 {workers}프로세스(s)':>16} | {'건/s':>7}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = CertificateStore(os.path.join(tmp, "bench.db"))
+            with store.transaction():
+                for i in range(n):
+                    store.insert(Certificate.from_dict(_lifecycle_cert(i)))
+
+            start = time.perf_counter()
+            index = audit.AuditIndex()
+            index.rebuild(store.iter_audit(with_logs=False))
+            tree_s = time.perf_counter() - start
+
+            one_id = [f"CERT-BENCH-{n // 2:08d}"]
+            page_ids = [f"CERT-BENCH-{i:08d}" for i in range(n - PAGE_SIZE, n)]
+            one_ms = timed(lambda: index.verify_many(store, one_id))
+            page_ms = timed(lambda: index.verify_many(store, page_ids))
+            proof_length = len(index.verify_many(store, one_id)[one_id[0]].proof)
+
+            start = time.perf_counter()
+            count, failures, root = audit.verify_store(store.iter_audit(), workers=1)
+            single_s = time.perf_counter() - start
+            start = time.perf_counter()
+            audit.verify_store(store.iter_audit(), workers=workers)
+            parallel_s = time.perf_counter() - start
+            store.close()
+        assert not failures and root == index.root()
+        print(f"{n:>8} | {tree_s:>11.2f} | {one_ms:>12.2f} | {page_ms:>14.2f} | {proof_length:>8} | "
+              f"{single_s:>16.2f} | {parallel_s:>16.2f} | {count / parallel_s:>7.0f}")
+
+
+# ----------------------------------------------------------------------
+# gemini: 호출 복원력 (가짜 서버에 지연 / 오류 주입)
+# ----------------------------------------------------------------------
+# fake_gemini.FakeGeminiServer 에 실제 SDK(REST)로 호출해 재시도 / 헤지 유무별 성공률과 지연 분포를 비교하고,
+# 오류만 돌려주는 서버에서 회로 차단기가 열려 호출을 멈추는지 확인합니다.
+
+def bench_gemini(calls, concurrency, error_rate, slow_rate, latency, slow_latency, deadline):
+    import google.generativeai as genai
+
+    def make_model(url):
+        model = genai.GenerativeModel("gemini-2.0-flash")
+        model._client = gemini._service_client("bench", url)
+        return model
+
+    def run(caller, model):
+        def one(_):
+            started = time.perf_counter()
+            try:
+                caller.call("bench", lambda timeout: model.generate_content(
+                    "bench", request_options=gemini.request_options(timeout)).text)
+                return True, time.perf_counter() - started
+            except gemini.GeminiCallError:
+                return False, time.perf_counter() - started
+
+        # 헤지 기준(p95)이 잡히도록 먼저 몇 번 호출
+        for _ in range(gemini.HEDGE_MIN_SAMPLES):
+            one(None)
+        caller.reset_stats()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one, range(calls)))
+        ordered = sorted(seconds for _, seconds in results)
+        q = lambda p: ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+        return sum(ok for ok, _ in results) / calls, q(0.5), q(0.95), q(0.99), caller.stats
+
+    print(f"호출 {calls}회, 동시 {concurrency}, 오류 {error_rate:.0%} (429/500/503), "
+          f"꼬리 지연 {slow_rate:.0%} ({slow_latency:g}초), 기본 지연 {latency:g}초, 마감 {deadline:g}초")
+    print(f"{'방식':<14} | {'성공률':>6} | {'p50(s)':>7} | {'p95(s)':>7} | {'p99(s)':>7} | {'시도':>5} | {'재시도':>5} | "
+          f"{'헤지':>5} | {'헤지 승':>6}")
+    scenarios = (
+        ("재시도 없음", dict(max_attempts=1, hedge=False)),
+        ("재시도", dict(hedge=False)),
+        ("재시도 + 헤지", dict(hedge=True)),
+    )
+    for name, options in scenarios:
+        with FakeGeminiServer(latency=latency, error_rate=error_rate, slow_rate=slow_rate, slow_latency=slow_latency,
+                              seed=7) as server:
+            caller = gemini.GeminiCaller(deadline=deadline, failure_threshold=10 ** 9, **options)
+            success, p50, p95, p99, stats = run(caller, make_model(server.url))
+        print(f"{name:<14} | {success:>6.1%} | {p50:>7.3f} | {p95:>7.3f} | {p99:>7.3f} | {stats['attempts']:>5} | "
+              f"{stats['retries']:>5} | {stats['hedges']:>5} | {stats['hedge_wins']:>6}")
+
+    # 회로 차단기: 계속 503 이면 FAILURE_THRESHOLD 회 실패 뒤 서버에 요청하지 않고 바로 실패해야 함
+    with FakeGeminiServer(latency=latency, error_rate=1.0, error_codes=(503,)) as server:
+        caller = gemini.GeminiCaller(deadline=deadline, backoff_base=0.01, hedge=False)
+        model = make_model(server.url)
+        kinds = []
+        for _ in range(5):
+            try:
+                caller.call("bench", lambda timeout: model.generate_content(
+                    "bench", request_options=gemini.request_options(timeout)).text)
+            except gemini.GeminiCallError as e:
+                kinds.append(e.kind)
+        requests_sent = server.stats["requests"]
+    assert kinds[-1] == "circuit_open" and requests_sent == gemini.FAILURE_THRESHOLD, (kinds, requests_sent)
+    print(f"회로 차단기: 503 만 받는 서버에 5회 호출 -> {', '.join(kinds)} "
+          f"(서버 요청 {requests_sent}회, 상태 {caller.breaker_states()['bench']})")
+
+
+# ----------------------------------------------------------------------
+# app: AppTest 로 실제 화면 스크립트를 실행해 재실행 시간 / 콜백 지연 / 메모리 측정
+# ----------------------------------------------------------------------
+# 인증서 수마다 별도 프로세스(임시 R2BF_DATA_DIR)에서 실행하므로 모듈 전역 상태와 메모리가 섞이지 않습니다.
+# Gemini 대신 StubModel 을 쓰고, '잊힘'은 기본 시뮬레이션 작업을 짧게 설정해 사용합니다.
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+APP_TIMEOUT = 600
+RESULTS_DIR = "bench_results"
+BENCH_MODEL_NAME = "벤치마크 대상 모델"
+BENCH_DATASET = "벤치마크 삭제 데이터셋 (편향성 원인)"
+
+# 인증서 하나의 expander 키 접두어 (워크플로우 단계마다 모두 펼쳐 둠)
+EXPANDER_PREFIXES = ("exp_forget_", "exp_sub_", "exp_review_", "exp_forget_approval_", "exp_substitute_approval_")
+
+
+class StubModel:
+    """
+    Gemini GenerativeModel 대역. latency 초 뒤 정해진 문장을 돌려주며,
+    generate_content 의 stream=True 와 candidate_count 를 흉내 냅니다.
+    """
+
+    model_name = "models/stub"
+    TEXTS = (
+        "모든 신청자는 동일한 기준으로 평가됩니다.",
+        "신용 평가는 개인의 신용 기록을 기반으로 합니다.",
+        "평가 기준은 공정성 원칙에 따라 주기적으로 검토됩니다.",
+    )
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+
+    def generate_content(self, prompt, generation_config=None, stream=False, **kwargs):
+        time.sleep(self.latency)
+        count = getattr(generation_config, "candidate_count", None)
+        if stream:
+            return (SimpleNamespace(text=word + " ") for word in self.TEXTS[0].split())
+        if count:
+            texts = [self.TEXTS[i % len(self.TEXTS)] for i in range(count)]
+            return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[SimpleNamespace(text=text)]))
+                                               for text in texts])
+        return SimpleNamespace(text=self.TEXTS[0])
+
+
+def _check(at):
+    if at.exception:
+        raise RuntimeError(f"앱 실행 중 예외: {at.exception[0].message}")
+
+
+def _rss_mb():
+    """현재 RSS (MB, /proc 이 없으면 None)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def _summary(samples):
+    ordered = sorted(samples)
+    return {"median": statistics.median(ordered), "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "min": ordered[0], "max": ordered[-1]}
+
+
+def _wait_status(store, cert_id, status, timeout=60):
+    """백그라운드 작업(잊힘, 대체 생성)이 끝나 인증서가 status 가 될 때까지 걸린 시간(s)"""
+    start = time.perf_counter()
+    while store.get(cert_id).current_status != status:
+        if time.perf_counter() - start > timeout:
+            raise TimeoutError(f"[{cert_id}] {timeout}초 안에 {status} 상태가 되지 않았습니다.")
+        time.sleep(0.02)
+    return time.perf_counter() - start
+
+
+def _drive_workflow(at, store):
+    """
+    요청 발행 -> 잊힘 -> 잊힘 승인 -> 대체 생성 -> 검토 전송 -> 대체 거부 -> 재탐색 -> 재전송 -> 최종 승인.
+    단계별 (버튼 클릭 ~ 재실행 완료) 시간과 백그라운드 작업 완료까지의 시간을 돌려줍니다.
+    """
+    callbacks, completions = {}, {}
+
+    def click(step, key, cert_id=None, inputs=None):
+        if cert_id is not None:
+            for prefix in EXPANDER_PREFIXES:
+                at.session_state[prefix + cert_id] = True
+            at.run()
+            _check(at)
+        for input_key, value in (inputs or {}).items():
+            at.text_input(key=input_key).input(value)
+        start = time.perf_counter()
+        at.button(key=key).click().run()
+        callbacks[step] = time.perf_counter() - start
+        _check(at)
+
+    at.text_input(key="req_model_name").input(BENCH_MODEL_NAME)
+    at.text_area(key="req_dataset").input(BENCH_DATASET)
+    click("submit", next(button.key for button in at.button if button.key.startswith("FormSubmitter:request_form")))
+    cert_id = store.by_model(BENCH_MODEL_NAME)[0].cert_id
+
+    click("run_forget", f"run_forget_{cert_id}", cert_id)
+    completions["forget"] = _wait_status(store, cert_id, "Pending_Forget_Approval")
+    click("approve_forget", f"approve_forget_{cert_id}", cert_id)
+    click("run_substitute", f"run_sub_{cert_id}", cert_id)
+    completions["substitute"] = _wait_status(store, cert_id, "Pending_Substitute_Review_MLOps")
+    click("send_to_r2bf", f"send_to_r2bf_{cert_id}", cert_id)
+    click("reject_substitute", f"reject_sub_{cert_id}", cert_id, {f"reject_reason_sub_{cert_id}": "벤치마크 거부"})
+    click("regenerate", f"regen_mlops_{cert_id}", cert_id)
+    if store.get(cert_id).current_status != "Pending_Substitute_Review_MLOps":
+        # 후보 풀이 비어 있어 새로 생성한 경우
+        completions["regenerate"] = _wait_status(store, cert_id, "Pending_Substitute_Review_MLOps")
+    click("resend_to_r2bf", f"send_to_r2bf_{cert_id}", cert_id)
+    click("approve_substitute", f"approve_sub_{cert_id}", cert_id)
+    if store.get(cert_id).current_status != "Completed":
+        raise RuntimeError(f"[{cert_id}] 워크플로우가 완료되지 않았습니다: {store.get(cert_id).current_status}")
+    return callbacks, completions
+
+
+def _concurrent_reruns(sessions, reruns):
+    """sessions 개의 세션이 동시에 reruns 회씩 재실행할 때의 재실행 시간(s) 목록"""
+    from streamlit.testing.v1 import AppTest
+
+    apps = [AppTest.from_file(APP_PATH, default_timeout=APP_TIMEOUT) for _ in range(sessions)]
+    for at in apps:
+        at.run()
+        _check(at)
+    samples, errors = [], []
+    barrier = threading.Barrier(sessions)
+
+    def session(at):
+        try:
+            barrier.wait()
+            for _ in range(reruns):
+                start = time.perf_counter()
+                at.run()
+                samples.append(time.perf_counter() - start)
+                _check(at)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=session, args=(at,)) for at in apps]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return samples
+
+
+def _app_worker(n, reruns, sessions, out_path):
+    """[측정 프로세스] 임시 데이터 디렉터리(R2BF_DATA_DIR)에 n 건을 적재하고 앱을 측정해 JSON 으로 저장"""
+    from streamlit.testing.v1 import AppTest
+    from store import DB_PATH
+
+    store = CertificateStore(DB_PATH)
+    start = time.perf_counter()
+    with store.transaction():
+        for cert in synthetic_certs(n):
+            store.insert(Certificate.from_dict(cert))
+    seed_s = time.perf_counter() - start
+
+    at = AppTest.from_file(APP_PATH, default_timeout=APP_TIMEOUT)
+    start = time.perf_counter()
+    at.run()
+    startup_s = time.perf_counter() - start
+    _check(at)
+    rss_after_start = _rss_mb()
+
+    at.session_state["api_model"] = StubModel()
+    at.session_state["stream_ai"] = False
+    at.run()
+    _check(at)
+    rerun_samples, tab_samples = [], {}
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        rerun_samples.append(time.perf_counter() - start)
+        _check(at)
+        for tab, seconds in at.session_state["render_timings"].items():
+            tab_samples.setdefault(tab, []).append(seconds)
+
+    callbacks, completions = _drive_workflow(at, store)
+    concurrent = _concurrent_reruns(sessions, reruns) if sessions > 1 else None
+    store.close()
+
+    result = {
+        "certs": n,
+        "seed_s": seed_s,
+        "startup_s": startup_s,
+        "rerun_s": _summary(rerun_samples),
+        "tab_render_s": {tab: statistics.median(samples) for tab, samples in sorted(tab_samples.items())},
+        "callback_s": callbacks,
+        "background_s": completions,
+        "concurrent": None if concurrent is None else {"sessions": sessions, "rerun_s": _summary(concurrent)},
+        "rss_mb_after_start": rss_after_start,
+        "rss_mb": _rss_mb(),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False)
+    # 남아 있는 작업 프로세스 / 백그라운드 스레드를 기다리지 않고 종료
+    os._exit(0)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(APP_PATH)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_app(sizes, reruns, sessions, out=None):
+    import streamlit
+
+    print(f"{'N':>7} | {'적재(s)':>7} | {'첫 실행(s)':>9} | {'재실행 중앙값(ms)':>15} | {'p95(ms)':>8} | "
+          f"{'탭별 중앙값(ms) tab1/2/3/4':>26} | {'콜백 합(ms)':>10} | {'동시 p95(ms)':>11} | {'최대 RSS(MB)':>11}")
+    results = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, R2BF_DATA_DIR=tmp)
+            env.setdefault("R2BF_FORGET_BATCH_WINDOW", "0.1")
+            env.setdefault("R2BF_SIMULATED_UNLEARNING_SECONDS", "0.2")
+            result_path = os.path.join(tmp, "result.json")
+            subprocess.run([sys.executable, os.path.abspath(__file__), "app", "--worker", str(n),
+                            "--reruns", str(reruns), "--sessions", str(sessions), "--out", result_path],
+                           env=env, check=True)
+            with open(result_path, encoding="utf-8") as f:
+                result = json.load(f)
+        results.append(result)
+        tabs = "/".join(f"{result['tab_render_s'].get(f'tab{i}', 0) * 1000:.0f}" for i in range(1, 5))
+        concurrent = result["concurrent"]
+        concurrent_p95 = f"{concurrent['rerun_s']['p95'] * 1000:.0f}" if concurrent else "-"
+        print(f"{n:>7} | {result['seed_s']:>7.2f} | {result['startup_s']:>9.2f} | "
+              f"{result['rerun_s']['median'] * 1000:>15.0f} | {result['rerun_s']['p95'] * 1000:>8.0f} | {tabs:>26} | "
+              f"{sum(result['callback_s'].values()) * 1000:>10.0f} | {concurrent_p95:>11} | {result['peak_rss_mb']:>11.0f}")
+
+    commit = _git_commit()
+    report = {
+        "benchmark": "app",
+        "commit": commit,
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "reruns": reruns,
+        "sessions": sessions,
+        "results": results,
+    }
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"app-{commit or 'unknown'}-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {out}")
+
+
+def _flatten(value, prefix=""):
+    """중첩된 결과를 {'rerun_s.median': 0.12, ...} 형태의 숫자 항목으로 펼침"""
+    if isinstance(value, dict):
+        items = {}
+        for key, child in value.items():
+            items.update(_flatten(child, f"{prefix}.{key}" if prefix else key))
+        return items
+    return {prefix: value} if isinstance(value, (int, float)) and not isinstance(value, bool) else {}
+
+
+def compare_results(base_path, new_path):
+    """두 app 벤치마크 결과 파일을 인증서 수별로 비교 (변화율 + 는 느려짐 / 늘어남)"""
+    with open(base_path, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"기준: {base.get('commit')} ({base.get('created_at')})  비교: {new.get('commit')} ({new.get('created_at')})")
+    base_by_n = {result["certs"]: result for result in base["results"]}
+    for result in new["results"]:
+        n = result["certs"]
+        if n not in base_by_n:
+            continue
+        print(f"N={n}")
+        old_items, new_items = _flatten(base_by_n[n]), _flatten(result)
+        for name in sorted(set(old_items) & set(new_items)):
+            if name == "certs":
+                continue
+            old, current = old_items[name], new_items[name]
+            change = f"{(current - old) / old:+.0%}" if old else "-"
+            print(f"  {name:<40} {old:>12.4f} -> {current:>12.4f}  {change:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="R2BF 대시보드 성능 측정")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_store = sub.add_parser("store", help="큐 조회: session_state dict 스캔 vs SQLite 인덱스")
+    p_store.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+
+    p_search = sub.add_parser("search", help="인증서 검색: 전체 스캔 vs n-gram 역색인")
+    p_search.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+
+    p_journal = sub.add_parser("journal", help="저널 기록 / 재생 처리량, 스냅숏 복구 시간")
+    p_journal.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000])
+
+    p_memory = sub.add_parser("memory", help="인증서 메모리: dict vs Certificate (__slots__)")
+    p_memory.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+
+    p_audit = sub.add_parser("audit", help="처리 로그 해시 체인 / Merkle 검증: 1건, 페이지, 저장소 전체 (다중 프로세스)")
+    p_audit.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    p_audit.add_argument("--workers", type=int, default=audit.DEFAULT_WORKERS)
+
+    p_gemini = sub.add_parser("gemini", help="Gemini 호출 복원력: 재시도 / 헤지 / 회로 차단기 (가짜 서버에 지연·오류 주입)")
+    p_gemini.add_argument("--calls", type=int, default=200)
+    p_gemini.add_argument("--concurrency", type=int, default=8)
+    p_gemini.add_argument("--error-rate", type=float, default=0.2)
+    p_gemini.add_argument("--slow-rate", type=float, default=0.05)
+    p_gemini.add_argument("--latency", type=float, default=0.1, help="기본 응답 지연 (초)")
+    p_gemini.add_argument("--slow-latency", type=float, default=2.0, help="꼬리 지연 (초)")
+    p_gemini.add_argument("--deadline", type=float, default=10.0, help="호출 마감 시간 (초)")
+
+    p_app = sub.add_parser("app", help="화면 스크립트 재실행 / 콜백 워크플로우 / 메모리 (AppTest, 결과 JSON 저장)")
+    p_app.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    p_app.add_argument("--reruns", type=int, default=10, help="재실행 시간 측정 횟수")
+    p_app.add_argument("--sessions", type=int, default=1, help="동시에 재실행하는 세션 수 (2 이상이면 동시 측정)")
+    p_app.add_argument("--out", help=f"결과 파일 (기본: {RESULTS_DIR}/app-<커밋>-<시각>.json)")
+    p_app.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+
+    p_compare = sub.add_parser("compare", help="두 app 결과 파일 비교")
+    p_compare.add_argument("base")
+    p_compare.add_argument("new")
+
+    args = parser.parse_args()
+    if args.command == "store":
+        bench_store(args.sizes)
+    elif args.command == "search":
+        bench_search(args.sizes)
+    elif args.command == "journal":
+        bench_journal(args.sizes)
+    elif args.command == "memory":
+        bench_memory(args.sizes)
+    elif args.command == "audit":
+        bench_audit(args.sizes, args.workers)
+    elif args.command == "gemini":
+        bench_gemini(args.calls, args.concurrency, args.error_rate, args.slow_rate, args.latency, args.slow_latency,
+                     args.deadline)
+    elif args.command == "app":
+        if args.worker is not None:
+            _app_worker(args.worker, args.reruns, args.sessions, args.out)
+        else:
+            bench_app(args.sizes, args.reruns, args.sessions, args.out)
+    elif args.command == "compare":
+        compare_results(args.base, args.new)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+import argparse
+import codecs
+import csv
+import datetime
+import io
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+from models import Certificate, LogEntry, Status, new_cert_id, to_micros
+from store import DATA_DIR
+
+# ----------------------------------------------------------------------
+# '잊힘' 요청 일괄 가져오기 (CSV / JSONL)
+# ----------------------------------------------------------------------
+# 감사 결과 파일을 한 줄씩 읽어 검증하고, batch_size 건씩 한 트랜잭션으로 인증서를 발행합니다.
+# 파일 전체를 메모리에 올리지 않으며, 중복 검사도 배치 단위로 저장소 인덱스를 조회합니다.
+# 가져오지 못한 행은 (행 번호, 사유, 원본) 을 오류 파일(JSONL)에 한 줄씩 남깁니다.
+#
+# 사용법 (Streamlit 서버가 꺼져 있을 때. 저널은 한 프로세스만 씁니다):
+#     python bulk_import.py findings.csv
+#     python bulk_import.py findings.jsonl --errors findings.errors.jsonl --batch-size 1000
+
+# 한 트랜잭션으로 발행할 행 수
+DEFAULT_BATCH_SIZE = 500
+
+# 필드 하나의 최대 길이 (문자)
+MAX_FIELD_LENGTH = 10_000
+
+DEFAULT_REQUESTER = "김감사 (AI 윤리팀)"
+
+# 오류 파일 저장 위치 (화면에서 가져온 경우)
+IMPORT_DIR = os.path.join(DATA_DIR, "imports")
+
+# 열 이름 (CSV 머리글 / JSONL 키). 앞의 이름부터 찾습니다.
+FIELD_NAMES = {
+    "model_name": ("model_name", "model", "AI 모델명"),
+    "deleted_data": ("deleted_data", "dataset", "삭제 요청 데이터셋"),
+    "requester_id": ("requester_id", "requester", "요청자"),
+}
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+# 파일 앞부분이 UTF-8 로 읽히지 않으면 CP949 로 읽습니다. (한글 Excel 에서 저장한 CSV 의 기본 인코딩)
+ENCODINGS = ("utf-8-sig", "cp949")
+SNIFF_BYTES = 64 * 1024
+
+
+class ImportFormatError(ValueError):
+    """파일 형식을 알 수 없거나 필수 열이 없을 때 (행 단위 오류가 아닌 파일 전체 오류)"""
+
+
+class ImportProgress:
+    """일괄 가져오기 진행 상황 (가져오기 스레드가 갱신하고 화면에서 읽음)"""
+
+    def __init__(self, import_id, total_bytes=None, error_path=None):
+        self.import_id = import_id
+        self.total_bytes = total_bytes
+        self.error_path = error_path
+        self.bytes_read = 0
+        self.rows = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.error = None  # 파일 전체 오류로 중단된 경우 그 사유
+        self.started_at = time.monotonic()
+        self.finished_at = None
+
+    @property
+    def skipped(self):
+        return self.duplicates + self.invalid
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    @property
+    def fraction(self):
+        """읽은 바이트 기준 진행률 (전체 크기를 모르면 None)"""
+        if self.finished:
+            return 1.0
+        if not self.total_bytes:
+            return None
+        return min(1.0, self.bytes_read / self.total_bytes)
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def detect_format(filename):
+    """파일 확장자로 형식 판별 ("csv" / "jsonl")"""
+    fmt = FORMATS.get(os.path.splitext(filename)[1].lower())
+    if fmt is None:
+        raise ImportFormatError(f"지원하지 않는 파일 형식입니다: {filename} (CSV 또는 JSONL)")
+    return fmt
+
+
+def new_import_id():
+    return f"IMPORT-{datetime.datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:4].upper()}"
+
+
+def _field(row, name):
+    for key in FIELD_NAMES[name]:
+        value = row.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def detect_encoding(binary):
+    """
+    파일 앞부분(SNIFF_BYTES)을 읽어 인코딩을 고르고 읽은 위치를 되돌립니다.
+    ENCODINGS 중 앞부분을 오류 없이 읽는 첫 인코딩을 반환하며, 모두 실패하면 ImportFormatError.
+    """
+    position = binary.tell()
+    head = binary.read(SNIFF_BYTES)
+    binary.seek(position)
+    for encoding in ENCODINGS:
+        try:
+            # 잘린 마지막 글자는 오류로 보지 않도록 증분 디코더 사용
+            codecs.getincrementaldecoder(encoding)().decode(head, final=False)
+        except UnicodeDecodeError:
+            continue
+        return encoding
+    raise ImportFormatError("파일 인코딩을 알 수 없습니다. UTF-8 로 저장해 주세요.")
+
+
+def _iter_rows(binary, fmt):
+    """(행 번호, 원본 행, 파싱 오류) 를 한 행씩 생성. binary 는 바이너리 파일 객체"""
+    encoding = detect_encoding(binary)
+    text = io.TextIOWrapper(binary, encoding=encoding, newline="" if fmt == "csv" else None)
+    try:
+        yield from (_iter_csv(text) if fmt == "csv" else _iter_jsonl(text))
+    except UnicodeDecodeError:
+        # 앞부분은 읽혔지만 뒤쪽에 다른 인코딩이 섞인 경우
+        raise ImportFormatError(f"파일 중간에 {encoding.removesuffix('-sig').upper()} 로 읽을 수 없는 내용이 있습니다. "
+                                "UTF-8 로 저장해 주세요.") from None
+    finally:
+        # 래퍼가 정리될 때 binary 까지 닫지 않도록 분리 (진행률 계산에 binary.tell() 사용)
+        text.detach()
+
+
+def _iter_csv(text):
+    reader = csv.DictReader(text)
+    try:
+        header = reader.fieldnames or []
+        for name in ("model_name", "deleted_data"):
+            if not any(key in header for key in FIELD_NAMES[name]):
+                raise ImportFormatError(f"CSV 머리글에 '{name}' 열이 없습니다. (가능한 이름: {', '.join(FIELD_NAMES[name])})")
+        for row in reader:
+            if None in row:
+                yield reader.line_num, row, "머리글보다 열이 많습니다."
+            else:
+                yield reader.line_num, row, None
+    except csv.Error as e:
+        # 닫히지 않은 따옴표, 너무 긴 필드 등은 이후 행의 경계를 알 수 없으므로 파일 전체 오류
+        raise ImportFormatError(f"CSV 형식 오류 ({reader.line_num}행): {e}") from None
+
+
+def _iter_jsonl(text):
+    for line_no, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, line.rstrip("\n"), f"JSON 형식 오류: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, row, "JSON 객체가 아닙니다."
+            continue
+        yield line_no, row, None
+
+
+def validate_row(row, default_requester=DEFAULT_REQUESTER):
+    """행 검증. (대상 모델명, 삭제 데이터, 요청자) 를 반환하고, 잘못된 행이면 ValueError"""
+    values = {}
+    for name in FIELD_NAMES:
+        value = _field(row, name)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"'{name}' 값이 문자열이 아닙니다.")
+        value = (value or "").strip()
+        if len(value) > MAX_FIELD_LENGTH:
+            raise ValueError(f"'{name}' 값이 너무 깁니다. ({len(value)}자, 최대 {MAX_FIELD_LENGTH}자)")
+        values[name] = value
+    if not values["model_name"]:
+        raise ValueError("AI 모델명(model_name)이 비어 있습니다.")
+    if not values["deleted_data"]:
+        raise ValueError("삭제 요청 데이터셋(deleted_data)이 비어 있습니다.")
+    return values["model_name"], values["deleted_data"], values["requester_id"] or default_requester
+
+
+def import_requests(store, binary, fmt, progress, batch_size=DEFAULT_BATCH_SIZE, default_requester=DEFAULT_REQUESTER):
+    """
+    binary(바이너리 파일 객체)의 행을 읽어 '잊힘' 요청 인증서를 발행합니다.
+    이미 발행된 (대상 모델명, 삭제 데이터) 쌍과 파일 안에서 반복된 행은 중복으로 건너뜁니다.
+    progress.error_path 가 있으면 건너뛴 행을 그 파일에 기록합니다. 파일 전체 오류는 ImportFormatError.
+    """
+    error_file = None
+    if progress.error_path:
+        if os.path.dirname(progress.error_path):
+            os.makedirs(os.path.dirname(progress.error_path), exist_ok=True)
+        error_file = open(progress.error_path, "w", encoding="utf-8")
+
+    def reject(line_no, row, message, duplicate=False):
+        if duplicate:
+            progress.duplicates += 1
+        else:
+            progress.invalid += 1
+        if error_file is not None:
+            error_file.write(json.dumps({"line": line_no, "error": message, "row": row}, ensure_ascii=False) + "\n")
+
+    def flush(batch):
+        existing = store.existing_requests({(model_name, deleted_data) for _, _, model_name, deleted_data, _ in batch})
+        with store.transaction():
+            for line_no, row, model_name, deleted_data, requester in batch:
+                if (model_name, deleted_data) in existing:
+                    reject(line_no, row, "이미 발행된 요청과 중복됩니다.", duplicate=True)
+                    continue
+                # 같은 배치 안에서 반복된 행 (이전 배치와의 중복은 위의 저장소 조회로 걸러짐)
+                existing.add((model_name, deleted_data))
+                timestamp = to_micros(datetime.datetime.now().isoformat())
+                store.insert(Certificate(
+                    cert_id=new_cert_id(),
+                    requester_id=requester,
+                    operator_id=None,
+                    approver_id=None,
+                    completion_date=None,
+                    model_name=model_name,
+                    deleted_data=deleted_data,
+                    replacement_data=None,
+                    current_status=Status.PENDING_FORGET,
+                    internal_ai_suggestion=None,
+                    log=[LogEntry(timestamp, Status.PENDING_FORGET, requester,
+                                  f"신규 '잊힘' 요청 발행 (일괄 가져오기 [{progress.import_id}] {line_no}행)")]
+                ))
+                progress.inserted += 1
+        progress.bytes_read = binary.tell()
+
+    try:
+        batch = []
+        for line_no, row, error in _iter_rows(binary, fmt):
+            progress.rows += 1
+            if error is None:
+                try:
+                    batch.append((line_no, row, *validate_row(row, default_requester)))
+                except ValueError as e:
+                    error = str(e)
+            if error is not None:
+                reject(line_no, row, error)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    except ImportFormatError as e:
+        progress.error = str(e)
+        raise
+    finally:
+        if error_file is not None:
+            error_file.close()
+            if not progress.skipped:
+                os.remove(progress.error_path)
+                progress.error_path = None
+        progress.finished_at = time.monotonic()
+    return progress
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+
+def main():
+    from journal import Journal, JournalLocked
+    from store import CertificateStore, DB_PATH
+
+    parser = argparse.ArgumentParser(description="'잊힘' 요청 CSV/JSONL 일괄 가져오기")
+    parser.add_argument("path", help="가져올 파일 (.csv, .jsonl)")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())), help="파일 형식 (기본: 확장자로 판별)")
+    parser.add_argument("--errors", help="건너뛴 행을 기록할 파일 (기본: <파일>.errors.jsonl)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--requester", default=DEFAULT_REQUESTER, help="요청자 열이 비어 있을 때 사용할 요청자")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    progress = ImportProgress(new_import_id(), os.path.getsize(args.path),
+                              args.errors or os.path.splitext(args.path)[0] + ".errors.jsonl")
+    try:
+        journal = Journal()
+    except JournalLocked as e:
+        print(f"가져오기 실패: {e}", file=sys.stderr)
+        return 1
+    store = CertificateStore(DB_PATH, journal=journal)
+    store.recover()
+
+    done = threading.Event()
+
+    def report():
+        while not done.wait(1.0):
+            print(f"\r[{progress.import_id}] {progress.fraction or 0:.0%} | {progress.rows}행, 발행 {progress.inserted}, "
+                  f"중복 {progress.duplicates}, 오류 {progress.invalid} | {progress.rows_per_second:.0f}행/초",
+                  end="", file=sys.stderr)
+
+    reporter = threading.Thread(target=report, daemon=True)
+    reporter.start()
+    try:
+        with open(args.path, "rb") as f:
+            import_requests(store, f, fmt, progress, args.batch_size, args.requester)
+    except ImportFormatError as e:
+        print(f"\n가져오기 실패: {e}", file=sys.stderr)
+        return 1
+    finally:
+        done.set()
+        reporter.join()
+        store.close()
+        journal.close()
+    print(f"\n[{progress.import_id}] {progress.rows}행 처리: 발행 {progress.inserted}건, 중복 {progress.duplicates}건, "
+          f"오류 {progress.invalid}건 ({progress.elapsed:.1f}초)")
+    if progress.skipped:
+        print(f"건너뛴 행: {progress.error_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
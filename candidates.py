@@ -0,0 +1,96 @@
+import os
+import threading
+
+import leakcheck
+from search import tokenize
+
+# ----------------------------------------------------------------------
+# '대체' AI 제안 후보 풀
+# ----------------------------------------------------------------------
+# 첫 생성 때 후보를 여러 개 받아 두고, 제시하지 않은 후보는 인증서별 풀에 보관합니다.
+# 'AI 재탐색'이나 R2BF 거부 후 재작업은 풀에서 바로 꺼내 쓰고, 풀은 백그라운드에서 다시 채웁니다.
+# 풀 안의 후보는 중립성 점수가 높은 순으로 제시되며, 누출 의심 표현(leakcheck)이 있는 후보는 넣지 않습니다.
+
+# 한 번의 생성 요청에서 받을 후보 수 (Gemini candidate_count)
+DEFAULT_CANDIDATES = int(os.environ.get("R2BF_AI_CANDIDATES", "3"))
+
+# 인증서별로 보관할 최대 후보 수
+DEFAULT_POOL_SIZE = 4
+
+# 대체 문장에 드러나면 특정 집단을 암시할 수 있는 민감 속성 표현
+SENSITIVE_TERMS = (
+    "지역", "거주지", "주소", "출신", "고향", "성별", "남성", "여성", "나이", "연령", "인종", "국적",
+    "종교", "장애", "학력", "혼인", "임신",
+)
+
+
+def neutrality_score(text, deleted_data_text):
+    """
+    0~1 사이 중립성 점수. 삭제된 데이터와 겹치는 문자 2-gram 비율과
+    민감 속성 표현의 언급 횟수만큼 감점합니다. (프롬프트 규칙 1: 삭제 데이터의 편향을 암시하지 않을 것)
+    """
+    deleted = set(tokenize(deleted_data_text))
+    overlap = len(set(tokenize(text)) & deleted) / len(deleted) if deleted else 0.0
+    mentions = sum(text.count(term) for term in SENSITIVE_TERMS)
+    return max(0.0, 1.0 - 0.6 * overlap - 0.1 * mentions)
+
+
+def rank_candidates(texts, deleted_data_text):
+    """후보를 중립성 점수가 높은 순으로 정렬한 [(점수, 문장)] (같은 문장은 하나만)"""
+    unique = dict.fromkeys(text.strip() for text in texts if text and text.strip())
+    return sorted(((neutrality_score(text, deleted_data_text), text) for text in unique),
+                  key=lambda item: item[0], reverse=True)
+
+
+class CandidatePool:
+    """
+    인증서별 '대체' 후보 풀 (모든 세션 공유). 이미 제시한 문장은 기억해 두었다가
+    다시 풀에 들어오지 않게 하므로 재탐색 때마다 새로운 후보가 나옵니다.
+    """
+
+    def __init__(self, max_per_cert=DEFAULT_POOL_SIZE):
+        self.max_per_cert = max_per_cert
+        self._lock = threading.Lock()
+        self._pools = {}  # cert_id -> [(점수, 문장)] 점수 내림차순
+        self._seen = {}  # cert_id -> 이미 제시한 문장
+
+    def add(self, cert_id, texts, deleted_data_text):
+        """후보를 풀에 추가하고 추가된 수를 반환합니다."""
+        with self._lock:
+            seen = self._seen.setdefault(cert_id, set())
+            pool = self._pools.setdefault(cert_id, [])
+            pooled = {text for _, text in pool}
+            fresh = [item for item in rank_candidates(texts, deleted_data_text)
+                     if item[1] not in seen and item[1] not in pooled
+                     and not leakcheck.scan(item[1], deleted_data_text)]
+            pool.extend(fresh)
+            pool.sort(key=lambda item: item[0], reverse=True)
+            del pool[self.max_per_cert:]
+            return len(fresh)
+
+    def pop(self, cert_id):
+        """가장 중립적인 후보 (점수, 문장). 풀이 비어 있으면 None"""
+        with self._lock:
+            pool = self._pools.get(cert_id)
+            if not pool:
+                return None
+            score, text = pool.pop(0)
+            self._seen.setdefault(cert_id, set()).add(text)
+            return score, text
+
+    def mark_seen(self, cert_id, text):
+        """풀을 거치지 않고 제시된 문장 (첫 생성 결과 등)"""
+        if text:
+            with self._lock:
+                self._seen.setdefault(cert_id, set()).add(text.strip())
+                self._pools[cert_id] = [item for item in self._pools.get(cert_id, []) if item[1] != text.strip()]
+
+    def size(self, cert_id):
+        with self._lock:
+            return len(self._pools.get(cert_id, ()))
+
+    def discard(self, cert_id):
+        """인증서 처리가 끝나면 풀을 비움"""
+        with self._lock:
+            self._pools.pop(cert_id, None)
+            self._seen.pop(cert_id, None)
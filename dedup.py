@@ -0,0 +1,140 @@
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from search import normalize
+
+# ----------------------------------------------------------------------
+# '잊힘' 요청 유사 중복 탐지 (문자 n-gram shingle + MinHash + LSH)
+# ----------------------------------------------------------------------
+# 같은 대상 모델에 같은(또는 거의 같은) 데이터셋의 '잊힘' 요청이 다시 들어오면
+# 발행 전에 알려 주어, 진행 중인 기존 인증서에 연결할 수 있게 합니다. (완료된 인증서는 보여 주기만 함)
+#   - 삭제 데이터를 정규화한 뒤 문자 3-gram 집합(shingle)으로 만들고 MinHash 서명을 계산합니다.
+#   - 서명을 BANDS 개 밴드로 나누어 (대상 모델, 밴드) 버킷에 넣으므로,
+#     조회는 전체 인증서가 아니라 같은 버킷에 든 후보만 봅니다. (LSH)
+#   - 후보는 실제 shingle 자카드 유사도로 다시 확인합니다.
+
+SHINGLE = 3
+
+# MinHash 해시 함수 수 = BANDS * ROWS. 유사도 s 인 쌍이 후보가 될 확률은 1 - (1 - s^ROWS)^BANDS
+# (s=0.7 -> 98%, s=0.5 -> 74%, s=0.3 -> 24%)
+BANDS = 10
+ROWS = 3
+
+# 이 유사도(자카드) 이상이면 중복으로 봄
+DUPLICATE_THRESHOLD = 0.7
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20250101)  # 프로세스가 달라도 같은 서명이 나오도록 고정
+_A = _rng.integers(1, _PRIME, size=(BANDS * ROWS, 1), dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, size=(BANDS * ROWS, 1), dtype=np.uint64)
+
+_SEPARATOR_RE = re.compile(r"[^0-9a-z가-힣ㄱ-ㅎㅏ-ㅣ一-鿿]+")
+
+
+def shingles(text):
+    """정규화한 텍스트의 문자 n-gram 집합 (문장 부호·띄어쓰기 차이는 무시)"""
+    text = _SEPARATOR_RE.sub("", normalize(text))
+    if len(text) <= SHINGLE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE] for i in range(len(text) - SHINGLE + 1)}
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def signature(grams):
+    """MinHash 서명 (BANDS * ROWS 개의 최솟값)"""
+    hashes = np.fromiter((zlib.crc32(gram.encode("utf-8")) % _PRIME for gram in grams), dtype=np.uint64,
+                         count=len(grams))
+    return ((_A * hashes + _B) % _PRIME).min(axis=1)
+
+
+def band_keys(model_name, grams):
+    """(대상 모델, 밴드 번호, 밴드 값) 버킷 키 목록"""
+    if not grams:
+        return ()
+    sig = signature(grams).reshape(BANDS, ROWS)
+    return tuple(hash((model_name, band, sig[band].tobytes())) for band in range(BANDS))
+
+
+class DuplicateIndex:
+    """대상 모델별 삭제 데이터 LSH 인덱스 (증분 갱신, 스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._buckets = {}  # 버킷 키 -> cert_id 또는 {cert_id, ...} (대부분 한 건이므로 문자열로 보관)
+        self._keys = {}  # cert_id -> 버킷 키 목록 (재색인 시 제거용)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, cert):
+        keys = band_keys(cert.model_name, shingles(cert.deleted_data))
+        with self._lock:
+            if self._keys.get(cert.cert_id) == keys:
+                return
+            self._remove(cert.cert_id)
+            self._keys[cert.cert_id] = keys
+            for key in keys:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    self._buckets[key] = cert.cert_id
+                elif isinstance(bucket, str):
+                    self._buckets[key] = {bucket, cert.cert_id}
+                else:
+                    bucket.add(cert.cert_id)
+
+    def remove(self, cert_id):
+        with self._lock:
+            self._remove(cert_id)
+
+    def _remove(self, cert_id):
+        for key in self._keys.pop(cert_id, ()):
+            bucket = self._buckets.get(key)
+            if bucket == cert_id:
+                del self._buckets[key]
+            elif isinstance(bucket, set):
+                bucket.discard(cert_id)
+                if len(bucket) == 1:
+                    self._buckets[key] = bucket.pop()
+
+    def rebuild(self, certs):
+        with self._lock:
+            self._clear()
+        for cert in certs:
+            self.add(cert)
+
+    def candidates(self, model_name, text):
+        """같은 버킷에 든 인증서 ID (유사도 확인 전 후보)"""
+        found = set()
+        with self._lock:
+            for key in band_keys(model_name, shingles(text)):
+                bucket = self._buckets.get(key)
+                if isinstance(bucket, str):
+                    found.add(bucket)
+                elif bucket:
+                    found.update(bucket)
+        return found
+
+
+def find_duplicates(index, store, model_name, text, threshold=DUPLICATE_THRESHOLD):
+    """같은 대상 모델의 유사 중복 요청 [(유사도, Certificate)] (유사도 높은 순, 같으면 최근 발행 우선)"""
+    grams = shingles(text)
+    matches = []
+    for cert in store.get_many(sorted(index.candidates(model_name, text))):
+        if cert.model_name != model_name:
+            continue
+        similarity = jaccard(grams, shingles(cert.deleted_data))
+        if similarity >= threshold:
+            matches.append((similarity, cert))
+    matches.sort(key=lambda match: (match[0], match[1].log[0].timestamp if match[1].log else 0), reverse=True)
+    return matches
@@ -0,0 +1,177 @@
+import argparse
+import csv
+import datetime
+import importlib.util
+import io
+import json
+import os
+import sys
+
+# ----------------------------------------------------------------------
+# 인증서 + 처리 로그 내보내기 (JSONL / CSV / Parquet)
+# ----------------------------------------------------------------------
+# 규제 기관 제출용. CertificateStore.export() 가 chunk_size 건씩 읽어 흘려보내는 인증서를
+# 바로 파일에 써 나가므로 DB 전체를 메모리에 올리지 않습니다.
+#   - JSONL:   인증서 한 건당 한 줄 (Certificate.to_dict(), 로그 전체 포함)
+#   - CSV:     로그 한 건당 한 행 (인증서 컬럼 반복, 스프레드시트용)
+#   - Parquet: 인증서 한 건당 한 행, log 는 list<struct> 컬럼 (pyarrow 필요, 선택 설치)
+#
+# 사용법 (서버 실행 중에도 가능. 읽기 트랜잭션만 사용):
+#     python export.py --format parquet --status Completed --since 2025-01-01 --output completed.parquet
+#     python export.py --format jsonl --model "신용평가 AI 모델" > certs.jsonl
+
+# 한 번에 읽어 쓰는 인증서 수 (Parquet 는 이 단위로 row group 을 씀)
+DEFAULT_CHUNK_SIZE = 1000
+
+# 형식 -> (MIME, 확장자)
+FORMATS = {
+    "jsonl": ("application/x-ndjson", ".jsonl"),
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+CERT_COLUMNS = ("cert_id", "requester_id", "operator_id", "approver_id", "completion_date", "model_name",
+                "deleted_data", "replacement_data", "current_status", "internal_ai_suggestion")
+LOG_COLUMNS = ("log_seq", "log_timestamp", "log_status", "log_actor", "log_message", "log_reason")
+
+
+class ExportError(RuntimeError):
+    """내보낼 수 없는 형식 (예: pyarrow 가 설치되지 않은 환경의 Parquet)"""
+
+
+def parquet_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _cert_values(cert):
+    return (cert.cert_id, cert.requester_id, cert.operator_id, cert.approver_id, cert.completion_date,
+            cert.model_name, cert.deleted_data, cert.replacement_data, cert.current_status.value,
+            cert.internal_ai_suggestion)
+
+
+def iter_jsonl(certs):
+    """인증서 한 건당 JSON 한 줄"""
+    for cert in certs:
+        yield json.dumps(cert.to_dict(), ensure_ascii=False) + "\n"
+
+
+def iter_csv(certs, chunk_size=DEFAULT_CHUNK_SIZE):
+    """머리글 + 로그 한 건당 한 행 (chunk_size 건마다 문자열로 흘려보냄)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CERT_COLUMNS + LOG_COLUMNS)
+    for count, cert in enumerate(certs, 1):
+        values = _cert_values(cert)
+        for seq, log in enumerate(cert.log):
+            writer.writerow(values + (seq, log.isoformat(), log.status.value, log.actor, log.message, log.reason))
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _parquet_schema(pa):
+    log_type = pa.struct([("timestamp", pa.timestamp("us")), ("status", pa.string()), ("actor", pa.string()),
+                          ("message", pa.string()), ("reason", pa.string())])
+    return pa.schema([(name, pa.string()) for name in CERT_COLUMNS] + [("log", pa.list_(log_type))])
+
+
+def write_parquet(certs, sink, chunk_size=DEFAULT_CHUNK_SIZE):
+    """chunk_size 건씩 row group 으로 sink(경로 또는 바이너리 파일 객체)에 씀"""
+    if not parquet_available():
+        raise ExportError("Parquet 내보내기에는 pyarrow 가 필요합니다. (pip install pyarrow)")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(pa)
+    epoch = datetime.datetime(1970, 1, 1)
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        rows = []
+        for cert in certs:
+            row = dict(zip(CERT_COLUMNS, _cert_values(cert)))
+            row["log"] = [{"timestamp": epoch + datetime.timedelta(microseconds=log.timestamp),
+                           "status": log.status.value, "actor": log.actor, "message": log.message,
+                           "reason": log.reason} for log in cert.log]
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                writer.write_table(pa.Table.from_pylist(rows, schema))
+                rows = []
+        if rows:
+            writer.write_table(pa.Table.from_pylist(rows, schema))
+
+
+def write_export(certs, fmt, sink, chunk_size=DEFAULT_CHUNK_SIZE):
+    """certs 를 fmt 형식으로 sink(바이너리 파일 객체)에 쓰고 내보낸 인증서 수를 반환"""
+    if fmt not in FORMATS:
+        raise ExportError(f"지원하지 않는 형식입니다: {fmt}")
+    count = 0
+
+    def counted():
+        nonlocal count
+        for cert in certs:
+            count += 1
+            yield cert
+
+    if fmt == "parquet":
+        write_parquet(counted(), sink, chunk_size)
+    else:
+        chunks = iter_jsonl(counted()) if fmt == "jsonl" else iter_csv(counted(), chunk_size)
+        for chunk in chunks:
+            sink.write(chunk.encode("utf-8"))
+    return count
+
+
+def export_file_name(fmt, prefix="r2bf-certificates"):
+    return f"{prefix}-{datetime.datetime.now():%Y%m%d-%H%M%S}{FORMATS[fmt][1]}"
+
+
+# ----------------------------------------------------------------------
+# CLI (야간 배치 등)
+# ----------------------------------------------------------------------
+
+def main():
+    from store import CertificateStore, DB_PATH
+
+    parser = argparse.ArgumentParser(description="R2BF 인증서 + 처리 로그 내보내기")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="jsonl")
+    parser.add_argument("--output", help="출력 파일 (기본: 표준 출력, Parquet 는 파일 필수)")
+    parser.add_argument("--status", action="append", default=[], help="상태 (여러 번 지정 가능, 예: Completed)")
+    parser.add_argument("--model", help="대상 모델명")
+    parser.add_argument("--requester", help="요청자")
+    parser.add_argument("--since", help="이 날짜/시각 이후 (ISO, 포함)")
+    parser.add_argument("--until", help="이 날짜/시각 이전 (ISO, 미포함)")
+    parser.add_argument("--date-field", choices=("created_at", "completion_date"), default="created_at",
+                        help="날짜 범위를 적용할 컬럼 (발행일 / 처리 완료일)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.format == "parquet" and not args.output:
+        parser.error("Parquet 는 --output 파일을 지정해야 합니다.")
+    if args.format == "parquet" and not parquet_available():
+        parser.error("Parquet 내보내기에는 pyarrow 가 필요합니다. (pip install pyarrow)")
+
+    store = CertificateStore(DB_PATH)
+    certs = store.export(args.status, args.model, args.requester, args.since, args.until, args.date_field,
+                         args.chunk_size)
+    try:
+        if args.output:
+            tmp_path = args.output + ".tmp"
+            with open(tmp_path, "wb") as f:
+                count = write_export(certs, args.format, f, args.chunk_size)
+            os.replace(tmp_path, args.output)
+        else:
+            count = write_export(certs, args.format, sys.stdout.buffer, args.chunk_size)
+            sys.stdout.flush()
+    except ExportError as e:
+        print(f"내보내기 실패: {e}", file=sys.stderr)
+        return 1
+    finally:
+        certs.close()
+        store.close()
+    print(f"인증서 {count}건 내보냄 ({args.format}){' -> ' + args.output if args.output else ''}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
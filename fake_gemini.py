@@ -0,0 +1,155 @@
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ----------------------------------------------------------------------
+# 지연 / 오류 주입용 가짜 Gemini REST 서버
+# ----------------------------------------------------------------------
+# generateContent / streamGenerateContent 만 흉내 내며, 요청마다 정해진 확률로
+#   - error_rate: 429 / 500 / 503 오류 (error_codes 중 하나)
+#   - slow_rate: slow_latency 초 지연 (꼬리 지연, 헤지 요청 확인용)
+# 을 주입하고, 나머지는 latency ± jitter 초 뒤에 고정 문장을 돌려줍니다.
+#
+# 사용법:
+#     python fake_gemini.py --port 8765 --error-rate 0.2 --slow-rate 0.05
+#     R2BF_GEMINI_ENDPOINT=http://127.0.0.1:8765 streamlit run main.py   # API 키는 아무 값이나 입력
+
+TEXTS = (
+    "모든 신청자는 동일한 기준으로 평가됩니다.",
+    "신용 평가는 개인의 신용 기록을 기반으로 합니다.",
+    "평가 기준은 공정성 원칙에 따라 주기적으로 검토됩니다.",
+)
+
+_STATUS_NAMES = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE", 504: "DEADLINE_EXCEEDED"}
+_PATH_RE = re.compile(r"^/v1beta/models/([^:/]+):(generateContent|streamGenerateContent)")
+
+
+def _candidate(text, index=0):
+    return {"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": index}
+
+
+class FakeGeminiServer:
+    """백그라운드 스레드에서 도는 가짜 서버. url 을 R2BF_GEMINI_ENDPOINT (또는 gemini._service_client) 에 넘겨 사용"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.2, jitter=0.05, error_rate=0.0,
+                 error_codes=(429, 500, 503), slow_rate=0.0, slow_latency=3.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.stats = Counter()  # requests / errors / slow / ok
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-gemini", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _fault(self):
+        """이번 요청에 주입할 (오류 코드 또는 None, 지연 초)"""
+        with self._lock:
+            self.stats["requests"] += 1
+            roll = self._random.random()
+            if roll < self.error_rate:
+                self.stats["errors"] += 1
+                return self._random.choice(self.error_codes), self.latency
+            if roll < self.error_rate + self.slow_rate:
+                self.stats["slow"] += 1
+                return None, self.slow_latency
+            self.stats["ok"] += 1
+            return None, max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                match = _PATH_RE.match(self.path)
+                if match is None:
+                    return self._send(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+                code, delay = server._fault()
+                time.sleep(delay)
+                if code is not None:
+                    return self._send(code, {"error": {"code": code, "message": f"주입된 오류 ({code})",
+                                                       "status": _STATUS_NAMES.get(code, "UNKNOWN")}})
+                count = body.get("generationConfig", {}).get("candidateCount") or 1
+                if match.group(2) == "streamGenerateContent":
+                    words = TEXTS[0].split()
+                    chunks = [{"candidates": [_candidate(word + " ")]} for word in words]
+                    return self._send(200, chunks)
+                return self._send(200, {"candidates": [_candidate(TEXTS[i % len(TEXTS)], i) for i in range(count)]})
+
+            def _send(self, code, payload):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # 클라이언트가 시간 초과로 먼저 끊은 경우
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="지연 / 오류 주입용 가짜 Gemini 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="기본 응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.1, help="429 / 500 / 503 오류 비율")
+    parser.add_argument("--error-codes", type=int, nargs="+", default=[429, 500, 503])
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="꼬리 지연 비율")
+    parser.add_argument("--slow-latency", type=float, default=5.0, help="꼬리 지연 (초)")
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(args.host, args.port, args.latency, args.jitter, args.error_rate, args.error_codes,
+                              args.slow_rate, args.slow_latency)
+    print(f"가짜 Gemini 서버: {server.url}  (R2BF_GEMINI_ENDPOINT={server.url})", file=sys.stderr)
+    server.start()
+    try:
+        while True:
+            time.sleep(10)
+            print(dict(server.stats), file=sys.stderr)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,385 @@
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import google.ai.generativelanguage as glm
+import google.generativeai as genai
+import requests
+from google.ai.generativelanguage_v1beta.services.generative_service.transports import GenerativeServiceRestTransport
+from google.api_core import exceptions as api_exceptions
+from google.auth.credentials import AnonymousCredentials
+
+# ----------------------------------------------------------------------
+# Gemini 클라이언트 레지스트리 (프로세스 전체 공유)
+# ----------------------------------------------------------------------
+# genai.configure() 는 프로세스 전역 설정이라 세션마다 다른 키를 쓰면 서로 덮어쓰고,
+# 세션마다 GenerativeModel 을 새로 만들면 연결도 세션마다 따로 열립니다.
+# API 키별로 GenerativeServiceClient 를 하나만 만들어 모든 세션과 모델이 연결을 재사용합니다.
+#
+# R2BF_GEMINI_ENDPOINT="http://127.0.0.1:8765" 처럼 주면 실제 API 대신 그 주소(REST)로 호출합니다.
+# (fake_gemini.py 의 지연·오류 주입 서버로 재시도 / 회로 차단 / 헤지 동작을 확인할 때 사용)
+
+GEMINI_ENDPOINT = os.environ.get("R2BF_GEMINI_ENDPOINT") or None
+
+
+def key_hash(api_key):
+    """API 키 식별용 해시 (키 원문은 레지스트리 밖에 보관하지 않음)"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _service_client(api_key, endpoint=None):
+    endpoint = endpoint or GEMINI_ENDPOINT
+    if not endpoint:
+        return glm.GenerativeServiceClient(client_options={"api_key": api_key})
+    scheme, _, host = endpoint.rpartition("://")
+    transport = GenerativeServiceRestTransport(host=host, url_scheme=scheme or "http",
+                                               credentials=AnonymousCredentials())
+    return glm.GenerativeServiceClient(transport=transport)
+
+
+class GeminiClientRegistry:
+    """
+    (API 키 해시, 모델명) 별 GenerativeModel 레지스트리.
+    같은 키의 모델들은 하나의 서비스 클라이언트(연결 풀)를 공유하므로 모델을 바꿔도 연결을 새로 만들지 않습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}  # key_hash -> GenerativeServiceClient
+        self._models = {}  # (key_hash, model_name) -> GenerativeModel
+
+    def register(self, api_key):
+        """API 키의 서비스 클라이언트를 (없으면) 만들고 키 해시를 반환합니다."""
+        digest = key_hash(api_key)
+        with self._lock:
+            if digest not in self._clients:
+                self._clients[digest] = _service_client(api_key)
+        return digest
+
+    def model(self, digest, model_name):
+        """등록된 키의 모델 (등록되지 않은 키면 None)"""
+        with self._lock:
+            client = self._clients.get(digest)
+            if client is None:
+                return None
+            model = self._models.get((digest, model_name))
+            if model is None:
+                model = genai.GenerativeModel(model_name)
+                # 전역 기본 클라이언트(genai.configure) 대신 이 키의 공유 클라이언트를 사용.
+                # GenerativeModel 에는 클라이언트를 넘기는 공개 API 가 없어 내부 속성을 씀 (README 의 0.8.x 고정 참고)
+                if not hasattr(model, "_client"):
+                    raise RuntimeError(f"지원하지 않는 google-generativeai 버전입니다: {genai.__version__} (0.8.x 필요)")
+                model._client = client
+                self._models[digest, model_name] = model
+            return model
+
+    def remove(self, digest):
+        with self._lock:
+            self._clients.pop(digest, None)
+            for key in [key for key in self._models if key[0] == digest]:
+                del self._models[key]
+
+    @property
+    def client_count(self):
+        with self._lock:
+            return len(self._clients)
+
+    @property
+    def model_count(self):
+        with self._lock:
+            return len(self._models)
+
+
+# ----------------------------------------------------------------------
+# 호출 복원력 (마감 시간, 재시도, 회로 차단기, 헤지 요청)
+# ----------------------------------------------------------------------
+# GeminiCaller.call() 은 Gemini 호출 하나를 마감 시간(deadline) 안에서 다음과 같이 처리합니다.
+#   - 429 / 5xx / 시간 초과 / 연결 오류는 지수 백오프 + full jitter 로 기다렸다가 다시 시도합니다.
+#   - 모델별 회로 차단기: 연속 FAILURE_THRESHOLD 회 실패하면 RESET_SECONDS 동안 호출하지 않고 바로 실패시키고,
+#     그 뒤 한 번의 시험 호출 결과로 다시 닫을지 정합니다. (API 장애 중에 일괄 생성이 할당량을 태우지 않도록)
+#   - 헤지: 응답이 최근 성공 호출의 p95 지연을 넘기도록 오지 않으면 같은 요청을 한 번 더 보내 먼저 온 응답을 씁니다.
+#     (꼬리 지연만 줄이는 용도라 호출 수는 5% 안팎만 늘어남. 스트리밍 호출에는 쓰지 않음)
+# 끝내 실패하면 GeminiCallError 를 던지며, 호출하는 쪽은 이를 '대체' 문장이 아닌 오류 상태로 다룹니다.
+
+CALL_DEADLINE = float(os.environ.get("R2BF_GEMINI_DEADLINE", "30"))
+MAX_ATTEMPTS = int(os.environ.get("R2BF_GEMINI_MAX_ATTEMPTS", "4"))
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+FAILURE_THRESHOLD = 5
+RESET_SECONDS = 30
+HEDGE_ENABLED = os.environ.get("R2BF_GEMINI_HEDGE", "1") != "0"
+# p95 를 믿을 만큼 성공 호출이 쌓이기 전에는 헤지하지 않음
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.2
+LATENCY_WINDOW = 200
+
+# GeminiCallError.kind -> 화면 / 로그 표시
+ERROR_LABELS = {
+    "timeout": "응답 시간 초과",
+    "rate_limited": "호출 한도 초과 (429)",
+    "server": "Gemini 서버 오류 (5xx)",
+    "network": "연결 오류",
+    "circuit_open": "연속 실패로 호출 일시 중단",
+    "empty": "빈 응답 (차단 또는 후보 없음)",
+    "client": "요청 오류",
+}
+RETRYABLE = frozenset(("timeout", "rate_limited", "server", "network"))
+
+
+class GeminiCallError(Exception):
+    """재시도 후에도 실패한 Gemini 호출. kind 는 ERROR_LABELS 의 키, attempts 는 시도 횟수"""
+
+    def __init__(self, kind, message, attempts=1):
+        super().__init__(message)
+        self.kind = kind
+        self.attempts = attempts
+
+    @property
+    def label(self):
+        return ERROR_LABELS.get(self.kind, self.kind)
+
+
+def request_options(timeout):
+    """
+    generate_content 의 request_options. SDK 기본 재시도(503 등)는 끄고 재시도는 GeminiCaller 에서만 함
+    (기본 재시도가 켜져 있으면 한 번의 시도가 마감 시간을 다 쓰고 회로 차단기도 실패를 보지 못함)
+    """
+    return {"timeout": timeout, "retry": None}
+
+
+def classify(exc):
+    """예외 -> GeminiCallError.kind"""
+    if isinstance(exc, GeminiCallError):
+        return exc.kind
+    if isinstance(exc, (TimeoutError, requests.exceptions.Timeout, api_exceptions.DeadlineExceeded)):
+        return "timeout"
+    if isinstance(exc, api_exceptions.GoogleAPICallError):
+        code = exc.code if isinstance(exc.code, int) else 0
+        if code == 429:
+            return "rate_limited"
+        if code >= 500:
+            return "server"
+        return "client"
+    if isinstance(exc, (ConnectionError, requests.exceptions.ConnectionError)):
+        return "network"
+    if isinstance(exc, ValueError):
+        # response.text 등: 안전 필터로 차단되어 텍스트가 없는 응답
+        return "empty"
+    return "client"
+
+
+class CircuitBreaker:
+    """연속 실패 횟수 기반 회로 차단기 (closed -> open -> half_open -> closed)"""
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_seconds=RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half_open"
+            return "open"
+
+    def allow(self):
+        """호출해도 되는지. 열린 뒤 reset_seconds 가 지나면 시험 호출 한 번만 허용"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def release(self):
+        """결과를 기록하지 못하고 끝난 시험 호출을 풀어 다음 호출이 다시 시험할 수 있게 함"""
+        with self._lock:
+            self._probing = False
+
+
+class LatencyWindow:
+    """최근 성공 호출 지연(초) LATENCY_WINDOW 개"""
+
+    def __init__(self, size=LATENCY_WINDOW):
+        self._samples = deque(maxlen=size)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def add(self, seconds):
+        self._samples.append(seconds)
+
+    def quantile(self, q):
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else None
+
+
+class GeminiCaller:
+    """
+    Gemini 호출 래퍼 (프로세스 전체 공유). call(model_id, fn) 의 fn(timeout) 은 남은 마감 시간(초)을 받아
+    한 번 호출하고 결과를 돌려주는 함수입니다. (SDK 에는 request_options(timeout) 으로 넘김)
+    stats 에는 시도 / 재시도 / 헤지 / 헤지 승리 / 회로 차단 거절 횟수가 쌓입니다.
+    """
+
+    def __init__(self, deadline=CALL_DEADLINE, max_attempts=MAX_ATTEMPTS, backoff_base=BACKOFF_BASE,
+                 backoff_cap=BACKOFF_CAP, failure_threshold=FAILURE_THRESHOLD, reset_seconds=RESET_SECONDS,
+                 hedge=HEDGE_ENABLED, max_workers=32):
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.hedge = hedge
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="r2bf-gemini")
+        self._lock = threading.Lock()
+        self._breakers = {}  # model_id -> CircuitBreaker
+        self._latency = {}  # model_id -> LatencyWindow
+        self._stats_lock = threading.Lock()
+        self._stats = Counter()  # _stats_lock 으로 보호 (헤지 스레드와 여러 호출자가 함께 셈)
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    @property
+    def stats(self):
+        """호출 통계 사본 (attempts, retries, hedges, hedge_wins, rejected)"""
+        with self._stats_lock:
+            return Counter(self._stats)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats.clear()
+
+    def breaker(self, model_id):
+        with self._lock:
+            breaker = self._breakers.get(model_id)
+            if breaker is None:
+                breaker = self._breakers[model_id] = CircuitBreaker(self.failure_threshold, self.reset_seconds)
+            return breaker
+
+    def breaker_states(self):
+        """{model_id: 'closed' / 'open' / 'half_open'}"""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {model_id: breaker.state for model_id, breaker in breakers.items()}
+
+    def _latency_of(self, model_id):
+        with self._lock:
+            window = self._latency.get(model_id)
+            if window is None:
+                window = self._latency[model_id] = LatencyWindow()
+            return window
+
+    def p95(self, model_id):
+        return self._latency_of(model_id).quantile(0.95)
+
+    def hedge_delay(self, model_id):
+        """헤지 요청을 보낼 때까지 기다릴 시간 (표본이 모자라면 None)"""
+        window = self._latency_of(model_id)
+        if len(window) < HEDGE_MIN_SAMPLES:
+            return None
+        return max(HEDGE_MIN_DELAY, window.quantile(0.95))
+
+    def call(self, model_id, fn, deadline=None, hedge=None, inline=False):
+        """
+        fn 을 마감 시간 안에서 재시도하며 호출합니다. 실패하면 GeminiCallError.
+        inline=True 이면 (스트리밍처럼 호출 스레드에서 청크를 받아야 할 때) 작업 스레드 없이 직접 부르며,
+        이때 마감 시간은 fn 이 timeout 으로 지켜야 하고 헤지는 하지 않습니다.
+        """
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        breaker = self.breaker(model_id)
+        error = None
+        for attempt in range(1, self.max_attempts + 1):
+            # 마감을 먼저 봐야 half_open 시험 호출 자리를 잡고 그냥 빠져나가는 일이 없음
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+            if not breaker.allow():
+                self._count("rejected")
+                raise GeminiCallError("circuit_open", f"{model_id}: 연속 실패로 {self.reset_seconds}초 동안 호출을 멈췄습니다.",
+                                      attempt - 1)
+            self._count("attempts")
+            if attempt > 1:
+                self._count("retries")
+            started = time.monotonic()
+            try:
+                if inline:
+                    result = fn(remaining)
+                else:
+                    result = self._attempt(model_id, fn, remaining, self.hedge if hedge is None else hedge)
+            except Exception as e:
+                kind = classify(e)
+                if kind not in RETRYABLE:
+                    # 응답은 받았으므로 (잘못된 요청, 차단된 응답) 서비스 장애로 세지 않음
+                    breaker.record_success()
+                    raise GeminiCallError(kind, str(e) or type(e).__name__, attempt) from e
+                breaker.record_failure()
+                error = GeminiCallError(kind, str(e) or type(e).__name__, attempt)
+                error.__cause__ = e
+                delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1)))
+                if attempt == self.max_attempts or time.monotonic() + delay >= deadline_at:
+                    break
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # KeyboardInterrupt 등으로 결과 없이 끝나면 시험 호출 자리만 돌려놓음
+                breaker.release()
+                raise
+            breaker.record_success()
+            self._latency_of(model_id).add(time.monotonic() - started)
+            return result
+        raise error or GeminiCallError("timeout", f"{deadline or self.deadline:.0f}초 안에 응답을 받지 못했습니다.")
+
+    def _attempt(self, model_id, fn, timeout, hedge):
+        """작업 스레드에서 한 번 호출 (p95 를 넘기면 헤지 요청 추가). 시간 안에 못 받으면 TimeoutError"""
+        end = time.monotonic() + timeout
+        first = self._executor.submit(fn, timeout)
+        pending = {first}
+        hedge_after = self.hedge_delay(model_id) if hedge else None
+        if hedge_after is not None and hedge_after < timeout:
+            done, _ = wait(pending, timeout=hedge_after)
+            if not done:
+                self._count("hedges")
+                pending.add(self._executor.submit(fn, end - time.monotonic()))
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, end - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                # 남은 요청은 SDK timeout 으로 곧 끝나므로 기다리지 않음
+                raise TimeoutError(f"{timeout:.1f}초 안에 응답이 없습니다.")
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is not first:
+                    self._count("hedge_wins")
+                return result
+        raise error
@@ -0,0 +1,205 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# ----------------------------------------------------------------------
+# 백그라운드 작업 실행기 (Gemini '대체' 생성 등)
+# ----------------------------------------------------------------------
+# Streamlit 콜백 안에서 LLM 을 동기 호출하면 그동안 화면 전체가 멈추므로,
+# 콜백은 작업을 제출만 하고 결과는 작업이 끝난 뒤 저장소에 기록합니다.
+
+DEFAULT_WORKERS = int(os.environ.get("R2BF_JOB_WORKERS", "4"))
+
+logger = logging.getLogger(__name__)
+
+
+class JobAlreadyRunning(Exception):
+    """같은 키(인증서)의 작업이 이미 실행 중일 때"""
+
+
+class JobRunner:
+    """
+    키(보통 cert_id)별로 작업을 하나씩만 실행하는 스레드 풀.
+    서로 다른 키의 작업은 max_workers 개까지 동시에 실행됩니다.
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, name="r2bf-job"):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._running = {}  # key -> Future
+
+    def submit(self, key, fn, *args, **kwargs):
+        with self._lock:
+            if key in self._running:
+                raise JobAlreadyRunning(key)
+            future = self._executor.submit(fn, *args, **kwargs)
+            self._running[key] = future
+        future.add_done_callback(lambda f: self._finish(key, f))
+        return future
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._running.pop(key, None)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("백그라운드 작업 실패 [%s]", key, exc_info=future.exception())
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+# ----------------------------------------------------------------------
+# 일괄 작업: 동시 실행 수 제한 + 토큰 버킷 호출 속도 제한
+# ----------------------------------------------------------------------
+
+class TokenBucket:
+    """
+    분당 rate_per_minute 회로 호출 속도를 제한하는 토큰 버킷.
+    capacity 만큼은 한꺼번에(버스트) 호출할 수 있고, 이후에는 일정한 간격으로 토큰이 채워집니다.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self._cond = threading.Condition()
+        self._rate = rate_per_minute / 60.0
+        self._capacity = capacity or max(1, int(rate_per_minute // 6))
+        self._tokens = float(self._capacity)
+        self._updated = time.monotonic()
+
+    @property
+    def rate_per_minute(self):
+        return self._rate * 60.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def acquire(self, timeout=None):
+        """토큰 하나를 얻을 때까지 기다립니다. timeout 안에 얻지 못하면 False."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self._rate
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                self._cond.wait(wait)
+
+
+class BulkProgress:
+    """일괄 작업 진행 상황 (작업 스레드가 갱신하고 화면에서 읽음)"""
+
+    def __init__(self, batch_id, total, max_concurrency, rate_per_minute):
+        self.batch_id = batch_id
+        self.total = total
+        self.max_concurrency = max_concurrency
+        self.rate_per_minute = rate_per_minute
+        self.succeeded = 0
+        self.failed = 0
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def record(self, ok):
+        with self._lock:
+            if ok:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    @property
+    def done(self):
+        return self.succeeded + self.failed
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def throughput_per_minute(self):
+        return self.done / self.elapsed * 60 if self.elapsed > 0 else 0.0
+
+
+class GenerationStream:
+    """스트리밍 생성 중인 텍스트 (작업 스레드가 청크를 이어 붙이고 화면에서 읽음)"""
+
+    def __init__(self, key):
+        self.key = key
+        self.text = ""
+        self.started_at = None  # 호출 시작 시각 (호출 속도 제한 대기 시간은 제외)
+        self.first_token_at = None
+        self.finished_at = None
+
+    def start(self):
+        # 재시도로 다시 호출될 때는 앞 시도에서 받은 조각을 버리고 처음부터 받음 (시작 시각은 첫 시도 기준)
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        self.text = ""
+        self.first_token_at = None
+
+    def append(self, chunk):
+        if not chunk:
+            return
+        if self.first_token_at is None:
+            self.first_token_at = time.monotonic()
+        # 문자열 대입은 원자적이므로 읽는 쪽은 잠금 없이 항상 온전한 앞부분을 봄
+        self.text += chunk
+
+    def finish(self):
+        self.finished_at = time.monotonic()
+
+    @property
+    def started(self):
+        return self.started_at is not None
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    @property
+    def time_to_first_token(self):
+        """첫 청크까지 걸린 시간(초). 아직 받지 못했으면 None"""
+        return None if self.first_token_at is None else self.first_token_at - self.started_at
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+
+def run_bulk(items, fn, progress):
+    """
+    items 각각에 fn(item) 을 최대 progress.max_concurrency 개씩 동시에 실행합니다.
+    fn 이 참을 반환하면 성공, 거짓을 반환하거나 예외가 나면 실패로 집계합니다.
+    (호출 속도 제한은 fn 안에서 TokenBucket.acquire() 로 처리)
+    """
+
+    def run_one(item):
+        ok = False
+        try:
+            ok = bool(fn(item))
+        except Exception:
+            logger.exception("일괄 작업 항목 실패 [%s] %s", progress.batch_id, item)
+        progress.record(ok)
+
+    try:
+        with ThreadPoolExecutor(max_workers=progress.max_concurrency,
+                                thread_name_prefix=f"r2bf-bulk-{progress.batch_id}") as pool:
+            list(pool.map(run_one, items))
+    finally:
+        progress.finished_at = time.monotonic()
+        logger.info("일괄 작업 완료 [%s] 성공 %d / 실패 %d, %.1f초, %.1f건/분", progress.batch_id,
+                    progress.succeeded, progress.failed, progress.elapsed, progress.throughput_per_minute)
+    return progress
@@ -0,0 +1,318 @@
+import glob
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: 잠금 없이 동작
+    fcntl = None
+
+from store import DATA_DIR
+
+# ----------------------------------------------------------------------
+# 인증서 변경 이벤트 저널 (append-only JSONL 세그먼트 + 스냅숏)
+# ----------------------------------------------------------------------
+# 저장소의 모든 쓰기 트랜잭션은 커밋 직전에 한 줄의 레코드로 저널에 먼저 기록되며, 커밋이 실패하면 그 레코드를 지웁니다.
+#     {"lsn": 42, "ts": 1760000000.0, "ops": [{"op": "status", "cert_id": ..., "status": ...}, ...]}
+# SQLite 저장소는 저널을 재생한 결과(projection)이며, 마지막으로 반영한 lsn 을 함께 기록해 두므로
+# 저장소가 유실되거나 저널보다 뒤처지면 최근 스냅숏 + 그 이후 저널만 재생해 복구합니다.
+# 한 프로세스만 저널에 쓸 수 있도록 저널 디렉터리의 LOCK 파일을 배타적으로 잠급니다. (Streamlit 서버 한 개)
+# 서버가 떠 있는 동안 bulk_import.py 같은 다른 프로세스가 저널을 열면 JournalLocked 로 바로 실패합니다.
+
+JOURNAL_DIR = os.path.join(DATA_DIR, "journal")
+
+# 세그먼트 하나의 최대 크기. 넘으면 새 세그먼트로 넘어갑니다.
+SEGMENT_BYTES = 8 * 1024 * 1024
+
+# 이 간격(초)마다 모아서 fsync. 그 사이 전원이 꺼지면 마지막 간격만큼의 레코드를 잃을 수 있습니다.
+# (SQLite WAL + synchronous=NORMAL 과 같은 수준)
+FSYNC_INTERVAL = float(os.environ.get("R2BF_JOURNAL_FSYNC_INTERVAL", "0.05"))
+
+# 마지막 스냅숏 이후 이만큼 레코드가 쌓이면 새 스냅숏을 만들고 지난 세그먼트를 정리
+SNAPSHOT_EVERY = int(os.environ.get("R2BF_JOURNAL_SNAPSHOT_EVERY", "5000"))
+
+logger = logging.getLogger(__name__)
+
+
+def _lsn_of(path):
+    """segment-000000000042.jsonl -> 42"""
+    return int(os.path.basename(path).split("-")[1].split(".")[0])
+
+
+def _iter_lines(path):
+    """파일을 mmap 으로 열어 줄 단위로 (bytes) 흘려보냅니다."""
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while True:
+            end = mm.find(b"\n", start)
+            if end < 0:
+                # 마지막 줄이 개행 없이 끝났으면 기록 도중 중단된 레코드이므로 무시
+                return
+            yield mm[start:end]
+            start = end + 1
+
+
+class JournalLocked(RuntimeError):
+    """다른 프로세스가 이미 저널을 쓰고 있을 때"""
+
+    def __init__(self, directory):
+        super().__init__(f"다른 프로세스가 저널({directory})을 쓰고 있습니다. 실행 중인 서버를 멈춘 뒤 다시 시도해 주세요.")
+        self.directory = directory
+
+
+def _lock_directory(directory):
+    """저널 디렉터리의 LOCK 파일을 배타적으로 잠그고 그 파일을 반환합니다. (닫으면 풀림)"""
+    lock_file = open(os.path.join(directory, "LOCK"), "a")
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise JournalLocked(directory) from None
+    return lock_file
+
+
+class Journal:
+    """
+    append-only 저널. 세그먼트 파일은 첫 레코드의 lsn 으로 이름을 붙이며 (segment-<lsn>.jsonl),
+    append() 는 OS 버퍼까지만 쓰고 fsync 는 백그라운드 스레드가 FSYNC_INTERVAL 마다 모아서 합니다.
+    """
+
+    def __init__(self, directory=JOURNAL_DIR, segment_bytes=SEGMENT_BYTES, fsync_interval=FSYNC_INTERVAL):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self._lock_file = _lock_directory(directory)
+        self._lock = threading.Lock()
+        self._file = None
+        self._last_offset = None  # 마지막 레코드를 쓰기 전 세그먼트 크기 (discard 용)
+        self._dirty = False
+        self.last_lsn = self._recover_last_lsn()
+        self._closed = threading.Event()
+        self._flusher = None
+        if fsync_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, args=(fsync_interval,),
+                                             name="r2bf-journal-fsync", daemon=True)
+            self._flusher.start()
+
+    # --- 파일 ---
+
+    def segments(self):
+        return sorted(glob.glob(os.path.join(self.directory, "segment-*.jsonl")), key=_lsn_of)
+
+    def snapshots(self):
+        return sorted(glob.glob(os.path.join(self.directory, "snapshot-*.jsonl")), key=_lsn_of)
+
+    def _recover_last_lsn(self):
+        """마지막 세그먼트의 마지막 온전한 레코드 lsn (세그먼트가 없으면 최근 스냅숏 lsn)"""
+        last = max((_lsn_of(path) for path in self.snapshots()), default=0)
+        for path in reversed(self.segments()):
+            for line in _iter_lines(path):
+                try:
+                    last = max(last, json.loads(line)["lsn"])
+                except ValueError:
+                    break
+            if last >= _lsn_of(path):
+                break
+        return last
+
+    def _open_segment(self, first_lsn):
+        if self._file is not None:
+            self._sync_locked()
+            self._file.close()
+        path = os.path.join(self.directory, f"segment-{first_lsn:012d}.jsonl")
+        self._file = open(path, "ab")
+
+    # --- 쓰기 ---
+
+    def append(self, ops):
+        """한 트랜잭션의 변경 목록을 레코드 하나로 기록하고 lsn 을 반환합니다."""
+        with self._lock:
+            lsn = self.last_lsn + 1
+            line = json.dumps({"lsn": lsn, "ts": time.time(), "ops": ops}, ensure_ascii=False,
+                              separators=(",", ":")).encode("utf-8") + b"\n"
+            if self._file is None or self._file.tell() + len(line) > self.segment_bytes:
+                self._open_segment(lsn)
+            self._last_offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            self._dirty = True
+            self.last_lsn = lsn
+            return lsn
+
+    def discard(self, lsn):
+        """
+        방금 append() 한 레코드를 지웁니다. 저장소 커밋이 실패했을 때 호출해,
+        커밋되지 않은 변경이 다음 시작 때 재생되지 않도록 합니다.
+        """
+        with self._lock:
+            if lsn != self.last_lsn or self._last_offset is None:
+                raise ValueError(f"마지막 레코드만 지울 수 있습니다: lsn={lsn}, 마지막 lsn={self.last_lsn}")
+            if self._last_offset == 0:
+                # 이 레코드로 새로 연 세그먼트는 통째로 지움
+                path = self._file.name
+                self._file.close()
+                self._file = None
+                os.remove(path)
+            else:
+                self._file.truncate(self._last_offset)
+                self._file.seek(self._last_offset)
+                self._dirty = True
+            self._last_offset = None
+            self.last_lsn = lsn - 1
+
+    def _sync_locked(self):
+        if self._dirty and self._file is not None:
+            os.fsync(self._file.fileno())
+            self._dirty = False
+
+    def sync(self):
+        with self._lock:
+            self._sync_locked()
+
+    def _flush_loop(self, interval):
+        while not self._closed.wait(interval):
+            try:
+                self.sync()
+            except (OSError, ValueError):
+                logger.exception("저널 fsync 실패")
+
+    def close(self):
+        self._closed.set()
+        with self._lock:
+            self._sync_locked()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if not self._lock_file.closed:
+                self._lock_file.close()
+
+    # --- 읽기 ---
+
+    def replay(self, after_lsn=0):
+        """after_lsn 이후 레코드를 lsn 순서대로 흘려보냅니다. 해당 lsn 이 없는 세그먼트는 열지 않습니다."""
+        segments = self.segments()
+        for i, path in enumerate(segments):
+            if i + 1 < len(segments) and _lsn_of(segments[i + 1]) <= after_lsn + 1:
+                continue
+            for line in _iter_lines(path):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if record["lsn"] > after_lsn:
+                    yield record
+
+    def advance_to(self, lsn):
+        """저장소가 저널보다 앞서 있을 때 (저널 유실) 이후 lsn 이 겹치지 않도록 맞춤"""
+        with self._lock:
+            self.last_lsn = max(self.last_lsn, lsn)
+
+    def first_lsn(self):
+        """저널에 남아 있는 가장 오래된 레코드 lsn (없으면 None)"""
+        segments = self.segments()
+        return _lsn_of(segments[0]) if segments else None
+
+    # --- 스냅숏 / 정리 ---
+
+    def write_snapshot(self, lsn, certs):
+        """
+        lsn 시점의 전체 인증서 상태를 스냅숏으로 기록합니다. 첫 줄은 머리글이며,
+        임시 파일에 다 쓴 뒤 이름을 바꾸므로 중간에 중단돼도 불완전한 스냅숏은 남지 않습니다.
+        """
+        path = os.path.join(self.directory, f"snapshot-{lsn:012d}.jsonl")
+        tmp_path = path + ".tmp"
+        count = 0
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps({"lsn": lsn, "created_at": time.time()}).encode("utf-8") + b"\n")
+            for cert in certs:
+                f.write(json.dumps(cert, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return path, count
+
+    def latest_snapshot(self):
+        snapshots = self.snapshots()
+        return snapshots[-1] if snapshots else None
+
+    def read_snapshot(self, path):
+        """(lsn, 인증서 제너레이터)"""
+        lines = _iter_lines(path)
+        header = json.loads(next(lines))
+        return header["lsn"], (json.loads(line) for line in lines)
+
+    def compact(self, keep_snapshots=2):
+        """
+        최근 스냅숏 이전의 레코드만 담은 세그먼트와 오래된 스냅숏을 지웁니다.
+        (지울 세그먼트: 다음 세그먼트의 첫 lsn 이 스냅숏 lsn + 1 이하인 것)
+        """
+        snapshots = self.snapshots()
+        if not snapshots:
+            return 0
+        snapshot_lsn = _lsn_of(snapshots[-1])
+        removed = 0
+        with self._lock:
+            segments = self.segments()
+            for path, next_path in zip(segments, segments[1:]):
+                if _lsn_of(next_path) <= snapshot_lsn + 1:
+                    os.remove(path)
+                    removed += 1
+        for path in snapshots[:-keep_snapshots]:
+            os.remove(path)
+        return removed
+
+
+class Compactor:
+    """
+    백그라운드에서 주기적으로 스냅숏을 만들고 지난 세그먼트를 정리합니다.
+    스냅숏은 store.export_snapshot() 의 일관된 읽기 시점을 사용하므로 쓰기를 막지 않습니다.
+    """
+
+    def __init__(self, store, journal, snapshot_every=SNAPSHOT_EVERY, check_interval=10.0):
+        self.store = store
+        self.journal = journal
+        self.snapshot_every = snapshot_every
+        self.check_interval = check_interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="r2bf-journal-compactor", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _snapshot_lsn(self):
+        latest = self.journal.latest_snapshot()
+        return _lsn_of(latest) if latest else None
+
+    def due(self):
+        snapshot_lsn = self._snapshot_lsn()
+        return snapshot_lsn is None or self.journal.last_lsn - snapshot_lsn >= self.snapshot_every
+
+    def run_once(self):
+        lsn, certs = self.store.export_snapshot()
+        started = time.perf_counter()
+        _, count = self.journal.write_snapshot(lsn, certs)
+        removed = self.journal.compact()
+        logger.info("저널 스냅숏 lsn=%d, 인증서 %d건, 세그먼트 %d개 정리 (%.2f초)", lsn, count, removed,
+                    time.perf_counter() - started)
+
+    def _loop(self):
+        while True:
+            try:
+                if self.due():
+                    self.run_once()
+            except Exception:
+                logger.exception("저널 스냅숏/정리 실패")
+            if self._stop.wait(self.check_interval):
+                return
@@ -0,0 +1,263 @@
+import argparse
+import os
+import re
+import sys
+import time
+import unicodedata
+from collections import deque
+from functools import lru_cache
+
+# ----------------------------------------------------------------------
+# '대체' 문장 누출 검사 (Aho-Corasick 다중 패턴 매칭)
+# ----------------------------------------------------------------------
+# 프롬프트 규칙 1 (삭제된 데이터를 암시하지 말 것) 을 R2BF 가 눈으로 읽기 전에 자동으로 확인합니다.
+# 검사어는 (1) 삭제 데이터에서 뽑은 단어 (조사·어미를 뗀 어간, 일반 명사 GENERIC_TERMS 제외) 와
+# (2) 민감 검사어 사전 (DEFAULT_LEAK_TERMS + R2BF_LEAK_TERMS_FILE 파일, 한 줄에 하나, # 주석) 입니다.
+# 검사어 집합마다 오토마톤을 한 번 만들어 캐시하므로, 문장 하나는 길이에 비례하는 시간에 한 번 훑습니다.
+#
+# 사용법 (저장된 '대체(안)' 일괄 검사):
+#     python leakcheck.py
+#     python leakcheck.py --all --terms extra_terms.txt
+
+# 민감 검사어 기본값: 특정 지역을 가리키는 표현 (프롬프트 규칙 1 의 예)
+DEFAULT_LEAK_TERMS = (
+    "서울", "부산", "대구", "인천", "광주", "대전", "울산", "세종", "경기도", "강원", "충북", "충남", "충청",
+    "전북", "전남", "전라", "경북", "경남", "경상", "제주", "강남", "강북", "수도권", "비수도권",
+)
+
+LEAK_TERMS_FILE = os.environ.get("R2BF_LEAK_TERMS_FILE") or None
+
+# 삭제 데이터에 흔히 들어가지만 그 자체로는 누출이 아닌 일반 명사
+GENERIC_TERMS = frozenset((
+    "데이터", "데이터셋", "자료", "정보", "원인", "편향", "편향성", "관련", "목록", "기록", "내역", "모델",
+    "학습", "샘플", "전체", "일부", "기반", "고객", "대출", "사용자", "이용자", "신청자", "회원", "개인", "이력",
+    "내용", "항목", "결과", "기간", "건수",
+))
+
+# 삭제 데이터의 어절 끝에서 떼어 낼 조사·어미 (긴 것부터 검사). "마포구에" -> "마포구", "거주자들의" -> "거주자"
+SUFFIXES = tuple(sorted((
+    "에서는", "에게서", "으로는", "으로서", "으로써", "에서", "에게", "한테", "으로", "로서", "로써", "까지", "부터",
+    "에는", "이나", "이며", "이고", "처럼", "보다", "만큼", "하는", "하던", "했던", "되는", "된", "의", "에", "을",
+    "를", "이", "가", "은", "는", "와", "과", "로", "도", "만", "들",
+), key=len, reverse=True))
+
+# 삭제 데이터에서 뽑는 단어의 최소 길이 (문자)
+MIN_TERM_LENGTH = 2
+
+_WORD_RE = re.compile(r"[0-9a-z가-힣一-鿿]+")
+
+
+def _lower(text):
+    # 위치가 바뀌지 않도록 글자 수가 그대로인 소문자 변환만 적용 (원문 구간 표시에 사용)
+    return "".join(ch if len(low := ch.lower()) != 1 else low for ch in text)
+
+
+def _chunks(text):
+    """NFC 조합이 걸칠 수 없는 경계(결합 문자, 한글 중성·종성 자모가 아닌 글자 앞)로 나눈 원문 구간들"""
+    start = 0
+    for i in range(1, len(text) + 1):
+        if i == len(text) or not (unicodedata.combining(text[i]) or "\u1160" <= text[i] <= "\u11ff"):
+            yield start, i
+            start = i
+
+
+def _fold(text):
+    """
+    NFC 정규화 + 소문자 변환한 문자열과, 정규화로 글자 수가 바뀐 경우 그 글자마다 원문의 (시작, 끝) 위치.
+    (macOS 등에서 붙여 넣은 NFD 한글도 검사어와 맞도록 하되, 일치 구간은 원문 위치로 돌려줌)
+    """
+    if unicodedata.is_normalized("NFC", text):
+        return _lower(text), None
+    chars, positions = [], []
+    for start, end in _chunks(text):
+        for ch in unicodedata.normalize("NFC", text[start:end]):
+            chars.append(ch)
+            positions.append((start, end))
+    return _lower("".join(chars)), positions
+
+
+def normalize_term(term):
+    return unicodedata.normalize("NFC", term).strip().lower()
+
+
+def stem(word):
+    """어절 끝의 조사·어미를 뗌 (두 번까지, 남는 어간이 MIN_TERM_LENGTH 보다 짧아지면 떼지 않음)"""
+    for _ in range(2):
+        for suffix in SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= MIN_TERM_LENGTH:
+                word = word[:-len(suffix)]
+                break
+        else:
+            break
+    return word
+
+
+def deleted_terms(deleted_data_text):
+    """삭제 데이터에서 뽑은 검사어 (어간 기준, 일반 명사, 짧은 단어 제외)"""
+    words = (stem(word) for word in _WORD_RE.findall(normalize_term(deleted_data_text or "")))
+    return tuple(dict.fromkeys(word for word in words
+                               if len(word) >= MIN_TERM_LENGTH and word not in GENERIC_TERMS))
+
+
+def load_terms(path):
+    """검사어 사전 파일 (한 줄에 하나, 빈 줄과 # 주석 무시)"""
+    with open(path, encoding="utf-8") as f:
+        return tuple(term for term in (normalize_term(line.split("#", 1)[0]) for line in f) if term)
+
+
+@lru_cache(maxsize=1)
+def sensitive_terms():
+    terms = tuple(normalize_term(term) for term in DEFAULT_LEAK_TERMS)
+    if LEAK_TERMS_FILE:
+        terms += load_terms(LEAK_TERMS_FILE)
+    return tuple(dict.fromkeys(terms))
+
+
+class Matcher:
+    """Aho-Corasick 오토마톤. find() 는 겹치는 일치까지 모두 (시작, 끝, 검사어) 로 돌려줍니다."""
+
+    def __init__(self, terms):
+        self._goto = [{}]  # 상태 -> {글자: 다음 상태}
+        self._fail = [0]
+        self._out = [()]  # 상태 -> 이 상태에서 끝나는 검사어들
+        for term in terms:
+            if term:
+                self._add(term)
+        self._build()
+
+    def _add(self, term):
+        state = 0
+        for ch in term:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        if term not in self._out[state]:
+            self._out[state] += (term,)
+
+    def _build(self):
+        # 너비 우선으로 실패 링크를 잇고, 실패 링크 쪽 출력을 합쳐 둠 (검색 중 링크를 따라가지 않도록)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def find(self, text):
+        goto, fail, out = self._goto, self._fail, self._out
+        folded, positions = _fold(text)
+        matches = []
+        state = 0
+        for end, ch in enumerate(folded, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for term in out[state]:
+                start = end - len(term)
+                if positions is None:
+                    matches.append((start, end, term))
+                else:
+                    matches.append((positions[start][0], positions[end - 1][1], term))
+        return matches
+
+
+@lru_cache(maxsize=4096)
+def matcher_for(deleted_data_text):
+    """삭제 데이터별 오토마톤 (민감 검사어 사전 포함, 같은 삭제 데이터는 재사용)"""
+    return Matcher(deleted_terms(deleted_data_text) + sensitive_terms())
+
+
+def scan(text, deleted_data_text):
+    """'대체' 문장에서 누출 의심 구간 [(시작, 끝, 검사어)] (없으면 빈 목록)"""
+    if not text:
+        return []
+    return matcher_for(deleted_data_text).find(text)
+
+
+def leaked_terms(matches):
+    return list(dict.fromkeys(term for _, _, term in matches))
+
+
+def scan_many(items):
+    """[(cert_id, 문장, 삭제 데이터)] 일괄 검사 -> {cert_id: 일치 목록} (누출 의심이 있는 것만)"""
+    found = {}
+    for cert_id, text, deleted_data_text in items:
+        matches = scan(text, deleted_data_text)
+        if matches:
+            found[cert_id] = matches
+    return found
+
+
+def merge_spans(matches):
+    """겹치거나 맞닿은 일치 구간을 합침"""
+    spans = []
+    for start, end, _ in sorted(matches):
+        if spans and start <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], end)
+        else:
+            spans.append([start, end])
+    return spans
+
+
+def highlight(text, matches, mark=":red-background[{}]"):
+    """누출 의심 구간을 mark 형식으로 감싼 문자열 (기본: Streamlit 마크다운 빨간 배경)"""
+    parts, last = [], 0
+    for start, end in merge_spans(matches):
+        parts.append(text[last:start])
+        parts.append(mark.format(text[start:end]))
+        last = end
+    parts.append(text[last:])
+    return "".join(parts)
+
+
+# ----------------------------------------------------------------------
+# CLI (저장된 '대체(안)' 일괄 검사)
+# ----------------------------------------------------------------------
+
+def main():
+    from store import CertificateStore, DB_PATH
+
+    parser = argparse.ArgumentParser(description="'대체' 문장 누출 일괄 검사")
+    parser.add_argument("--all", action="store_true", help="완료된 인증서의 최종 '대체' 문장까지 검사")
+    parser.add_argument("--terms", help="추가 검사어 사전 파일 (R2BF_LEAK_TERMS_FILE 대신)")
+    args = parser.parse_args()
+
+    if args.terms:
+        global LEAK_TERMS_FILE
+        LEAK_TERMS_FILE = args.terms
+        sensitive_terms.cache_clear()
+        matcher_for.cache_clear()
+
+    store = CertificateStore(DB_PATH)
+    try:
+        statuses = ["Pending_Substitute_Review_MLOps", "Pending_Substitute_Approval"]
+        items = []
+        for cert in store.iter_all():
+            if cert.current_status in statuses and cert.internal_ai_suggestion:
+                items.append((cert.cert_id, cert.internal_ai_suggestion, cert.deleted_data))
+            elif args.all and cert.replacement_data:
+                items.append((cert.cert_id, cert.replacement_data, cert.deleted_data))
+    finally:
+        store.close()
+
+    started = time.perf_counter()
+    found = scan_many(items)
+    elapsed = time.perf_counter() - started
+    for cert_id, matches in found.items():
+        print(f"{cert_id}\t{', '.join(leaked_terms(matches))}")
+    print(f"{len(items)}건 검사, 누출 의심 {len(found)}건 ({elapsed:.2f}초, {len(items) / elapsed if elapsed else 0:.0f}건/초)",
+          file=sys.stderr)
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
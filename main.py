@@ -1,43 +1,291 @@
 import streamlit as st
 import google.generativeai as genai
+import io
+import logging
+import os
+import shlex
 import time
 import uuid
 import datetime
+import functools
+from contextlib import contextmanager
+
+import audit
+import dedup
+import leakcheck
+import search
+from ai_cache import ReplacementCache, cache_key
+from bulk_import import IMPORT_DIR, ImportFormatError, ImportProgress, detect_format, import_requests, new_import_id
+from candidates import DEFAULT_CANDIDATES, CandidatePool, rank_candidates
+from export import FORMATS as EXPORT_FORMATS, export_file_name, parquet_available, write_export
+from gemini import GeminiCallError, GeminiCaller, GeminiClientRegistry, classify, request_options
+from journal import Compactor, Journal
+from jobs import BulkProgress, GenerationStream, JobAlreadyRunning, JobRunner, TokenBucket, run_bulk
+from metrics import METRICS_FILE, METRICS_PORT, MetricsExporter, MetricsRegistry
+from models import Certificate, LogEntry, Status, new_cert_id, to_micros
+from store import CertificateStore, DB_PATH, PAGE_SIZE, Page, StatusConflict, is_terminal
+from unlearning import COMPLETED, CANCELLED, UnlearningExecutor
+
+logger = logging.getLogger(__name__)
 
 # ----------------------------------------------------------------------
 # 0. 앱 설정 및 세션 상태 초기화
 # ----------------------------------------------------------------------
 st.set_page_config(layout="wide", page_title="AI 거버넌스 대시보드 (Final Ver)")
 
-# 'R2BF 인증서' DB
-if "certificate_db" not in st.session_state:
-    st.session_state.certificate_db = {}
-
-    # --- 예시 데이터 ---
-    example_id = "CERT-2025-001"
-    example_time = (datetime.datetime.now() - datetime.timedelta(days=1)).isoformat()
-    st.session_state.certificate_db[example_id] = {
-        "cert_id": example_id,
-        "requester_id": "김감사 (AI 윤리팀)",
-        "operator_id": None,
-        "approver_id": None,
-        "completion_date": None,
-        "content": {
-            "model_name": "신용평가 AI 모델",
-            "deleted_data": "구(舊) 주소 데이터셋 (편향성 원인)",
-            "replacement_data": None
-        },
-        "log": [
-            {"timestamp": example_time, "status": "Pending_Forget", "actor": "김감사 (AI 윤리팀)", "message": "신규 '잊힘' 요청 발행"}
-        ],
-        "current_status": "Pending_Forget",
-        "internal_ai_suggestion": None
-    }
-    # --- ---
+# 이번 화면 재실행 시작 시각 (스크립트 끝에서 r2bf_rerun_seconds 로 기록)
+rerun_started = time.perf_counter()
+
+
+# 핫 패스 계측 (모든 세션 공유). R2BF_METRICS_PORT / R2BF_METRICS_FILE 을 설정하면 Prometheus 형식으로 노출
+@st.cache_resource
+def get_metrics():
+    registry = MetricsRegistry()
+    registry.describe("r2bf_rerun_seconds", "화면 스크립트 전체 재실행 시간")
+    registry.describe("r2bf_render_seconds", "탭별 렌더링 시간")
+    registry.describe("r2bf_fragment_seconds", "큐별 fragment 렌더링 시간 (부분 재실행 포함)")
+    registry.describe("r2bf_callback_seconds", "버튼 콜백 실행 시간")
+    registry.describe("r2bf_queue_load_seconds", "큐/목록 페이지 조회 시간")
+    registry.describe("r2bf_gemini_request_seconds", "Gemini '대체' 생성 호출 시간")
+    registry.describe("r2bf_export_seconds", "인증서 내보내기 파일 생성 시간")
+    registry.describe("r2bf_duplicate_lookup_seconds", "신규 요청 유사 중복 조회 시간")
+    registry.describe("r2bf_audit_verify_seconds", "인증서 목록 페이지 무결성 검증 시간")
+    MetricsExporter(registry).start()
+    return registry
+
+
+metrics = get_metrics()
+
+# 'R2BF 인증서' DB (모든 세션이 공유하는 SQLite 저장소, 변경 이력은 저널에 먼저 기록)
+@st.cache_resource
+def get_store():
+    journal = Journal()
+    store = CertificateStore(DB_PATH, journal=journal)
+    # 저장소가 저널보다 뒤처져 있으면 (비정상 종료, DB 유실) 스냅숏 + 저널 재생으로 복구
+    store.recover()
+    Compactor(store, journal).start()
+
+    if store.count() == 0:
+        # --- 예시 데이터 ---
+        example_id = "CERT-2025-001"
+        example_time = (datetime.datetime.now() - datetime.timedelta(days=1)).isoformat()
+        store.insert(Certificate(
+            cert_id=example_id,
+            requester_id="김감사 (AI 윤리팀)",
+            operator_id=None,
+            approver_id=None,
+            completion_date=None,
+            model_name="신용평가 AI 모델",
+            deleted_data="구(舊) 주소 데이터셋 (편향성 원인)",
+            replacement_data=None,
+            current_status=Status.PENDING_FORGET,
+            internal_ai_suggestion=None,
+            log=[LogEntry(to_micros(example_time), Status.PENDING_FORGET, "김감사 (AI 윤리팀)", "신규 '잊힘' 요청 발행")]
+        ))
+        # --- ---
+    return store
+
+
+store = get_store()
+
+
+# '인증서 조회' 탭 검색 인덱스 (저장소 변경을 구독하여 증분 갱신)
+@st.cache_resource
+def get_search_index():
+    return get_store().attach_index(search.SearchIndex())
+
+
+search_index = get_search_index()
+
+
+# '잊힘' 요청 유사 중복 탐지 인덱스 (대상 모델별 MinHash LSH, 저장소 변경을 구독하여 증분 갱신)
+@st.cache_resource
+def get_duplicate_index():
+    return get_store().attach_index(dedup.DuplicateIndex())
+
+
+duplicate_index = get_duplicate_index()
+
+
+# 처리 로그 무결성 전역 Merkle 트리 (저장소 변경을 구독하여 증분 갱신)
+@st.cache_resource
+def get_audit_index():
+    return get_store().attach_index(audit.AuditIndex(), lambda: get_store().iter_audit(with_logs=False),
+                                    lambda cert_ids: get_store().audit_records(cert_ids, with_logs=False))
+
+
+audit_index = get_audit_index()
+
+# '대체' AI 제안 생성 등 백그라운드 작업 실행기 (모든 세션이 공유)
+@st.cache_resource
+def get_job_runner():
+    # 이전 프로세스에서 생성 중이던 인증서는 이어받을 작업이 없으므로 생성 전 상태로 되돌림
+    for cert in get_store().by_status("Substituting_In_Progress"):
+        previous_status = "Pending_Substitute_Review_MLOps" if cert.internal_ai_suggestion else "Pending_Substitute"
+        get_store().transition(cert.cert_id, "Substituting_In_Progress", previous_status, "시스템",
+                               "앱 재시작으로 중단된 '대체' AI 제안 생성 작업을 되돌립니다.")
+    return JobRunner()
+
+
+job_runner = get_job_runner()
+
+
+def on_unlearning_progress(cert_ids, percent, message, batch_id):
+    """[작업 실행기 스레드] '잊힘' 묶음 작업의 진행 상황을 묶음의 각 인증서 로그에 기록"""
+    timestamp = datetime.datetime.now().isoformat()
+    with get_store().transaction():
+        for cert_id in cert_ids:
+            get_store().append_log(cert_id, timestamp, "Forgetting_In_Progress", "박엔진 (MLOps팀)",
+                                   f"'잊힘' 진행 {percent}% (묶음 [{batch_id}]): {message}")
+
+
+def on_unlearning_done(cert_ids, outcome, detail, batch_id):
+    """[작업 실행기 스레드] '잊힘' 작업이 끝난 뒤에만 묶음의 각 인증서를 다음 상태로 전이"""
+    operator_name = "박엔진 (MLOps팀)"
+    timestamp = datetime.datetime.now().isoformat()
+    if outcome == COMPLETED:
+        status, message = "Pending_Forget_Approval", f"'잊힘' 수행 완료 (묶음 [{batch_id}], {len(cert_ids)}건). R2BF '잊힘' 승인 대기"
+    elif outcome == CANCELLED:
+        status, message = "Pending_Forget", f"'잊힘' 작업 취소 (묶음 [{batch_id}])"
+    else:
+        status, message = "Pending_Forget", f"'잊힘' 수행 실패 (묶음 [{batch_id}]): {detail}"
+    # 그 사이 취소 등으로 이미 되돌려진 인증서는 건너뜀
+    get_store().transition_many(cert_ids, "Forgetting_In_Progress", status, operator_name, message, timestamp=timestamp)
+
+
+# '잊힘' 작업 실행기 (UI 와 분리된 프로세스 풀, 모든 세션이 공유)
+@st.cache_resource
+def get_unlearning_executor():
+    # 이전 프로세스에서 수행 중이던 '잊힘' 작업은 이어받을 수 없으므로 대기 상태로 되돌림
+    for cert_id in get_store().ids_by_status("Forgetting_In_Progress"):
+        get_store().transition(cert_id, "Forgetting_In_Progress", "Pending_Forget", "시스템",
+                               "앱 재시작으로 중단된 '잊힘' 작업을 되돌립니다.")
+    return UnlearningExecutor(on_unlearning_progress, on_unlearning_done)
+
+
+unlearning_executor = get_unlearning_executor()
+
+
+# Gemini 모델별 호출 속도 제한 (API 할당량은 프로세스 전체가 공유하므로 모든 세션이 같은 버킷 사용)
+# 한도는 서버 설정(GEMINI_RPM)으로만 정하며, 화면에서는 바꾸지 않음
+@st.cache_resource
+def get_rate_limiter(model_id):
+    return TokenBucket(model_rpm(model_id))
+
+
+# '대체' AI 제안 캐시 (모든 세션 공유, 디스크에 보관되어 재시작 후에도 유지)
+@st.cache_resource
+def get_ai_cache():
+    cache = ReplacementCache()
+    # 만료된 항목은 조회 시 무시될 뿐 디스크에 남으므로 시작할 때 정리
+    cache.purge_expired()
+    return cache
+
+
+ai_cache = get_ai_cache()
+
+
+# Gemini 클라이언트 (API 키별 연결을 모든 세션과 재실행이 공유)
+@st.cache_resource
+def get_gemini_registry():
+    return GeminiClientRegistry()
+
+
+gemini_registry = get_gemini_registry()
+
+
+# Gemini 호출 래퍼 (마감 시간 / 재시도 / 모델별 회로 차단기 / 헤지 요청, 모든 세션이 공유)
+@st.cache_resource
+def get_gemini_caller():
+    return GeminiCaller()
+
 
-# API 키 및 모델 상태
+gemini_caller = get_gemini_caller()
+
+
+# 일괄 생성 진행 상황 (가장 최근 실행이 마지막)
+@st.cache_resource
+def get_bulk_runs():
+    return []
+
+
+# 일괄 요청 가져오기 진행 상황 (가장 최근 실행이 마지막)
+@st.cache_resource
+def get_import_runs():
+    return []
+
+
+# 스트리밍 생성 중인 '대체' AI 제안 (cert_id -> GenerationStream, 모든 세션이 같은 진행 상황을 봄)
+@st.cache_resource
+def get_ai_streams():
+    return {}
+
+
+ai_streams = get_ai_streams()
+
+
+# 인증서별 '대체' 후보 풀 ('AI 재탐색'을 API 호출 없이 바로 처리)
+@st.cache_resource
+def get_candidate_pool():
+    return CandidatePool()
+
+
+candidate_pool = get_candidate_pool()
+
+
+# '인증서 조회' 탭 검색 결과 최대 건수
+SEARCH_RESULT_LIMIT = 200
+
+# 신규 요청 발행 시 보여 줄 유사 중복 요청 최대 건수
+DUPLICATE_SHOW_LIMIT = 3
+
+# 승인 큐 일괄 처리 표에 보여 줄 최대 건수 (그 이상은 '큐 전체 선택'으로 처리)
+BATCH_TABLE_LIMIT = 1000
+
+# 화면에서 내려받을 수 있는 최대 인증서 수. 내려받기 파일은 서버 메모리에 통째로 올라가므로
+# 그 이상은 파일로 바로 써 나가는 CLI(export.py)를 사용
+UI_EXPORT_LIMIT = int(os.environ.get("R2BF_UI_EXPORT_LIMIT", "20000"))
+
+# 백그라운드 작업 진행 중일 때 해당 큐를 다시 그리는 주기 (초)
+SUBSTITUTE_POLL_SECONDS = 2
+FORGET_POLL_SECONDS = 1
+IMPORT_POLL_SECONDS = 1
+# AI 제안을 스트리밍으로 받는 동안에는 더 자주 다시 그려 글자가 이어지는 것처럼 보이게 함
+STREAM_POLL_SECONDS = 0.5
+# '장면 6' 요청자 모니터를 다시 그리는 주기 (초, 다른 역할이 처리한 결과 반영)
+MONITOR_REFRESH_SECONDS = int(os.environ.get("R2BF_MONITOR_REFRESH_SECONDS", "10"))
+
+# Gemini 모델별 분당 호출 한도 (무료 등급 기준). 프로세스 전체가 공유하는 서버 설정이며
+# R2BF_GEMINI_RPM="gemini-2.0-flash=30,gemini-2.5-flash=20" 으로 바꿀 수 있음
+# ('장면 4' 일괄 생성 패널의 RPM 은 이 한도 안에서 그 일괄 생성에만 적용)
+GEMINI_RPM = {"gemini-2.0-flash": 15, "gemini-2.5-flash": 10}
+GEMINI_RPM.update({name.strip(): int(rpm) for name, _, rpm in
+                   (item.partition("=") for item in os.environ.get("R2BF_GEMINI_RPM", "").split(",")) if rpm})
+DEFAULT_GEMINI_RPM = 10
+
+
+def model_rpm(model_id):
+    return GEMINI_RPM.get(model_id, DEFAULT_GEMINI_RPM)
+
+# '대체' 일괄 생성 기본 동시 실행 수
+BULK_CONCURRENCY = int(os.environ.get("R2BF_BULK_CONCURRENCY", "4"))
+
+# 후보를 여러 개 받을 때는 서로 다른 문장이 나오도록 온도를 높임
+CANDIDATE_TEMPERATURE = 0.8
+
+# AI 제안에 누출 의심 표현(leakcheck)이 있을 때 캐시 없이 다시 생성하는 최대 횟수 (Gemini 호출이 그만큼 늘어남)
+LEAK_REGENERATE_ATTEMPTS = int(os.environ.get("R2BF_LEAK_REGENERATE_ATTEMPTS", "1"))
+
+# API 키 및 모델 상태 (키 원문 대신 클라이언트 레지스트리의 키 해시를 보관)
 if "api_model" not in st.session_state:
     st.session_state.api_model = None
+if "api_key_hash" not in st.session_state:
+    st.session_state.api_key_hash = None
+if "stream_ai" not in st.session_state:
+    st.session_state.stream_ai = True
+# 유사 중복이 있어 발행을 보류한 신규 요청 (연결 / 새로 발행 선택 대기)
+if "duplicate_request" not in st.session_state:
+    st.session_state.duplicate_request = None
 
 # --- [수정] 사용할 모델을 세션 상태에 추가 ---
 if "selected_model" not in st.session_state:
@@ -50,11 +298,12 @@ if "selected_model" not in st.session_state:
 # 1. 헬퍼 함수 정의
 # ----------------------------------------------------------------------
 
-def get_ai_replacement(api_model, deleted_data_text, model_name):
-    """
-    [장면 4] MLOps가 '대체' 알고리즘 수행 시 호출하는 AI 생성 함수
-    """
-    prompt = f"""
+# 프롬프트 문구를 바꾸면 PROMPT_VERSION 도 올려야 이전 문구로 생성된 캐시가 재사용되지 않습니다.
+PROMPT_VERSION = 1
+
+
+def build_replacement_prompt(deleted_data_text, model_name):
+    return f"""
     [배경]: AI 모델 '{model_name}'에서 편향성 원인 데이터인 '{deleted_data_text}'가 '잊힘(Unlearn)' 처리되었습니다.
     [작업]: 이로 인해 발생한 지식 공백(Gap)을 채울, 윤리적이고 공정한 '대체 지식' 또는 '정책'을 생성하세요.
 
@@ -64,12 +313,135 @@ def get_ai_replacement(api_model, deleted_data_text, model_name):
 
     [생성된 대체 지식/정책]:
     """
+
+
+def get_ai_replacement(api_model, deleted_data_text, model_name, stream=None):
+    """
+    [장면 4] MLOps가 '대체' 알고리즘 수행 시 호출하는 AI 생성 함수
+    stream(GenerationStream)을 주면 응답을 청크 단위로 받아 도착하는 대로 stream 에 이어 붙입니다.
+    호출은 gemini_caller 의 마감 시간 / 재시도 / 회로 차단을 거치며, 끝내 실패하면 GeminiCallError 를 던집니다.
+    """
+    prompt = build_replacement_prompt(deleted_data_text, model_name)
+    generation_config = genai.GenerationConfig(temperature=0.3)
+
+    def call_once(timeout):
+        response = api_model.generate_content(prompt, generation_config=generation_config,
+                                              request_options=request_options(timeout))
+        return non_empty(response.text.strip())
+
+    def stream_once(timeout):
+        deadline_at = time.monotonic() + timeout
+        stream.start()
+        for chunk in api_model.generate_content(prompt, generation_config=generation_config, stream=True,
+                                                request_options=request_options(timeout)):
+            if time.monotonic() > deadline_at:
+                raise TimeoutError(f"{timeout:.1f}초 안에 응답을 다 받지 못했습니다.")
+            try:
+                stream.append(chunk.text)
+            except ValueError:
+                # 텍스트 없이 종료 사유만 담긴 청크
+                continue
+        return non_empty(stream.text.strip())
+
+    started = time.perf_counter()
+    failed = True
     try:
-        generation_config = genai.GenerationConfig(temperature=0.3)
-        response = api_model.generate_content(prompt, generation_config=generation_config)
-        return response.text.strip()
-    except Exception as e:
-        return f"[AI 생성 실패] {str(e)}"
+        if stream is None:
+            text = gemini_caller.call(model_id_of(api_model), call_once)
+        else:
+            # 스트리밍은 호출 스레드에서 청크를 받아야 하므로 헤지 없이 재시도만 함
+            text = gemini_caller.call(model_id_of(api_model), stream_once, inline=True)
+        failed = False
+        return text
+    finally:
+        metrics.observe("r2bf_gemini_request_seconds", time.perf_counter() - started, failed,
+                        model=model_id_of(api_model), mode="single" if stream is None else "stream")
+
+
+def get_ai_candidates(api_model, deleted_data_text, model_name, count=DEFAULT_CANDIDATES):
+    """
+    한 번의 호출로 '대체' 후보 count 개를 요청합니다 (candidate_count). 후보 문장 목록을 반환하며,
+    실패하면 get_ai_replacement 와 같이 GeminiCallError 를 던집니다.
+    """
+    prompt = build_replacement_prompt(deleted_data_text, model_name)
+    generation_config = genai.GenerationConfig(temperature=CANDIDATE_TEMPERATURE, candidate_count=count)
+
+    def call_once(timeout):
+        response = api_model.generate_content(prompt, generation_config=generation_config,
+                                              request_options=request_options(timeout))
+        texts = ["".join(part.text for part in candidate.content.parts).strip() for candidate in response.candidates]
+        texts = [text for text in texts if text]
+        if not texts:
+            raise GeminiCallError("empty", "응답에 후보가 없습니다.")
+        return texts
+
+    started = time.perf_counter()
+    failed = True
+    try:
+        texts = gemini_caller.call(model_id_of(api_model), call_once)
+        failed = False
+        return texts
+    finally:
+        metrics.observe("r2bf_gemini_request_seconds", time.perf_counter() - started, failed,
+                        model=model_id_of(api_model), mode="candidates")
+
+
+def non_empty(text):
+    """빈 응답(안전 필터 차단, 후보 없음)은 '대체' 문장이 아닌 오류로 다룸"""
+    if not text:
+        raise GeminiCallError("empty", "응답에 텍스트가 없습니다.")
+    return text
+
+
+def model_id_of(api_model):
+    """GenerativeModel 의 모델 ID (예: 'models/gemini-2.0-flash' -> 'gemini-2.0-flash')"""
+    return getattr(api_model, "model_name", "").removeprefix("models/")
+
+
+def get_ai_replacement_cached(api_model, deleted_data_text, model_name, use_cache=True, stream=None,
+                              candidates=1, batch_limiter=None):
+    """
+    캐시를 거치는 get_ai_replacement. (결과, 캐시 적중 여부, 남은 후보 목록)을 반환합니다.
+    use_cache=False 이면 캐시를 읽지 않고 새로 생성하며, 새 결과로 캐시를 갱신합니다.
+    candidates > 1 이면 (스트리밍이 아닐 때) 후보를 한 번에 여러 개 받아 가장 중립적인 후보를 결과로 하고
+    나머지는 남은 후보로 돌려줍니다. 누출 의심 표현이 있는 결과는 캐시하지 않으며, 생성에 실패하면 GeminiCallError.
+    batch_limiter(일괄 생성별 TokenBucket)를 주면 모델 공용 한도에 더해 그 한도도 지킵니다.
+    """
+    model_id = model_id_of(api_model)
+    key = cache_key(model_id, PROMPT_VERSION, model_name, deleted_data_text)
+    if use_cache:
+        cached = ai_cache.get(key)
+        if cached is not None and not leakcheck.scan(cached, deleted_data_text):
+            return cached, True, []
+
+    if batch_limiter is not None:
+        batch_limiter.acquire()
+    get_rate_limiter(model_id).acquire()
+    if stream is None and candidates > 1:
+        texts = get_ai_candidates(api_model, deleted_data_text, model_name, candidates)
+        ranked = [text for _, text in rank_candidates(texts, deleted_data_text)] or texts
+        # 누출 의심 표현이 없는 후보 중 가장 중립적인 것을 결과로 함
+        ranked.sort(key=lambda text: bool(leakcheck.scan(text, deleted_data_text)))
+        ai_replacement, spares = ranked[0], ranked[1:]
+    else:
+        ai_replacement, spares = get_ai_replacement(api_model, deleted_data_text, model_name, stream), []
+    if not leakcheck.scan(ai_replacement, deleted_data_text):
+        ai_cache.put(key, ai_replacement)
+    return ai_replacement, False, spares
+
+
+@contextmanager
+def timed_section(name):
+    """
+    화면 구역(탭)을 그리는 데 걸린 시간(초)을 r2bf_render_seconds 지표와
+    st.session_state.render_timings (bench.py app 에서 읽음) 에 기록
+    """
+    start = time.perf_counter()
+    try:
+        with metrics.timer("r2bf_render_seconds", section=name):
+            yield
+    finally:
+        st.session_state.setdefault("render_timings", {})[name] = time.perf_counter() - start
 
 
 def get_current_time_str():
@@ -77,75 +449,233 @@ def get_current_time_str():
     return datetime.datetime.now().isoformat()
 
 
+# --- 부분 재실행 (큐별 fragment) ---
+# 각 큐와 조회 목록은 키가 있는 fragment 로 그립니다. 큐 안의 버튼은 기본적으로 그 큐만 다시 그리고,
+# 콜백은 마지막에 refresh_queues 로 데이터를 바꾼 큐의 fragment 만 골라 다시 그립니다.
+
+def queue_fragment(key, render, run_every=None):
+    """render 를 키가 key 인 fragment 로 그림 (렌더링 시간은 r2bf_fragment_seconds)"""
+
+    def timed_render():
+        with metrics.timer("r2bf_fragment_seconds", fragment=key):
+            render()
+
+    st.fragment(timed_render, key=key, run_every=run_every)()
+
+
+def refresh_queues(*queues):
+    """
+    콜백 마지막에 호출: 앱 전체 대신 queues(fragment 키)만 다시 그립니다.
+    인증서 상태가 바뀌면 요청자 모니터와 조회 목록에도 보이므로 함께 다시 그립니다.
+    """
+    st.rerun(scope=list(dict.fromkeys((*queues, "monitor", "browse"))))
+
+
+def refresh_app():
+    """
+    백그라운드 작업을 시작한 콜백에서 호출: 진행 중인 큐의 주기적 새로고침(run_every)은
+    앱 전체 실행 때 설정되므로 앱 전체를 한 번 다시 그립니다.
+    """
+    st.rerun()
+
+
+def skip_if_stale(callback):
+    """
+    인증서 하나를 처리하는 콜백용: 다른 세션이 먼저 처리해 상태가 바뀌었으면(StatusConflict)
+    예외 대신 알림을 띄우고 큐를 새 상태로 다시 그립니다.
+    """
+
+    @functools.wraps(callback)
+    def wrapper(*args, **kwargs):
+        try:
+            return callback(*args, **kwargs)
+        except (StatusConflict, JobAlreadyRunning) as e:
+            st.toast(f"⚠️ {e}" if isinstance(e, StatusConflict) else f"⚠️ [{e}] 이미 실행 중인 작업입니다.")
+            refresh_app()
+
+    return wrapper
+
+
 # --- 콜백 함수 (각 장면의 버튼 클릭 시 작동) ---
 
+def issue_request(model_name, data_to_delete, requester_name):
+    """신규 '잊힘' 요청 인증서 발행 후 요청 양식을 비움"""
+    cert_id = new_cert_id()
+
+    store.insert(Certificate(
+        cert_id=cert_id,
+        requester_id=requester_name,
+        operator_id=None,
+        approver_id=None,
+        completion_date=None,
+        model_name=model_name,
+        deleted_data=data_to_delete,
+        replacement_data=None,
+        current_status=Status.PENDING_FORGET,
+        internal_ai_suggestion=None,
+        log=[LogEntry(to_micros(get_current_time_str()), Status.PENDING_FORGET, requester_name,
+                      "신규 '잊힘' 요청 발행")]
+    ))
+    st.session_state.req_model_name = ""
+    st.session_state.req_dataset = ""
+    st.session_state.duplicate_request = None
+    st.toast(f"✅ 인증서 [{cert_id}]가 발행되었습니다. (MLOps '잊힘' 대기)")
+    refresh_queues("request", "forget")
+
+
+@metrics.timed("r2bf_callback_seconds")
 def submit_request_callback():
     """
     [장면 1: 김감사] 삭제 요청 (인증서 발행)
+    같은 모델에 유사한 요청이 이미 있으면 발행하지 않고, 기존 인증서에 연결할지 먼저 묻습니다.
     """
     model_name = st.session_state.req_model_name
     data_to_delete = st.session_state.req_dataset
     requester_name = "김감사 (AI 윤리팀)"
 
     if model_name and data_to_delete:
-        cert_id = f"CERT-2025-{str(uuid.uuid4())[:3].upper()}"
-
-        st.session_state.certificate_db[cert_id] = {
-            "cert_id": cert_id,
-            "requester_id": requester_name,
-            "operator_id": None,
-            "approver_id": None,
-            "completion_date": None,
-            "content": {
-                "model_name": model_name,
-                "deleted_data": data_to_delete,
-                "replacement_data": None
-            },
-            "log": [
-                {"timestamp": get_current_time_str(), "status": "Pending_Forget", "actor": requester_name,
-                 "message": "신규 '잊힘' 요청 발행"}
-            ],
-            "current_status": "Pending_Forget",
-            "internal_ai_suggestion": None
-        }
-        st.session_state.req_model_name = ""
-        st.session_state.req_dataset = ""
-        st.toast(f"✅ 인증서 [{cert_id}]가 발행되었습니다. (MLOps '잊힘' 대기)")
+        with metrics.timer("r2bf_duplicate_lookup_seconds"):
+            matches = dedup.find_duplicates(duplicate_index, store, model_name, data_to_delete)
+        if matches:
+            st.session_state.duplicate_request = {
+                "model_name": model_name, "deleted_data": data_to_delete, "requester_id": requester_name,
+                "matches": [(similarity, cert.cert_id) for similarity, cert in matches[:DUPLICATE_SHOW_LIMIT]],
+            }
+            refresh_queues("request")
+            return
+        issue_request(model_name, data_to_delete, requester_name)
+
+
+@metrics.timed("r2bf_callback_seconds")
+def issue_duplicate_anyway_callback():
+    """
+    [장면 1: 김감사] 유사 요청이 있어도 새 인증서로 발행 (예: 데이터셋이 그 사이 바뀐 경우)
+    """
+    request = st.session_state.duplicate_request
+    issue_request(request["model_name"], request["deleted_data"], request["requester_id"])
+
 
+@metrics.timed("r2bf_callback_seconds")
+def link_duplicate_request_callback(cert_id, similarity):
+    """
+    [장면 1: 김감사] 새 인증서를 발행하지 않고 기존 인증서에 연결 (기존 '잊힘'/'대체' 결과를 그대로 사용)
+    처리가 끝난 인증서는 로그를 덧붙이면 발행된 해시가 바뀌므로 연결하지 않습니다.
+    """
+    request = st.session_state.duplicate_request
+    with store.transaction():
+        status = store.status_of(cert_id)
+        if not is_terminal(status):
+            store.append_log(cert_id, get_current_time_str(), status, request["requester_id"],
+                             f"중복 '잊힘' 요청 연결 (유사도 {similarity:.2f}): \"{request['deleted_data']}\". "
+                             f"새 인증서를 발행하지 않고 이 인증서의 처리 결과를 함께 사용합니다.")
+    if is_terminal(status):
+        # 그 사이 다른 세션이 처리를 끝낸 경우
+        st.toast(f"⚠️ [{cert_id}] 처리가 끝난 인증서에는 연결할 수 없습니다. 새 인증서로 발행하세요.")
+        refresh_queues("request")
+        return
+    st.session_state.req_model_name = ""
+    st.session_state.req_dataset = ""
+    st.session_state.duplicate_request = None
+    st.toast(f"🔗 새 요청을 기존 인증서 [{cert_id}]에 연결했습니다. ('잊힘' 재실행 없음)")
+    refresh_queues("request")
 
+
+def cancel_duplicate_request_callback():
+    st.session_state.duplicate_request = None
+
+
+def import_job(binary, fmt, progress):
+    """[백그라운드] 업로드된 파일의 '잊힘' 요청 일괄 발행"""
+    try:
+        import_requests(store, binary, fmt, progress)
+    except ImportFormatError as e:
+        logger.warning("일괄 가져오기 실패 [%s]: %s", progress.import_id, e)
+    logger.info("일괄 가져오기 [%s] %d행: 발행 %d, 중복 %d, 오류 %d (%.1f초)", progress.import_id, progress.rows,
+                progress.inserted, progress.duplicates, progress.invalid, progress.elapsed)
+
+
+@metrics.timed("r2bf_callback_seconds")
+def start_import_callback():
+    """
+    [장면 1: 김감사] 감사 결과 파일(CSV / JSONL)의 '잊힘' 요청 일괄 발행 (백그라운드에서 한 행씩 처리)
+    """
+    uploaded = st.session_state.import_file
+    if uploaded is None:
+        return
+    try:
+        fmt = detect_format(uploaded.name)
+    except ImportFormatError as e:
+        st.error(str(e))
+        return
+
+    import_id = new_import_id()
+    progress = ImportProgress(import_id, uploaded.size, os.path.join(IMPORT_DIR, f"{import_id}.errors.jsonl"))
+    get_import_runs().append(progress)
+    uploaded.seek(0)
+    job_runner.submit(import_id, import_job, uploaded, fmt, progress)
+    st.toast(f"[{import_id}] '{uploaded.name}' 일괄 가져오기를 시작합니다.")
+    refresh_app()
+
+
+@metrics.timed("r2bf_callback_seconds")
+@skip_if_stale
 def run_forgetting_callback(cert_id):
     """
     [장면 2: 박엔진] '잊힘' 수행 -> R2BF에 '잊힘' 승인 요청
     """
-    cert = st.session_state.certificate_db[cert_id]
     operator_name = "박엔진 (MLOps팀)"
 
-    cert["operator_id"] = operator_name
-    cert["current_status"] = "Forgetting_In_Progress"
-    st.toast(f"[{cert_id}] '잊힘' 알고리즘을 수행합니다... (시뮬레이션)")
+    # 같은 모델의 요청과 묶여 실행되며, 상태 전이는 작업이 끝난 뒤 on_unlearning_done 에서 수행
+    store.transition(cert_id, "Pending_Forget", "Forgetting_In_Progress", operator_name, operator_id=operator_name)
+    batch_id = unlearning_executor.submit(store.get(cert_id))
+    st.toast(f"[{cert_id}] '잊힘' 알고리즘을 수행합니다... (묶음 [{batch_id}])")
+    refresh_app()
+
+
+@metrics.timed("r2bf_callback_seconds")
+def run_all_forgetting_callback():
+    """
+    [장면 2: 박엔진] '잊힘 대기' 인증서 전체 수행 (대상 모델별로 묶어 모델당 한 번씩 실행)
+    """
+    operator_name = "박엔진 (MLOps팀)"
+    cert_ids = store.transition_many(store.ids_by_status("Pending_Forget", newest_first=False), "Pending_Forget",
+                                     "Forgetting_In_Progress", operator_name, operator_id=operator_name)
+    batch_ids = {unlearning_executor.submit(cert) for cert in store.get_many(cert_ids)}
+    st.toast(f"'잊힘' 작업 {len(cert_ids)}건을 모델별 {len(batch_ids)}개 묶음으로 수행합니다.")
+    refresh_app()
 
-    time.sleep(1.5)
 
-    cert["current_status"] = "Pending_Forget_Approval"
-    cert["log"].append(
-        {"timestamp": get_current_time_str(), "status": "Pending_Forget_Approval", "actor": operator_name,
-         "message": "'잊힘' 수행 완료. R2BF '잊힘' 승인 대기"})
+@metrics.timed("r2bf_callback_seconds")
+@skip_if_stale
+def cancel_forgetting_callback(cert_id):
+    """
+    [장면 2: 박엔진] 수행 중인 '잊힘' 작업 취소 (작업이 중단되면 '잊힘 대기'로 돌아감)
+    """
+    if not unlearning_executor.cancel(cert_id):
+        # 실행기에 작업이 없으면 (이미 끝났거나 유실) 바로 되돌림
+        store.transition(cert_id, "Forgetting_In_Progress", "Pending_Forget", "박엔진 (MLOps팀)",
+                         "'잊힘' 작업 취소", timestamp=get_current_time_str())
+    st.toast(f"[{cert_id}] '잊힘' 작업 취소를 요청했습니다.")
+    refresh_queues("forget")
 
 
+@metrics.timed("r2bf_callback_seconds")
+@skip_if_stale
 def approve_forget_callback(cert_id):
     """
     [장면 3: R2BF] '잊힘' 승인 -> MLOps에 '대체 작업' 요청
     """
-    cert = st.session_state.certificate_db[cert_id]
     approver_name = "R2BF 부서"
 
-    cert["current_status"] = "Pending_Substitute"
-    cert["approver_id"] = approver_name
-    cert["log"].append({"timestamp": get_current_time_str(), "status": "Pending_Substitute", "actor": approver_name,
-                        "message": "'잊힘' 승인 완료. MLOps '대체' 작업 대기."})
+    store.transition(cert_id, "Pending_Forget_Approval", "Pending_Substitute", approver_name,
+                     "'잊힘' 승인 완료. MLOps '대체' 작업 대기.", timestamp=get_current_time_str(),
+                     approver_id=approver_name)
     st.toast(f"[{cert_id}] '잊힘' 승인 완료. MLOps에 '대체' 작업을 요청합니다.")
+    refresh_queues("forget_approval", "substitute")
 
 
+@metrics.timed("r2bf_callback_seconds")
+@skip_if_stale
 def reject_forget_callback(cert_id):
     """
     [장면 3: R2BF] '잊힘' 거부 -> MLOps에 재작업 요청
@@ -157,46 +687,180 @@ def reject_forget_callback(cert_id):
         st.warning(f"[{cert_id}] 거부 사유를 반드시 작성해야 합니다.")
         return
 
-    cert = st.session_state.certificate_db[cert_id]
     approver_name = "R2BF 부서"
 
-    cert["current_status"] = "Pending_Forget"
-    cert["operator_id"] = None
-    cert["log"].append({"timestamp": get_current_time_str(), "status": "Pending_Forget", "actor": approver_name,
-                        "message": f"'잊힘' 거부 (사유: {reason}). MLOps 재작업 요청."})
+    store.transition(cert_id, "Pending_Forget_Approval", "Pending_Forget", approver_name,
+                     "'잊힘' 거부. MLOps 재작업 요청.", timestamp=get_current_time_str(), reason=reason,
+                     operator_id=None)
 
     st.session_state[reason_key] = ""
     st.toast(f"[{cert_id}] '잊힘'을 거부하고 MLOps에 재작업을 요청했습니다.")
+    refresh_queues("forget_approval", "forget")
 
 
-def run_substitute_callback(cert_id):
+def substitute_job(cert_id, api_model, done_message, batch_id=None, use_cache=True, stream=None, batch_limiter=None):
     """
-    [장면 4: 박엔진] '대체' 수행 (AI 생성 포함) -> MLOps의 자체 검토 대기
+    [백그라운드] '대체' AI 제안 생성. 성공하면 결과를 붙여 MLOps 검토 대기로 전이하고 True 를,
+    실패하면 오류 종류와 시도 횟수를 로그에 남기고 생성 실패(Substitute_Failed) 상태로 전이한 뒤 False 를 반환합니다.
+    (이전 제안이 있으면 internal_ai_suggestion 에 그대로 남아 있어 그 제안으로 검토를 이어 갈 수 있음)
+    stream 을 주면 스트리밍으로 생성하고, 첫 토큰까지의 시간과 전체 소요 시간을 로그에 남깁니다.
     """
-    if not st.session_state.api_model:
+    operator_name = "박엔진 (MLOps팀)"
+    try:
+        cert = store.get(cert_id)
+        cached, spares = False, []
+        regenerated = 0
+        try:
+            try:
+                ai_replacement, cached, spares = get_ai_replacement_cached(
+                    api_model, cert.deleted_data, cert.model_name, use_cache, stream, DEFAULT_CANDIDATES, batch_limiter)
+            finally:
+                if stream is not None:
+                    stream.finish()
+            ai_replacement, spares, regenerated = regenerate_until_clean(api_model, cert, ai_replacement, spares,
+                                                                         batch_limiter)
+            cached = cached and not regenerated
+        except Exception as e:
+            error = e if isinstance(e, GeminiCallError) else GeminiCallError(classify(e), str(e) or type(e).__name__)
+            batch_note = f" (일괄 생성 [{batch_id}])" if batch_id else ""
+            store.transition(cert_id, "Substituting_In_Progress", "Substitute_Failed", operator_name,
+                             f"'대체' AI 제안 생성 실패{batch_note}: {error.label} ({error.attempts}회 시도) - {error}",
+                             timestamp=get_current_time_str())
+            return False
+
+        if cached:
+            done_message += " (캐시된 제안 재사용)"
+        elif stream is not None and stream.time_to_first_token is not None:
+            done_message += f" (첫 토큰 {stream.time_to_first_token:.2f}초, 전체 {stream.elapsed:.2f}초)"
+        if regenerated:
+            done_message += f" (누출 의심 표현으로 자동 재생성 {regenerated}회)"
+        leaks = leakcheck.leaked_terms(leakcheck.scan(ai_replacement, cert.deleted_data))
+        if leaks:
+            done_message += f" ⚠️ 누출 의심 표현: {', '.join(leaks)}"
+        store.transition(cert_id, "Substituting_In_Progress", "Pending_Substitute_Review_MLOps", operator_name,
+                         done_message, timestamp=get_current_time_str(), internal_ai_suggestion=ai_replacement)
+        candidate_pool.mark_seen(cert_id, ai_replacement)
+        candidate_pool.add(cert_id, spares, cert.deleted_data)
+        if stream is not None and not cached:
+            # 스트리밍은 한 문장만 받으므로 재탐색에 대비한 후보는 따로 받아 둠
+            start_candidate_refill(cert_id, api_model)
+        return True
+    finally:
+        # 상태 전이가 커밋된 뒤에 지워야 화면이 스트림 대신 저장된 최종 문장을 보여줌
+        if stream is not None:
+            ai_streams.pop(cert_id, None)
+
+
+def regenerate_until_clean(api_model, cert, text, spares, batch_limiter=None):
+    """
+    AI 제안에 누출 의심 표현이 있으면 캐시 없이 다시 생성합니다. (최대 LEAK_REGENERATE_ATTEMPTS 회)
+    (결과, 남은 후보, 재생성 횟수) 를 반환하며, 다시 생성하다 실패하면 직전 결과를 그대로 둡니다.
+    """
+    attempts = 0
+    while attempts < LEAK_REGENERATE_ATTEMPTS and leakcheck.scan(text, cert.deleted_data):
+        attempts += 1
+        try:
+            new_text, _, new_spares = get_ai_replacement_cached(api_model, cert.deleted_data, cert.model_name,
+                                                                use_cache=False, candidates=DEFAULT_CANDIDATES,
+                                                                batch_limiter=batch_limiter)
+        except GeminiCallError:
+            break
+        text, spares = new_text, new_spares
+    return text, spares, attempts
+
+
+def refill_candidates(cert_id, api_model):
+    """[백그라운드] 인증서의 후보 풀을 채웁니다. (API 호출 1회, 호출 속도 제한 적용)"""
+    cert = store.get(cert_id)
+    get_rate_limiter(model_id_of(api_model)).acquire()
+    try:
+        texts = get_ai_candidates(api_model, cert.deleted_data, cert.model_name)
+    except GeminiCallError as e:
+        logger.warning("[%s] '대체' 후보 보충 실패: %s (%d회 시도) - %s", cert_id, e.label, e.attempts, e)
+        return 0
+    return candidate_pool.add(cert_id, texts, cert.deleted_data)
+
+
+def start_candidate_refill(cert_id, api_model):
+    """후보 풀 보충 작업 제출 (이미 보충 중이면 무시)"""
+    if api_model is None or DEFAULT_CANDIDATES < 1:
+        return
+    try:
+        job_runner.submit(f"candidates:{cert_id}", refill_candidates, cert_id, api_model)
+    except JobAlreadyRunning:
+        pass
+
+
+def start_substitute_job(cert_id, from_status, done_message, use_cache=True):
+    """
+    '대체' AI 제안 생성을 백그라운드 작업으로 제출합니다. 작업 동안 인증서는 Substituting_In_Progress 상태입니다.
+    지금 상태가 from_status 가 아니면 (다른 세션이 먼저 시작한 경우 등) StatusConflict.
+    """
+    store.transition(cert_id, from_status, "Substituting_In_Progress", "박엔진 (MLOps팀)")
+    # 이전 제안으로 채워진 편집 상자는 비워 두었다가 새 제안이 붙으면 다시 채움
+    st.session_state.pop(f"mlops_edit_{cert_id}", None)
+    stream = None
+    if st.session_state.stream_ai:
+        # 작업 스레드가 시작되기 전에 등록해 두어야 이번 재실행부터 스트리밍 주기로 다시 그림
+        stream = ai_streams[cert_id] = GenerationStream(cert_id)
+    job_runner.submit(cert_id, substitute_job, cert_id, st.session_state.api_model, done_message,
+                      use_cache=use_cache, stream=stream)
+
+
+@metrics.timed("r2bf_callback_seconds")
+def generate_all_substitutes_callback():
+    """
+    [장면 4: 박엔진] '대체 작업 대기' / 'AI 생성 실패' 인증서 전체의 AI 제안을 일괄 생성
+    (동시 실행 수와 이 일괄 생성의 분당 호출 한도는 일괄 생성 패널에서 설정, 모델 공용 한도 이하)
+    """
+    api_model = st.session_state.api_model
+    if not api_model:
         st.error("API 모델이 설정되지 않았습니다. API 키를 먼저 입력하세요.")
         return
 
-    cert = st.session_state.certificate_db[cert_id]
+    # 생성에 실패했던 인증서도 함께 다시 생성
+    waiting = ("Pending_Substitute", "Substitute_Failed")
     operator_name = "박엔진 (MLOps팀)"
+    batch_id = f"BULK-{datetime.datetime.now():%Y%m%d-%H%M%S}"
+    cert_ids = store.transition_many(store.ids_by_status(*waiting, newest_first=False), waiting,
+                                     "Substituting_In_Progress", operator_name,
+                                     f"'대체' AI 제안 일괄 생성 [{batch_id}] 대기열 등록", timestamp=get_current_time_str())
+    if not cert_ids:
+        return
 
-    cert["current_status"] = "Substituting_In_Progress"
-    st.toast(f"[{cert_id}] '대체' 알고리즘을 수행합니다... (AI 제안 생성 중)")
+    # 패널의 RPM 은 이 일괄 생성에만 적용 (모델 공용 한도는 서버 설정이라 이를 넘을 수 없음)
+    rate_per_minute = min(st.session_state.bulk_rpm, model_rpm(model_id_of(api_model)))
+    batch_limiter = TokenBucket(rate_per_minute)
+    progress = BulkProgress(batch_id, len(cert_ids), st.session_state.bulk_concurrency, rate_per_minute)
+    get_bulk_runs().append(progress)
+
+    done_message = f"'대체' AI 제안 생성 완료 (일괄 생성 [{batch_id}]). MLOps 자체 검토 대기"
+    job_runner.submit(batch_id, run_bulk, cert_ids,
+                      lambda cert_id: substitute_job(cert_id, api_model, done_message, batch_id,
+                                                     batch_limiter=batch_limiter),
+                      progress)
+    st.toast(f"[{batch_id}] '대체' AI 제안 {len(cert_ids)}건 일괄 생성을 시작합니다.")
+    refresh_app()
 
-    deleted_data = cert["content"]["deleted_data"]
-    model_name = cert["content"]["model_name"]
-    ai_replacement = get_ai_replacement(st.session_state.api_model, deleted_data, model_name)
-    time.sleep(1.0)
 
-    cert["internal_ai_suggestion"] = ai_replacement
-    st.session_state[f"mlops_edit_{cert_id}"] = ai_replacement
+@metrics.timed("r2bf_callback_seconds")
+@skip_if_stale
+def run_substitute_callback(cert_id):
+    """
+    [장면 4: 박엔진] '대체' 수행 (AI 생성 포함) -> MLOps의 자체 검토 대기
+    """
+    if not st.session_state.api_model:
+        st.error("API 모델이 설정되지 않았습니다. API 키를 먼저 입력하세요.")
+        return
 
-    cert["current_status"] = "Pending_Substitute_Review_MLOps"
-    cert["log"].append(
-        {"timestamp": get_current_time_str(), "status": "Pending_Substitute_Review_MLOps", "actor": operator_name,
-         "message": "'대체' AI 제안 생성 완료. MLOps 자체 검토 대기"})
+    start_substitute_job(cert_id, ("Pending_Substitute", "Substitute_Failed"),
+                         "'대체' AI 제안 생성 완료. MLOps 자체 검토 대기")
+    st.toast(f"[{cert_id}] '대체' 알고리즘을 수행합니다... (AI 제안 생성 중)")
+    refresh_app()
 
 
+@metrics.timed("r2bf_callback_seconds")
+@skip_if_stale
 def regenerate_ai_suggestion_mlops_callback(cert_id):
     """
     [장면 4: 박엔진] 'AI 재탐색' 요청
@@ -205,60 +869,96 @@ def regenerate_ai_suggestion_mlops_callback(cert_id):
         st.error("API 모델이 설정되지 않았습니다.")
         return
 
-    cert = st.session_state.certificate_db[cert_id]
-    st.toast(f"[{cert_id}] AI 재탐색을 요청합니다...")
+    # 미리 받아 둔 후보가 있으면 API 호출 없이 바로 교체하고, 풀은 백그라운드에서 다시 채움
+    candidate = candidate_pool.pop(cert_id)
+    if candidate is not None:
+        score, text = candidate
+        try:
+            store.amend(cert_id, "Pending_Substitute_Review_MLOps", "박엔진 (MLOps팀)",
+                        f"MLOps AI 재탐색 수행 (미리 받아 둔 후보, 중립성 {score:.2f})",
+                        timestamp=get_current_time_str(), internal_ai_suggestion=text)
+        except StatusConflict:
+            # 꺼낸 후보는 풀에 돌려 둠
+            candidate_pool.add(cert_id, [text], store.get(cert_id).deleted_data)
+            raise
+        st.session_state[f"mlops_edit_{cert_id}"] = text
+        if candidate_pool.size(cert_id) == 0:
+            start_candidate_refill(cert_id, st.session_state.api_model)
+        st.toast(f"[{cert_id}] 미리 받아 둔 다음 후보로 교체했습니다.")
+        refresh_queues("substitute")
+        return
 
-    deleted_data = cert["content"]["deleted_data"]
-    model_name = cert["content"]["model_name"]
-    ai_replacement = get_ai_replacement(st.session_state.api_model, deleted_data, model_name)
+    # 재탐색은 새 제안을 받으려는 것이므로 캐시를 건너뜀
+    start_substitute_job(cert_id, "Pending_Substitute_Review_MLOps", "MLOps AI 재탐색 수행", use_cache=False)
+    st.toast(f"[{cert_id}] AI 재탐색을 요청합니다...")
+    refresh_app()
 
-    cert["internal_ai_suggestion"] = ai_replacement
-    st.session_state[f"mlops_edit_{cert_id}"] = ai_replacement
 
-    cert["log"].append(
-        {"timestamp": get_current_time_str(), "status": "Pending_Substitute_Review_MLOps", "actor": "박엔진 (MLOps팀)",
-         "message": "MLOps AI 재탐색 수행"})
+@metrics.timed("r2bf_callback_seconds")
+@skip_if_stale
+def resume_review_callback(cert_id):
+    """
+    [장면 4: 박엔진] AI 제안 생성(재탐색)이 실패한 인증서를 이전 제안 그대로 MLOps 검토 대기로 되돌림
+    """
+    store.transition(cert_id, "Substitute_Failed", "Pending_Substitute_Review_MLOps", "박엔진 (MLOps팀)",
+                     "AI 제안 생성 실패. 이전 '대체(안)'으로 MLOps 검토 계속", timestamp=get_current_time_str())
+    st.toast(f"[{cert_id}] 이전 '대체(안)'으로 검토를 계속합니다.")
+    refresh_queues("substitute")
 
 
+@metrics.timed("r2bf_callback_seconds")
+@skip_if_stale
 def send_substitute_to_r2bf_callback(cert_id):
     """
     [장면 4: 박엔진] 검토 완료 후 'R2BF에 승인 요청' 전송
     """
-    cert = st.session_state.certificate_db[cert_id]
-
     edited_text = st.session_state[f"mlops_edit_{cert_id}"]
-    cert["internal_ai_suggestion"] = edited_text
 
-    cert["current_status"] = "Pending_Substitute_Approval"
-    cert["log"].append(
-        {"timestamp": get_current_time_str(), "status": "Pending_Substitute_Approval", "actor": "박엔진 (MLOps팀)",
-         "message": "MLOps '대체(안)' 수정/검토 완료. R2BF 최종 승인 대기"})
+    # 누출 의심 표현이 있으면 MLOps 가 확인란을 선택한 경우에만 전송 (R2BF 거부 -> 재작업 왕복 방지)
+    leaks = leakcheck.leaked_terms(leakcheck.scan(edited_text, store.get(cert_id).deleted_data))
+    if leaks and not st.session_state.get(f"leak_ack_{cert_id}"):
+        st.error(f"[{cert_id}] 누출 의심 표현({', '.join(leaks)})이 있어 전송하지 않았습니다. "
+                 "문장을 수정하거나 'AI 재탐색'을 수행하세요. 누출이 아니라면 확인란을 선택한 뒤 다시 전송하세요.")
+        return
+
+    message = "MLOps '대체(안)' 수정/검토 완료. R2BF 최종 승인 대기"
+    if leaks:
+        message += f" (누출 의심 표현 확인 후 전송: {', '.join(leaks)})"
+    store.transition(cert_id, "Pending_Substitute_Review_MLOps", "Pending_Substitute_Approval", "박엔진 (MLOps팀)",
+                     message,
+                     timestamp=get_current_time_str(), internal_ai_suggestion=edited_text)
 
     if f"mlops_edit_{cert_id}" in st.session_state:
         del st.session_state[f"mlops_edit_{cert_id}"]
+    st.session_state.pop(f"leak_ack_{cert_id}", None)
 
     st.toast(f"[{cert_id}] '대체(안)'을 R2BF 부서에 승인 요청했습니다.")
+    refresh_queues("substitute", "substitute_approval")
 
 
+@metrics.timed("r2bf_callback_seconds")
+@skip_if_stale
 def approve_substitute_callback(cert_id):
     """
     [장면 5: R2BF] '대체' 최종 승인 -> 인증서 완료 처리
     """
-    cert = st.session_state.certificate_db[cert_id]
+    cert = store.get(cert_id)
     approver_name = "R2BF 부서"
 
-    final_replacement_text = cert['internal_ai_suggestion']
+    final_replacement_text = cert.internal_ai_suggestion
+    completion_date = get_current_time_str()
 
-    cert["content"]["replacement_data"] = final_replacement_text
-    cert["approver_id"] = approver_name
-    cert["completion_date"] = get_current_time_str()
-    cert["current_status"] = "Completed"
-    cert["log"].append({"timestamp": cert["completion_date"], "status": "Completed", "actor": approver_name,
-                        "message": "'대체' 및 최종 승인 완료. 인증서 발행."})
+    store.transition(cert_id, "Pending_Substitute_Approval", "Completed", approver_name,
+                     "'대체' 및 최종 승인 완료. 인증서 발행.", timestamp=completion_date, replacement_data=final_replacement_text, approver_id=approver_name,
+                     completion_date=completion_date)
+    candidate_pool.discard(cert_id)
 
     st.toast(f"✅ [{cert_id}] 최종 승인 완료! 인증서가 '완료' 처리되었습니다.")
+    refresh_queues("substitute_approval")
 
 
+@metrics.timed("r2bf_callback_seconds")
+@skip_if_stale
 def reject_substitute_callback(cert_id):
     """
     [장면 5: R2BF] '대체' 거부 -> MLOps '재검토' 요청
@@ -270,18 +970,254 @@ def reject_substitute_callback(cert_id):
         st.warning(f"[{cert_id}] 거부 사유를 반드시 작성해야 합니다.")
         return
 
-    cert = st.session_state.certificate_db[cert_id]
+    cert = store.get(cert_id)
     approver_name = "R2BF 부서"
 
-    cert["current_status"] = "Pending_Substitute_Review_MLOps"
-    st.session_state[f"mlops_edit_{cert_id}"] = cert["internal_ai_suggestion"]
+    st.session_state[f"mlops_edit_{cert_id}"] = cert.internal_ai_suggestion
 
-    cert["log"].append(
-        {"timestamp": get_current_time_str(), "status": "Pending_Substitute_Review_MLOps", "actor": approver_name,
-         "message": f"'대체(안)' 거부 (사유: {reason}). MLOps 재검토 요청."})
+    store.transition(cert_id, "Pending_Substitute_Approval", "Pending_Substitute_Review_MLOps", approver_name,
+                     "'대체(안)' 거부. MLOps 재검토 요청.", timestamp=get_current_time_str(), reason=reason)
+    # 거부되면 곧 재탐색하게 되므로 후보 풀이 비어 있으면 미리 채워 둠
+    if candidate_pool.size(cert_id) == 0:
+        start_candidate_refill(cert_id, st.session_state.api_model)
 
     st.session_state[reason_key] = ""
     st.toast(f"[{cert_id}] '대체(안)'을 거부하고 MLOps에 재검토를 요청했습니다.")
+    refresh_queues("substitute_approval", "substitute")
+
+
+# --- 일괄 승인/거부 콜백 (장면 3, 5) ---
+# 선택한 인증서를 한 트랜잭션으로 전이하고 인증서마다 처리 로그를 남깁니다.
+# 그 사이 다른 세션이 먼저 처리한 건은 건너뜁니다.
+
+# 일괄 처리 큐 (fragment 키 -> 대기 상태)
+BATCH_QUEUES = {"forget_approval": "Pending_Forget_Approval", "substitute_approval": "Pending_Substitute_Approval"}
+
+
+def new_batch_id():
+    return f"BATCH-{datetime.datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:4].upper()}"
+
+
+def batch_table_key(queue):
+    # 처리 후 키를 바꿔 표의 선택을 해제
+    return f"batch_select_{queue}_{st.session_state.get(f'batch_nonce_{queue}', 0)}"
+
+
+def batch_selection(queue):
+    """선택한 cert_id 목록 ('큐 전체 선택'이면 큐의 모든 ID, 오래된 것부터)"""
+    if st.session_state.get(f"batch_all_{queue}"):
+        return store.ids_by_status(BATCH_QUEUES[queue], newest_first=False)
+    return st.session_state.get(f"batch_selected_{queue}", [])
+
+
+def batch_reason(queue):
+    """일괄 거부 공통 사유 (비어 있으면 경고 후 None)"""
+    reason = st.session_state.get(f"batch_reason_{queue}", "").strip()
+    if not reason:
+        st.warning("일괄 거부 사유를 반드시 작성해야 합니다.")
+        return None
+    return reason
+
+
+def finish_batch(queue, done_message, selected, applied):
+    st.session_state[f"batch_nonce_{queue}"] = st.session_state.get(f"batch_nonce_{queue}", 0) + 1
+    st.session_state[f"batch_selected_{queue}"] = []
+    st.session_state[f"batch_all_{queue}"] = False
+    st.session_state[f"batch_reason_{queue}"] = ""
+    skipped = len(selected) - len(applied)
+    st.toast(f"{done_message} ({len(applied)}건{f', 이미 처리된 {skipped}건 제외' if skipped else ''})")
+
+
+@metrics.timed("r2bf_callback_seconds")
+def batch_approve_forget_callback():
+    """
+    [장면 3: R2BF] 선택한 '잊힘' 일괄 승인 -> MLOps에 '대체 작업' 요청
+    """
+    cert_ids = batch_selection("forget_approval")
+    if not cert_ids:
+        return
+    approver_name = "R2BF 부서"
+
+    applied = store.transition_many(
+        cert_ids, "Pending_Forget_Approval", "Pending_Substitute", approver_name,
+        f"'잊힘' 승인 완료 (일괄 처리 [{new_batch_id()}]). MLOps '대체' 작업 대기.",
+        timestamp=get_current_time_str(), approver_id=approver_name)
+    finish_batch("forget_approval", "'잊힘'을 일괄 승인하고 MLOps에 '대체' 작업을 요청했습니다.", cert_ids, applied)
+    refresh_queues("forget_approval", "substitute")
+
+
+@metrics.timed("r2bf_callback_seconds")
+def batch_reject_forget_callback():
+    """
+    [장면 3: R2BF] 선택한 '잊힘' 일괄 거부 (공통 사유) -> MLOps에 재작업 요청
+    """
+    cert_ids = batch_selection("forget_approval")
+    reason = batch_reason("forget_approval")
+    if not cert_ids or reason is None:
+        return
+
+    applied = store.transition_many(
+        cert_ids, "Pending_Forget_Approval", "Pending_Forget", "R2BF 부서",
+        f"'잊힘' 거부 (일괄 처리 [{new_batch_id()}]). MLOps 재작업 요청.",
+        timestamp=get_current_time_str(), reason=reason, operator_id=None)
+    finish_batch("forget_approval", "'잊힘'을 일괄 거부하고 MLOps에 재작업을 요청했습니다.", cert_ids, applied)
+    refresh_queues("forget_approval", "forget")
+
+
+@metrics.timed("r2bf_callback_seconds")
+def batch_approve_substitute_callback():
+    """
+    [장면 5: R2BF] 선택한 '대체' 일괄 최종 승인 -> 인증서 완료 처리
+    """
+    cert_ids = batch_selection("substitute_approval")
+    if not cert_ids:
+        return
+    approver_name = "R2BF 부서"
+    suggestions = {cert.cert_id: cert.internal_ai_suggestion for cert in store.get_many(cert_ids)}
+    completion_date = get_current_time_str()
+
+    applied = store.transition_many(
+        cert_ids, "Pending_Substitute_Approval", "Completed", approver_name,
+        f"'대체' 및 최종 승인 완료 (일괄 처리 [{new_batch_id()}]). 인증서 발행.",
+        timestamp=completion_date, fields_of=lambda cert_id: {"replacement_data": suggestions[cert_id]},
+        approver_id=approver_name, completion_date=completion_date)
+    for cert_id in applied:
+        candidate_pool.discard(cert_id)
+    finish_batch("substitute_approval", "✅ '대체'를 일괄 최종 승인했습니다.", cert_ids, applied)
+    refresh_queues("substitute_approval")
+
+
+@metrics.timed("r2bf_callback_seconds")
+def batch_reject_substitute_callback():
+    """
+    [장면 5: R2BF] 선택한 '대체' 일괄 거부 (공통 사유) -> MLOps '재검토' 요청
+    """
+    cert_ids = batch_selection("substitute_approval")
+    reason = batch_reason("substitute_approval")
+    if not cert_ids or reason is None:
+        return
+    suggestions = {cert.cert_id: cert.internal_ai_suggestion for cert in store.get_many(cert_ids)}
+
+    applied = store.transition_many(
+        cert_ids, "Pending_Substitute_Approval", "Pending_Substitute_Review_MLOps", "R2BF 부서",
+        f"'대체(안)' 거부 (일괄 처리 [{new_batch_id()}]). MLOps 재검토 요청.",
+        timestamp=get_current_time_str(), reason=reason)
+    # 건별 거부와 달리 후보 풀은 미리 채우지 않음 (수백 건의 Gemini 호출이 한꺼번에 몰리지 않도록, 재탐색 때 생성)
+    for cert_id in applied:
+        st.session_state[f"mlops_edit_{cert_id}"] = suggestions[cert_id]
+    finish_batch("substitute_approval", "'대체(안)'을 일괄 거부하고 MLOps에 재검토를 요청했습니다.", cert_ids, applied)
+    refresh_queues("substitute_approval", "substitute")
+
+
+# --- 목록 화면 헬퍼 (페이지 이동 / 지연 렌더링) ---
+
+def set_page_cursor(list_key, **cursor):
+    """이전/다음 버튼 콜백: 목록별 keyset 커서를 세션 상태에 저장"""
+    st.session_state[f"page_{list_key}"] = cursor
+
+
+def load_page(list_key, **query):
+    """
+    목록의 현재 페이지 조회. 처리되어 큐에서 빠진 인증서 때문에 현재 페이지가 비면 첫 페이지로 돌아갑니다.
+    """
+    cursor = st.session_state.get(f"page_{list_key}", {})
+    with metrics.timer("r2bf_queue_load_seconds", list=list_key):
+        page = store.page(**query, **cursor)
+        if not page.certs and cursor:
+            st.session_state[f"page_{list_key}"] = {}
+            page = store.page(**query)
+    return page
+
+
+def render_pager(list_key, page, total, cursor_names=("after", "before")):
+    """
+    이전/다음 페이지 버튼과 전체 건수. 기본은 keyset 커서(after / before)이며,
+    검색 결과처럼 순위로 나누는 목록은 cursor_names=("offset", "offset") 으로 사용합니다.
+    """
+    if page.newer is None and page.older is None:
+        return
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button("◀ 이전", key=f"prev_{list_key}", on_click=set_page_cursor, args=(list_key,),
+                  kwargs={cursor_names[0]: page.newer}, disabled=page.newer is None, use_container_width=True)
+    with col2:
+        st.caption(f"총 {total}건 (페이지당 {PAGE_SIZE}건)")
+    with col3:
+        st.button("다음 ▶", key=f"next_{list_key}", on_click=set_page_cursor, args=(list_key,),
+                  kwargs={cursor_names[1]: page.older}, disabled=page.older is None, use_container_width=True)
+
+
+def lazy_expander(label, key):
+    """
+    펼쳤을 때만 본문을 그리는 expander. 닫힌 인증서의 본문(로그 표 등)은 계산하지도, 전송하지도 않습니다.
+    사용: exp = lazy_expander(...); if exp.open: with exp: ...
+    """
+    return st.expander(label, key=key, on_change="rerun")
+
+
+def render_leak_check(text, deleted_data_text):
+    """
+    [장면 4, 5] '대체' 문장 누출 검사 결과. 의심 표현이 있으면 해당 구간을 강조한 문장을 보여 주고
+    일치 목록을 반환합니다.
+    """
+    matches = leakcheck.scan(text, deleted_data_text)
+    if matches:
+        st.error(f"🚨 누출 의심 표현 {len(leakcheck.leaked_terms(matches))}개: "
+                 f"{', '.join(leakcheck.leaked_terms(matches))} (삭제 데이터 또는 민감 검사어와 일치)")
+        st.markdown(leakcheck.highlight(text, matches))
+    else:
+        st.caption("✅ 누출 검사 통과 (삭제 데이터·민감 검사어 미포함)")
+    return matches
+
+
+def export_cli_command(fmt, filters):
+    """화면에서 고른 내보내기 조건과 같은 export.py 명령"""
+    args = ["python", "export.py", "--format", fmt]
+    for status in filters["statuses"]:
+        args += ["--status", status]
+    for option, key in (("--model", "model_name"), ("--requester", "requester_id"), ("--since", "since"),
+                        ("--until", "until")):
+        if filters[key]:
+            args += [option, filters[key]]
+    if filters["date_field"] != "created_at":
+        args += ["--date-field", filters["date_field"]]
+    args += ["--output", export_file_name(fmt)]
+    return shlex.join(args)
+
+
+def render_batch_panel(queue, total, detail_label, detail_of, approve_callback, reject_callback):
+    """
+    [장면 3, 5] 일괄 처리: 표에서 여러 건을 고르거나 큐 전체를 선택해 한 번에 승인/거부합니다.
+    펼쳤을 때만 최근 BATCH_TABLE_LIMIT 건을 (로그 없이) 조회합니다.
+    """
+    exp = lazy_expander("☑️ 일괄 처리 (여러 건 선택 후 한 번에 승인/거부)", key=f"exp_batch_{queue}")
+    if not exp.open:
+        return
+    with exp:
+        with metrics.timer("r2bf_queue_load_seconds", list=f"batch_{queue}"):
+            certs = store.page(statuses=(BATCH_QUEUES[queue],), limit=BATCH_TABLE_LIMIT, with_logs=False).certs
+        select_all = st.checkbox(f"큐 전체 선택 ({total}건)", key=f"batch_all_{queue}")
+        event = st.dataframe(
+            [{"ID": cert.cert_id, "요청자": cert.requester_id, "수행자": cert.operator_id,
+              "대상 모델": cert.model_name, detail_label: detail_of(cert)} for cert in certs],
+            key=batch_table_key(queue), on_select="rerun", selection_mode="multi-row", hide_index=True,
+            use_container_width=True)
+        # 선택은 화면에 보인 순서의 행 번호이므로, 지금 표의 ID로 바꿔 둠 (콜백에서 사용)
+        selected = [certs[row].cert_id for row in event.selection.rows if row < len(certs)]
+        st.session_state[f"batch_selected_{queue}"] = selected
+        if total > len(certs):
+            st.caption(f"최근 {len(certs)}건만 표시합니다. 나머지까지 처리하려면 '큐 전체 선택'을 사용하세요.")
+        count = total if select_all else len(selected)
+
+        st.text_input("일괄 거부 사유 (거부 시 필수, 선택한 모든 건에 기록)", key=f"batch_reason_{queue}",
+                      placeholder="거부 사유를 MLOps에 전달합니다.")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.button(f"👍 선택한 {count}건 일괄 승인", key=f"batch_approve_{queue}", on_click=approve_callback,
+                      disabled=not count, use_container_width=True, type="primary")
+        with col2:
+            st.button(f"👎 선택한 {count}건 일괄 거부", key=f"batch_reject_{queue}", on_click=reject_callback,
+                      disabled=not count, use_container_width=True)
 
 
 # ----------------------------------------------------------------------
@@ -300,6 +1236,14 @@ with st.sidebar:
     )
     # --- ---
 
+    # 키를 이미 설정했다면 모델을 바꿔도 공유 클라이언트에서 바로 꺼내 씀 (연결 재생성 없음)
+    if st.session_state.api_key_hash:
+        st.session_state.api_model = gemini_registry.model(st.session_state.api_key_hash,
+                                                           st.session_state.selected_model)
+
+    st.toggle("AI 제안 스트리밍", key="stream_ai",
+              help="AI 제안을 생성되는 대로 검토 편집 상자에 표시하고, 첫 토큰 시간과 전체 소요 시간을 로그에 남깁니다.")
+
     api_key = st.text_input("Google AI API Key:", type="password", key="api_key_input")
 
     if st.button("API 키 설정"):
@@ -309,15 +1253,17 @@ with st.sidebar:
 
         if api_key_value:
             try:
-                genai.configure(api_key=api_key_value)
+                # 같은 키의 클라이언트가 이미 있으면 재사용
+                st.session_state.api_key_hash = gemini_registry.register(api_key_value)
                 # [수정] 하드코딩된 모델명 대신, 선택된 모델명 사용
-                model = genai.GenerativeModel(selected_model_name)
+                model = gemini_registry.model(st.session_state.api_key_hash, selected_model_name)
 
                 st.session_state.api_model = model
                 # [수정] 성공 메시지에 선택된 모델명 표시
                 st.success(f"API 키 설정 및 '{selected_model_name}' 모델 로드 완료!")
             except Exception as e:
                 st.session_state.api_model = None
+                st.session_state.api_key_hash = None
                 st.error(f"API 키 오류: {e}")
         else:
             st.warning("API 키를 입력해주세요.")
@@ -325,12 +1271,44 @@ with st.sidebar:
     if not st.session_state.api_model:
         st.warning("API 키를 설정해야 MLOps팀이 '대체' 작업을 수행할 수 있습니다.")
 
+    st.divider()
+    st.caption(f"🔌 Gemini 클라이언트: {gemini_registry.client_count}개 "
+               f"(API 키별 공유, 모델 {gemini_registry.model_count}개)")
+    st.caption(f"🗃️ AI 제안 캐시: 적중 {ai_cache.hits} / 미적중 {ai_cache.misses} "
+               f"(적중률 {ai_cache.hit_rate:.0%}, 저장 {len(ai_cache)}건)")
+    caller_stats = gemini_caller.stats
+    st.caption(f"🛟 Gemini 호출: 시도 {caller_stats['attempts']} / 재시도 {caller_stats['retries']} / "
+               f"헤지 {caller_stats['hedges']} (먼저 응답 {caller_stats['hedge_wins']}) / "
+               f"차단 {caller_stats['rejected']}")
+    open_breakers = [model_id for model_id, state in gemini_caller.breaker_states().items() if state != "closed"]
+    if open_breakers:
+        st.warning(f"⛔ 연속 실패로 호출을 잠시 멈춘 모델: {', '.join(open_breakers)}")
+
+    with st.expander(f"📈 운영 지표 (최근 {metrics.window_seconds // 60}분)"):
+        rows = metrics.summary()
+        if rows:
+            st.dataframe(rows, hide_index=True, use_container_width=True, column_config={
+                "metric": "지표", "labels": "구분", "count": "호출",
+                "p50_ms": st.column_config.NumberColumn("p50(ms)", format="%.1f"),
+                "p95_ms": st.column_config.NumberColumn("p95(ms)", format="%.1f"),
+                "max_ms": st.column_config.NumberColumn("최대(ms)", format="%.1f"),
+                "error_rate": st.column_config.NumberColumn("오류율", format="percent"),
+                "total": "누적 호출",
+            })
+        else:
+            st.caption("아직 기록된 지표가 없습니다.")
+        if METRICS_PORT:
+            st.caption(f"Prometheus: http://127.0.0.1:{METRICS_PORT}/metrics")
+        if METRICS_FILE:
+            st.caption(f"Prometheus 텍스트 파일: `{METRICS_FILE}`")
+
 # ----------------------------------------------------------------------
 # 3. 👤 3자 + 1 (조회) 대시보드 (메인 화면)
 # ----------------------------------------------------------------------
 st.title("🤖 AI 거버넌스 대시보드 (R2BF 프레임워크)")
 st.caption(f"현재 시간: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
+# 큐별 건수는 각 큐의 fragment 안(소제목)에 표시하므로 탭 이름은 고정 (부분 재실행 때 낡은 건수가 남지 않음)
 tab1, tab2, tab3, tab4 = st.tabs([
     "👤 김감사 (AI 윤리팀)",
     "🛠️ 박엔진 (MLOps팀)",
@@ -339,339 +1317,666 @@ tab1, tab2, tab3, tab4 = st.tabs([
 ])
 
 # --- [장면 1 & 6] 김감사 (AI 윤리팀) 대시보드 ---
-with tab1:
+with tab1, timed_section("tab1"):
     st.header("👤 김감사 (AI 윤리팀) 대시보드")
     col1, col2 = st.columns(2)
 
     with col1:
-        st.subheader("장면 1: 신규 '잊힘' 요청 (인증서 발행)")
-        st.markdown("정기 감사에서 발견된 편향성 원인 데이터셋의 '잊힘(Unlearn)'을 요청합니다.")
-
-        with st.form("request_form"):
-            st.text_input(
-                "AI 모델명:",
-                key="req_model_name",
-                autocomplete="off"
-            )
-            st.text_area(
-                "삭제 요청 데이터셋 (편향성 원인):",
-                key="req_dataset",
-                placeholder="감사 리포트에 근거한 편향성 원인 데이터셋을 입력하세요."
-            )
-            submit_button = st.form_submit_button(
-                "삭제 요청 (인증서 발행)",
-                use_container_width=True,
-                type="primary",
-                on_click=submit_request_callback
-            )
-
-    with col2:
-        st.subheader("장면 6: 인증서 처리 현황 (모니터링)")
-        st.markdown("내가 요청한 '잊힘' 인증서의 **처리 상태만** 확인합니다.\n\n(상세 내용은 **'🗂️ 인증서 조회'** 탭을 이용하세요.)")
-
-        certs = {k: v for k, v in st.session_state.certificate_db.items() if v['requester_id'] == "김감사 (AI 윤리팀)"}
-        if not certs:
-            st.info("아직 발행한 인증서가 없습니다.")
+        def render_request_form():
+            st.subheader("장면 1: 신규 '잊힘' 요청 (인증서 발행)")
+            st.markdown("정기 감사에서 발견된 편향성 원인 데이터셋의 '잊힘(Unlearn)'을 요청합니다.")
 
-        sorted_certs = sorted(certs.values(), key=lambda x: x['log'][0]['timestamp'], reverse=True)
+            with st.form("request_form"):
+                st.text_input(
+                    "AI 모델명:",
+                    key="req_model_name",
+                    autocomplete="off"
+                )
+                st.text_area(
+                    "삭제 요청 데이터셋 (편향성 원인):",
+                    key="req_dataset",
+                    placeholder="감사 리포트에 근거한 편향성 원인 데이터셋을 입력하세요."
+                )
+                submit_button = st.form_submit_button(
+                    "삭제 요청 (인증서 발행)",
+                    use_container_width=True,
+                    type="primary",
+                    on_click=submit_request_callback
+                )
 
-        for cert in sorted_certs:
-            status = cert["current_status"]
+            request = st.session_state.duplicate_request
+            if request:
+                st.warning(f"**'{request['model_name']}'** 모델에 비슷한 '잊힘' 요청이 이미 있습니다. "
+                           "기존 인증서에 연결하면 '잊힘'과 '대체' 작업을 다시 실행하지 않고 그 결과를 함께 사용합니다.")
+                for similarity, cert_id in request["matches"]:
+                    cert = store.get(cert_id)
+                    col1, col2 = st.columns([3, 1])
+                    with col1:
+                        st.markdown(f"**{cert_id}** | 유사도 {similarity:.0%} | 상태: `{cert.current_status}`  \n"
+                                    f"{cert.deleted_data}")
+                    with col2:
+                        st.button("🔗 이 인증서에 연결", key=f"link_duplicate_{cert_id}",
+                                  on_click=link_duplicate_request_callback, args=(cert_id, similarity),
+                                  disabled=is_terminal(cert.current_status),
+                                  help="처리가 끝난 인증서에는 연결할 수 없습니다." if is_terminal(cert.current_status) else None,
+                                  use_container_width=True, type="primary")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.button("새 인증서로 발행", key="issue_duplicate_anyway", on_click=issue_duplicate_anyway_callback,
+                              use_container_width=True)
+                with col2:
+                    st.button("취소", key="cancel_duplicate_request", on_click=cancel_duplicate_request_callback,
+                              use_container_width=True)
+
+        queue_fragment("request", render_request_form)
+
+        def render_import_panel():
+            import_runs = get_import_runs()
+            importing = any(not run.finished for run in import_runs)
+            with st.expander("📥 일괄 요청 가져오기 (CSV / JSONL)", expanded=bool(import_runs)):
+                st.caption("열(키): `model_name`(AI 모델명), `deleted_data`(삭제 요청 데이터셋), `requester_id`(선택). "
+                           "이미 발행된 요청과 중복되거나 형식이 잘못된 행은 건너뛰고 오류 파일에 남깁니다.")
+                st.file_uploader("감사 결과 파일", type=["csv", "jsonl", "ndjson"], key="import_file")
+                st.button("📥 가져오기 시작", key="start_import", on_click=start_import_callback,
+                          disabled=st.session_state.get("import_file") is None or importing,
+                          use_container_width=True)
+                if import_runs:
+                    run = import_runs[-1]
+                    st.progress(run.fraction or 0.0,
+                                text=f"[{run.import_id}] {run.rows}행 처리 (발행 {run.inserted}, 중복 {run.duplicates}, "
+                                     f"오류 {run.invalid}) | {run.elapsed:.1f}초, {run.rows_per_second:.0f}행/초")
+                    if run.error:
+                        st.error(f"가져오기 실패: {run.error}")
+                    elif run.finished and run.error_path:
+                        with open(run.error_path, "rb") as f:
+                            st.download_button(f"건너뛴 행 {run.skipped}건 내려받기 (JSONL)", f.read(),
+                                               file_name=os.path.basename(run.error_path),
+                                               mime="application/x-ndjson", key=f"import_errors_{run.import_id}")
+
+            # 가져오기가 끝나면 주기적 새로고침을 멈추고 새로 발행된 인증서를 각 큐에 반영하기 위해 앱 전체를 다시 실행
+            if import_polling and not importing:
+                st.rerun()
+
+        # 가져오는 중에는 이 패널만 주기적으로 다시 그려 진행률을 반영
+        import_polling = any(not run.finished for run in get_import_runs())
+        queue_fragment("import", render_import_panel, run_every=IMPORT_POLL_SECONDS if import_polling else None)
 
-            if status == "Completed":
-                st.success(f"**{cert['cert_id']} (처리 완료)**")
-            elif status == "Pending_Forget":
-                st.info(f"**{cert['cert_id']} (MLOps '잊힘' 대기)**")
-            elif status == "Pending_Forget_Approval":
-                st.warning(f"**{cert['cert_id']} (R2BF '잊힘' 승인 대기)**")
-            elif status == "Pending_Substitute":
-                st.warning(f"**{cert['cert_id']} (MLOps '대체' 작업 대기)**")
-            elif status == "Pending_Substitute_Review_MLOps":
-                st.warning(f"**{cert['cert_id']} (MLOps '대체(안)' 검토 중)**")
-            elif status == "Pending_Substitute_Approval":
-                st.warning(f"**{cert['cert_id']} (R2BF '대체' 승인 대기)**")
-            else:
-                st.info(f"**{cert['cert_id']} (처리 중...)** | 상태: {status}")
+    with col2:
+        def render_monitor():
+            my_total = store.count(requester_id="김감사 (AI 윤리팀)")
+            st.subheader(f"장면 6: 인증서 처리 현황 (모니터링) ({my_total}건)")
+            st.markdown("내가 요청한 '잊힘' 인증서의 **처리 상태만** 확인합니다.\n\n(상세 내용은 **'🗂️ 인증서 조회'** 탭을 이용하세요.)")
+
+            my_page = load_page("monitor", requester_id="김감사 (AI 윤리팀)", with_logs=False)
+            if not my_page.certs:
+                st.info("아직 발행한 인증서가 없습니다.")
+
+            for cert in my_page.certs:
+                cert_id, status = cert.cert_id, cert.current_status
+                if status == "Completed":
+                    st.success(f"**{cert_id} (처리 완료)**")
+                elif status == "Pending_Forget":
+                    st.info(f"**{cert_id} (MLOps '잊힘' 대기)**")
+                elif status == "Pending_Forget_Approval":
+                    st.warning(f"**{cert_id} (R2BF '잊힘' 승인 대기)**")
+                elif status == "Pending_Substitute":
+                    st.warning(f"**{cert_id} (MLOps '대체' 작업 대기)**")
+                elif status == "Substitute_Failed":
+                    st.warning(f"**{cert_id} (MLOps '대체' AI 생성 실패, 재시도 대기)**")
+                elif status == "Pending_Substitute_Review_MLOps":
+                    st.warning(f"**{cert_id} (MLOps '대체(안)' 검토 중)**")
+                elif status == "Pending_Substitute_Approval":
+                    st.warning(f"**{cert_id} (R2BF '대체' 승인 대기)**")
+                else:
+                    st.info(f"**{cert_id} (처리 중...)** | 상태: {status}")
+
+            render_pager("monitor", my_page, my_total)
+
+        # 다른 역할이 처리한 결과가 반영되도록 일정 주기로 이 목록만 다시 그림
+        queue_fragment("monitor", render_monitor, run_every=MONITOR_REFRESH_SECONDS)
 
 # --- [장면 2 & 4] 박엔진 (MLOps팀) 대시보드 ---
-with tab2:
+with tab2, timed_section("tab2"):
     st.header("🛠️ 박엔진 (MLOps팀) 대시보드")
 
-    st.subheader("장면 2: '잊힘' (Unlearn) 작업 큐")
-    st.markdown(
-        "AI 윤리팀에서 요청한 '잊힘' 작업을 수행하고, R2BF에 '잊힘' 승인을 요청합니다.\n\n(R2BF가 '잊힘'을 거부한 경우, **거부된 '잊힘' 작업이 여기에 다시 표시**됩니다. 확인 후 다시 수행하세요.)")
+    def render_forget_queue():
+        forget_statuses = ("Pending_Forget", "Forgetting_In_Progress")
+        forget_total = sum(store.count(status) for status in forget_statuses)
+        st.subheader(f"장면 2: '잊힘' (Unlearn) 작업 큐 ({forget_total}건)")
+        st.markdown(
+            "AI 윤리팀에서 요청한 '잊힘' 작업을 수행하고, R2BF에 '잊힘' 승인을 요청합니다.\n\n(R2BF가 '잊힘'을 거부한 경우, **거부된 '잊힘' 작업이 여기에 다시 표시**됩니다. 확인 후 다시 수행하세요.)")
+
+        pending_forget_count = store.count("Pending_Forget")
+        st.button(
+            f"⚡ '잊힘 대기' 전체 수행 ({pending_forget_count}건, 대상 모델별 묶음)",
+            key="run_all_forget",
+            on_click=run_all_forgetting_callback,
+            disabled=pending_forget_count == 0,
+            help=f"같은 대상 모델의 '잊힘' 요청은 {unlearning_executor.window_seconds:g}초 동안 모아 한 번의 작업으로 수행합니다."
+        )
+
+        pending_forget_page = load_page("forget", statuses=forget_statuses)
+        if not pending_forget_page.certs:
+            st.info("현재 대기 중인 '잊힘' 작업이 없습니다.")
+        else:
+            for cert in pending_forget_page.certs:
+                cert_id = cert.cert_id
+
+                if cert.current_status == "Forgetting_In_Progress":
+                    percent, stage = unlearning_executor.progress.get(cert_id, (0, "대기 중"))
+                    batch_id = unlearning_executor.batch_id_of(cert_id)
+                    batch_text = f" | 묶음 [{batch_id}] {unlearning_executor.batch_size(batch_id)}건" if batch_id else ""
+                    col1, col2 = st.columns([4, 1], vertical_alignment="center")
+                    with col1:
+                        st.progress(percent / 100, text=f"⏳ **{cert_id} ('잊힘' 수행 중 {percent}%)** | "
+                                                        f"모델: {cert.model_name}{batch_text} | {stage}")
+                    with col2:
+                        st.button("⏹️ 취소", key=f"cancel_forget_{cert_id}", on_click=cancel_forgetting_callback,
+                                  args=(cert_id,), use_container_width=True,
+                                  help="묶음 대기 중이면 이 인증서만, 이미 실행 중이면 묶음 전체가 취소됩니다.")
+                    continue
+
+                exp = lazy_expander(
+                    f"**{cert_id} (잊힘 대기)** | 모델: {cert.model_name} | 요청자: {cert.requester_id}",
+                    key=f"exp_forget_{cert_id}")
+                if not exp.open:
+                    continue
+                with exp:
+
+                    last_log_message = cert.last_log.message
+                    failed = last_log_message.startswith("'잊힘' 수행 실패")
+                    rejection = cert.last_rejection()
+                    if rejection is not None:
+                        st.error(f"R2BF 부서가 이 '잊힘' 작업을 거부했습니다. (사유: {rejection.reason})\n\n'잊힘' 알고리즘을 다시 수행하여 R2BF에 승인을 요청하세요.")
+                    elif failed:
+                        st.error(f"{last_log_message}\n\n다시 시도하세요.")
+
+                    st.write("**삭제 요청 데이터셋:**")
+                    st.markdown(f"> {cert.deleted_data}")
+                    st.button(
+                        "🔁 '잊힘' 알고리즘 재시도 (→ R2BF 승인 요청)" if failed else "▶️ '잊힘' 알고리즘 수행 (→ R2BF 승인 요청)",
+                        key=f"run_forget_{cert_id}",
+                        on_click=run_forgetting_callback,
+                        args=(cert_id,),
+                        use_container_width=True,
+                        type="primary"
+                    )
+            render_pager("forget", pending_forget_page, forget_total)
 
-    pending_forget_certs = {k: v for k, v in st.session_state.certificate_db.items() if
-                            v["current_status"] == "Pending_Forget"}
-    if not pending_forget_certs:
-        st.info("현재 대기 중인 '잊힘' 작업이 없습니다.")
-    else:
-        for cert_id, cert in pending_forget_certs.items():
-            with st.expander(
-                    f"**{cert_id} (잊힘 대기)** | 모델: {cert['content']['model_name']} | 요청자: {cert['requester_id']}"):
+        # '잊힘' 작업이 모두 끝나면 주기적 새로고침을 멈추고 R2BF 승인 큐 등을 갱신하기 위해 앱 전체를 다시 실행
+        if forget_polling and not store.count("Forgetting_In_Progress"):
+            st.rerun()
 
-                last_log_message = cert['log'][-1]['message']
-                if "거부" in last_log_message and cert['log'][-1]['actor'] == "R2BF 부서":
-                    try:
-                        reason_text = last_log_message.split('(사유: ')[1].split(')')[0]
-                    except IndexError:
-                        reason_text = "N/A"
-                    st.error(f"R2BF 부서가 이 '잊힘' 작업을 거부했습니다. (사유: {reason_text})\n\n'잊힘' 알고리즘을 다시 수행하여 R2BF에 승인을 요청하세요.")
+    # '잊힘' 수행 중인 인증서가 있으면 이 큐만 주기적으로 다시 그려 진행률을 반영
+    forget_polling = store.count("Forgetting_In_Progress") > 0
+    queue_fragment("forget", render_forget_queue, run_every=FORGET_POLL_SECONDS if forget_polling else None)
+
+    st.divider()
 
-                st.write("**삭제 요청 데이터셋:**")
-                st.markdown(f"> {cert['content']['deleted_data']}")
+    def render_substitute_queue():
+        substitute_statuses = ("Pending_Substitute", "Substituting_In_Progress", "Substitute_Failed",
+                               "Pending_Substitute_Review_MLOps")
+        substitute_total = sum(store.count(status) for status in substitute_statuses)
+        st.subheader(f"장면 4: '대체' 작업 및 검토 큐 ({substitute_total}건)")
+        st.markdown(
+            "R2BF의 '대체' 작업을 수행(AI 제안 생성)하고, 생성된 '대체(안)'을 검토/수정하여 R2BF에 전송합니다.\n\n(R2BF가 '대체'를 거부한 경우, **거부된 '대체(안)'이 여기에 다시 표시**됩니다. 'AI 재탐색'을 눌러주세요.)")
+
+        # --- 일괄 생성 패널 ---
+        pending_substitute_count = store.count("Pending_Substitute") + store.count("Substitute_Failed")
+        bulk_runs = get_bulk_runs()
+        with st.container(border=True):
+            st.markdown("**⚡ '대체' AI 제안 일괄 생성**")
+            col1, col2, col3 = st.columns([1, 1, 2], vertical_alignment="bottom")
+            with col1:
+                st.number_input("동시 실행 수", min_value=1, max_value=32, value=BULK_CONCURRENCY,
+                                key="bulk_concurrency")
+            with col2:
+                api_model = st.session_state.api_model
+                server_rpm = model_rpm(model_id_of(api_model) if api_model else st.session_state.selected_model)
+                if st.session_state.get("bulk_rpm", server_rpm + 1) > server_rpm:
+                    # 처음이거나 모델을 바꿔 공용 한도가 낮아졌으면 그 한도로 맞춤 (값은 세션 상태로만 지정)
+                    st.session_state.bulk_rpm = server_rpm
+                st.number_input("분당 호출 한도 (RPM)", min_value=1, max_value=server_rpm, key="bulk_rpm",
+                                help=f"이 일괄 생성에만 적용됩니다. 모델 공용 한도({server_rpm} RPM, 서버 설정 "
+                                     "R2BF_GEMINI_RPM)를 넘을 수 없습니다.")
+            with col3:
                 st.button(
-                    "▶️ '잊힘' 알고리즘 수행 (→ R2BF 승인 요청)",
-                    key=f"run_forget_{cert_id}",
-                    on_click=run_forgetting_callback,
-                    args=(cert_id,),
+                    f"⚡ '대체 작업 대기' / 'AI 생성 실패' 전체 생성 ({pending_substitute_count}건)",
+                    key="bulk_generate",
+                    on_click=generate_all_substitutes_callback,
                     use_container_width=True,
-                    type="primary"
+                    type="primary",
+                    disabled=(not st.session_state.api_model or pending_substitute_count == 0
+                              or any(not run.finished for run in bulk_runs))
+                )
+            if bulk_runs:
+                run = bulk_runs[-1]
+                st.progress(
+                    run.done / run.total,
+                    text=f"[{run.batch_id}] {run.done}/{run.total}건 처리 (성공 {run.succeeded}, 실패 {run.failed}) | "
+                         f"{run.elapsed:.1f}초, {run.throughput_per_minute:.1f}건/분 | "
+                         f"동시 {run.max_concurrency}, {run.rate_per_minute:g} RPM"
                 )
 
-    st.divider()
+        # keyset 페이지 결과가 이미 발행 시각 역순으로 정렬되어 있음
+        combined_substitute_page = load_page("substitute", statuses=substitute_statuses)
 
-    st.subheader("장면 4: '대체' 작업 및 검토 큐")
-    st.markdown(
-        "R2BF의 '대체' 작업을 수행(AI 제안 생성)하고, 생성된 '대체(안)'을 검토/수정하여 R2BF에 전송합니다.\n\n(R2BF가 '대체'를 거부한 경우, **거부된 '대체(안)'이 여기에 다시 표시**됩니다. 'AI 재탐색'을 눌러주세요.)")
+        if not combined_substitute_page.certs:
+            st.info("현재 대기 중인 '대체' 작업이 없습니다.")
+        else:
+            for cert in combined_substitute_page.certs:
+                cert_id = cert.cert_id
+                status = cert.current_status
+
+                if status == "Substituting_In_Progress":
+                    # [상태 0: AI 제안 생성 중 (백그라운드 작업)]
+                    stream = ai_streams.get(cert_id)
+                    if stream is None or not stream.started:
+                        st.info(f"⏳ **{cert_id} (AI 제안 생성 중...)** | 모델: {cert.model_name}")
+                        continue
+                    ttft = stream.time_to_first_token
+                    ttft_text = f"첫 토큰 {ttft:.2f}초" if ttft is not None else "첫 토큰 대기 중"
+                    with st.container(border=True):
+                        st.info(f"⏳ **{cert_id} (AI 제안 생성 중... {stream.elapsed:.1f}초, {ttft_text})** | "
+                                f"모델: {cert.model_name}")
+                        # 받은 만큼 검토 편집 상자에 표시 (완료되면 검토 상태에서 저장된 최종 문장으로 다시 채움)
+                        st.session_state[f"mlops_edit_{cert_id}"] = stream.text
+                        st.session_state[f"mlops_streamed_{cert_id}"] = True
+                        st.text_area("AI 제안 (생성 중...):", key=f"mlops_edit_{cert_id}", height=500, disabled=True)
+
+                elif status == "Pending_Substitute":
+                    # [상태 1: 대체 작업 대기]
+                    exp = lazy_expander(
+                        f"**{cert_id} (대체 작업 대기)** | 모델: {cert.model_name} | 요청자: {cert.requester_id}",
+                        key=f"exp_sub_{cert_id}")
+                    if not exp.open:
+                        continue
+                    with exp:
+                        st.write(f"**R2BF '잊힘' 승인 완료.**")
+                        st.write("**삭제된 데이터:**")
+                        st.markdown(f"> {cert.deleted_data}")
+
+                        rejection = cert.last_rejection()
+                        if rejection is not None:
+                            st.error(f"R2BF 부서가 이전 '대체(안)'을 거부했습니다. (사유: {rejection.reason})\n\n'대체' AI 제안 생성을 다시 수행하세요.")
 
-    combined_substitute_certs = {k: v for k, v in st.session_state.certificate_db.items() if
-                                 v["current_status"] in ["Pending_Substitute", "Pending_Substitute_Review_MLOps"]}
+                        st.button(
+                            "▶️ '대체' AI 제안 생성 (→ MLOps 검토)",
+                            key=f"run_sub_{cert_id}",
+                            on_click=run_substitute_callback,
+                            args=(cert_id,),
+                            use_container_width=True,
+                            type="primary",
+                            disabled=not st.session_state.api_model
+                        )
 
-    if not combined_substitute_certs:
-        st.info("현재 대기 중인 '대체' 작업이 없습니다.")
-    else:
-        sorted_combined_certs = sorted(combined_substitute_certs.items(),
-                                       key=lambda item: item[1]['log'][0]['timestamp'], reverse=True)
-
-        for cert_id, cert in sorted_combined_certs:
-            status = cert["current_status"]
-
-            if status == "Pending_Substitute":
-                # [상태 1: 대체 작업 대기]
-                with st.expander(
-                        f"**{cert_id} (대체 작업 대기)** | 모델: {cert['content']['model_name']} | 요청자: {cert['requester_id']}"):
-                    st.write(f"**R2BF '잊힘' 승인 완료.**")
-                    st.write("**삭제된 데이터:**")
-                    st.markdown(f"> {cert['content']['deleted_data']}")
-
-                    last_log_message = cert['log'][-1]['message']
-                    if "거부" in last_log_message and cert['log'][-1]['actor'] == "R2BF 부서":
-                        try:
-                            reason_text = last_log_message.split('(사유: ')[1].split(')')[0]
-                        except IndexError:
-                            reason_text = "N/A"
-                        st.error(f"R2BF 부서가 이전 '대체(안)'을 거부했습니다. (사유: {reason_text})\n\n'대체' AI 제안 생성을 다시 수행하세요.")
+                elif status == "Substitute_Failed":
+                    # [상태 1-1: AI 제안 생성 실패] 실패 문구는 제안으로 저장하지 않고 로그에만 남김
+                    exp = lazy_expander(f"**{cert_id} (AI 생성 실패)** | 모델: {cert.model_name} | 요청자: {cert.requester_id}",
+                                        key=f"exp_failed_{cert_id}")
+                    if not exp.open:
+                        continue
+                    with exp:
+                        st.write("**삭제된 데이터:**")
+                        st.markdown(f"> {cert.deleted_data}")
+                        st.error(f"❌ {cert.log[-1].message if cert.log else 'AI 제안 생성에 실패했습니다.'}\n\n"
+                                 "잠시 뒤 다시 생성하세요.")
+
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.button(
+                                "🔁 '대체' AI 제안 다시 생성",
+                                key=f"run_sub_{cert_id}",
+                                on_click=run_substitute_callback,
+                                args=(cert_id,),
+                                use_container_width=True,
+                                type="primary",
+                                disabled=not st.session_state.api_model
+                            )
+                        with col2:
+                            # 재탐색이 실패한 경우: 이전 제안이 남아 있으므로 그대로 검토를 이어 갈 수 있음
+                            if cert.internal_ai_suggestion:
+                                st.button(
+                                    "↩️ 이전 제안으로 검토 계속",
+                                    key=f"resume_review_{cert_id}",
+                                    on_click=resume_review_callback,
+                                    args=(cert_id,),
+                                    use_container_width=True
+                                )
+
+                elif status == "Pending_Substitute_Review_MLOps":
+                    # [상태 2: MLOps 검토 대기]
+                    exp = lazy_expander(f"**{cert_id} (MLOps 검토 대기)** | 모델: {cert.model_name}",
+                                        key=f"exp_review_{cert_id}")
+                    if not exp.open:
+                        continue
+                    with exp:
+
+                        rejection = cert.last_rejection()
+                        if rejection is not None:
+                            st.error(
+                                f"R2BF 부서가 이 '대체(안)'을 거부했습니다. (사유: {rejection.reason})\n\n'AI 재탐색'을 수행하거나, 내용을 수정하여 다시 요청하세요.")
+
+                        st.warning("**[AI가 제안한 '대체' 문장]**")
+
+                        # 다른 세션에서 생성된 제안이거나 앱 재시작 후, 또는 스트리밍으로 받던 중간 결과가
+                        # 표시되어 있었다면 저장소의 값으로 편집 상자를 채움
+                        streamed = st.session_state.pop(f"mlops_streamed_{cert_id}", False)
+                        if streamed or f"mlops_edit_{cert_id}" not in st.session_state:
+                            st.session_state[f"mlops_edit_{cert_id}"] = cert.internal_ai_suggestion
+
+                        st.text_area(
+                            "AI 제안 (수정 가능):",
+                            key=f"mlops_edit_{cert_id}",
+                            height=500
+                        )
+                        if render_leak_check(st.session_state[f"mlops_edit_{cert_id}"], cert.deleted_data):
+                            st.checkbox("누출이 아님을 확인했습니다 (이대로 R2BF에 전송)", key=f"leak_ack_{cert_id}")
+
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            pooled = candidate_pool.size(cert_id)
+                            st.button(
+                                f"🔄 AI 재탐색 (후보 {pooled}개 준비됨)" if pooled else "🔄 AI 재탐색",
+                                key=f"regen_mlops_{cert_id}",
+                                on_click=regenerate_ai_suggestion_mlops_callback,
+                                args=(cert_id,),
+                                use_container_width=True,
+                                disabled=not st.session_state.api_model
+                            )
+                        with col2:
+                            st.button(
+                                "👍 R2BF에 '대체' 승인 요청",
+                                key=f"send_to_r2bf_{cert_id}",
+                                on_click=send_substitute_to_r2bf_callback,
+                                args=(cert_id,),
+                                use_container_width=True,
+                                type="primary"
+                            )
+            render_pager("substitute", combined_substitute_page, substitute_total)
+
+        # 생성 작업이 모두 끝나면 주기적 새로고침을 멈추고 탭 건수 등을 갱신하기 위해 앱 전체를 한 번 다시 실행
+        if substitute_polling and not store.count("Substituting_In_Progress"):
+            st.rerun()
+
+    # AI 제안 생성 중인 인증서가 있으면 이 큐만 주기적으로 다시 그려 결과를 반영 (앱 전체 재실행 없음)
+    substitute_polling = store.count("Substituting_In_Progress") > 0
+    queue_fragment("substitute", render_substitute_queue,
+                   run_every=(STREAM_POLL_SECONDS if ai_streams else SUBSTITUTE_POLL_SECONDS) if substitute_polling else None)
 
-                    st.button(
-                        "▶️ '대체' AI 제안 생성 (→ MLOps 검토)",
-                        key=f"run_sub_{cert_id}",
-                        on_click=run_substitute_callback,
-                        args=(cert_id,),
-                        use_container_width=True,
-                        type="primary",
-                        disabled=not st.session_state.api_model
-                    )
+# --- [장면 3 & 5] R2BF 부서 (승인팀) 대시보드 ---
+with tab3, timed_section("tab3"):
+    st.header("🛡️ R2BF 부서 (승인팀) 대시보드")
 
-            elif status == "Pending_Substitute_Review_MLOps":
-                # [상태 2: MLOps 검토 대기]
-                with st.expander(f"**{cert_id} (MLOps 검토 대기)** | 모델: {cert['content']['model_name']}"):
-
-                    last_log_message = cert['log'][-1]['message']
-                    if "거부" in last_log_message and cert['log'][-1]['actor'] == "R2BF 부서":
-                        try:
-                            reason_text = last_log_message.split('(사유: ')[1].split(')')[0]
-                        except IndexError:
-                            reason_text = "N/A"
-                        st.error(
-                            f"R2BF 부서가 이 '대체(안)'을 거부했습니다. (사유: {reason_text})\n\n'AI 재탐색'을 수행하거나, 내용을 수정하여 다시 요청하세요.")
-
-                    st.warning("**[AI가 제안한 '대체' 문장]**")
-
-                    st.text_area(
-                        "AI 제안 (수정 가능):",
-                        key=f"mlops_edit_{cert_id}",
-                        height=500
+    def render_forget_approval_queue():
+        forget_approval_total = store.count("Pending_Forget_Approval")
+        st.subheader(f"장면 3: '잊힘' 승인 큐 ({forget_approval_total}건)")
+        st.markdown("MLOps팀이 '잊힘' 처리를 완료한 건입니다. 내용을 검토하고 '승인' 또는 '거부'합니다.")
+        if forget_approval_total:
+            render_batch_panel("forget_approval", forget_approval_total, "삭제된 데이터", lambda cert: cert.deleted_data,
+                               batch_approve_forget_callback, batch_reject_forget_callback)
+
+        pending_forget_approval_page = load_page("forget_approval", statuses=("Pending_Forget_Approval",))
+        if not pending_forget_approval_page.certs:
+            st.info("현재 '잊힘 승인'을 대기 중인 항목이 없습니다.")
+        else:
+            for cert in pending_forget_approval_page.certs:
+                cert_id = cert.cert_id
+                exp = lazy_expander(f"**{cert_id} (잊힘 승인 대기)** | 요청자: {cert.requester_id}",
+                                    key=f"exp_forget_approval_{cert_id}")
+                if not exp.open:
+                    continue
+                with exp:
+                    st.write(f"**'잊힘' 수행자:** {cert.operator_id}")
+                    st.write(f"**삭제된 데이터:** {cert.deleted_data}")
+                    st.info("MLOps팀의 '잊힘' 알고리즘 수행 결과를 검토(시뮬레이션)했습니다.")
+
+                    # [수정] 레이아웃 변경
+                    st.text_input(
+                        "거부 사유 (필수)",
+                        key=f"reject_reason_forget_{cert_id}",
+                        placeholder="거부 사유를 MLOps에 전달합니다."
                     )
 
                     col1, col2 = st.columns(2)
                     with col1:
                         st.button(
-                            "🔄 AI 재탐색",
-                            key=f"regen_mlops_{cert_id}",
-                            on_click=regenerate_ai_suggestion_mlops_callback,
+                            "👍 '잊힘' 승인 및 '대체' 작업 요청 (→ MLOps)",
+                            key=f"approve_forget_{cert_id}",
+                            on_click=approve_forget_callback,
                             args=(cert_id,),
                             use_container_width=True,
-                            disabled=not st.session_state.api_model
+                            type="primary"
                         )
                     with col2:
                         st.button(
-                            "👍 R2BF에 '대체' 승인 요청",
-                            key=f"send_to_r2bf_{cert_id}",
-                            on_click=send_substitute_to_r2bf_callback,
+                            "👎 '잊힘' 거부 (→ MLOps 재작업)",
+                            key=f"reject_forget_{cert_id}",
+                            on_click=reject_forget_callback,
                             args=(cert_id,),
-                            use_container_width=True,
-                            type="primary"
+                            use_container_width=True
                         )
+            render_pager("forget_approval", pending_forget_approval_page, forget_approval_total)
 
-# --- [장면 3 & 5] R2BF 부서 (승인팀) 대시보드 ---
-with tab3:
-    st.header("🛡️ R2BF 부서 (승인팀) 대시보드")
-
-    st.subheader("장면 3: '잊힘' 승인 큐")
-    st.markdown("MLOps팀이 '잊힘' 처리를 완료한 건입니다. 내용을 검토하고 '승인' 또는 '거부'합니다.")
-
-    pending_forget_approval_certs = {k: v for k, v in st.session_state.certificate_db.items() if
-                                     v["current_status"] == "Pending_Forget_Approval"}
-    if not pending_forget_approval_certs:
-        st.info("현재 '잊힘 승인'을 대기 중인 항목이 없습니다.")
-    else:
-        for cert_id, cert in pending_forget_approval_certs.items():
-            with st.expander(f"**{cert_id} (잊힘 승인 대기)** | 요청자: {cert['requester_id']}"):
-                st.write(f"**'잊힘' 수행자:** {cert['operator_id']}")
-                st.write(f"**삭제된 데이터:** {cert['content']['deleted_data']}")
-                st.info("MLOps팀의 '잊힘' 알고리즘 수행 결과를 검토(시뮬레이션)했습니다.")
-
-                # [수정] 레이아웃 변경
-                st.text_input(
-                    "거부 사유 (필수)",
-                    key=f"reject_reason_forget_{cert_id}",
-                    placeholder="거부 사유를 MLOps에 전달합니다."
-                )
-
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.button(
-                        "👍 '잊힘' 승인 및 '대체' 작업 요청 (→ MLOps)",
-                        key=f"approve_forget_{cert_id}",
-                        on_click=approve_forget_callback,
-                        args=(cert_id,),
-                        use_container_width=True,
-                        type="primary"
-                    )
-                with col2:
-                    st.button(
-                        "👎 '잊힘' 거부 (→ MLOps 재작업)",
-                        key=f"reject_forget_{cert_id}",
-                        on_click=reject_forget_callback,
-                        args=(cert_id,),
-                        use_container_width=True
-                    )
+    queue_fragment("forget_approval", render_forget_approval_queue)
 
     st.divider()
 
-    st.subheader("장면 5: '대체' (최종) 승인 큐")
-    st.markdown("MLOps팀이 '대체' 처리를 완료한 건입니다. MLOps가 검토/수정한 '대체' 안을 검토하고 '승인' 또는 '거부'합니다.")
-
-    pending_substitute_approval_certs = {k: v for k, v in st.session_state.certificate_db.items() if
-                                         v["current_status"] == "Pending_Substitute_Approval"}
-    if not pending_substitute_approval_certs:
-        st.info("현재 '대체 (최종) 승인'을 대기 중인 항목이 없습니다.")
-    else:
-        for cert_id, cert in pending_substitute_approval_certs.items():
-            with st.expander(f"**{cert_id} (대체 승인 대기)** | 요청자: {cert['requester_id']}"):
-                st.write(f"**'대체' 수행자:** {cert['operator_id']}")
-
-                st.warning("**[MLOps가 제출한 '대체' 문장]**")
-                ai_suggestion = cert['internal_ai_suggestion']
-                st.markdown(f"_{ai_suggestion}_")
+    def render_substitute_approval_queue():
+        substitute_approval_total = store.count("Pending_Substitute_Approval")
+        st.subheader(f"장면 5: '대체' (최종) 승인 큐 ({substitute_approval_total}건)")
+        st.markdown("MLOps팀이 '대체' 처리를 완료한 건입니다. MLOps가 검토/수정한 '대체' 안을 검토하고 '승인' 또는 '거부'합니다.")
+        if substitute_approval_total:
+            render_batch_panel("substitute_approval", substitute_approval_total, "'대체' 문장",
+                               lambda cert: cert.internal_ai_suggestion,
+                               batch_approve_substitute_callback, batch_reject_substitute_callback)
+
+        pending_substitute_approval_page = load_page("substitute_approval", statuses=("Pending_Substitute_Approval",))
+        if not pending_substitute_approval_page.certs:
+            st.info("현재 '대체 (최종) 승인'을 대기 중인 항목이 없습니다.")
+        else:
+            for cert in pending_substitute_approval_page.certs:
+                cert_id = cert.cert_id
+                exp = lazy_expander(f"**{cert_id} (대체 승인 대기)** | 요청자: {cert.requester_id}",
+                                    key=f"exp_substitute_approval_{cert_id}")
+                if not exp.open:
+                    continue
+                with exp:
+                    st.write(f"**'대체' 수행자:** {cert.operator_id}")
+
+                    st.warning("**[MLOps가 제출한 '대체' 문장]**")
+                    ai_suggestion = cert.internal_ai_suggestion
+                    st.markdown(f"_{ai_suggestion}_")
+                    render_leak_check(ai_suggestion, cert.deleted_data)
+
+                    st.caption("[장면 5] MLOps가 제출한 안을 검토 후 '승인' 또는 '거부'하세요.")
+
+                    # [수정] 레이아웃 변경
+                    st.text_input(
+                        "거부 사유 (필수)",
+                        key=f"reject_reason_sub_{cert_id}",
+                        placeholder="거부 사유를 MLOps에 전달합니다."
+                    )
 
-                st.caption("[장면 5] MLOps가 제출한 안을 검토 후 '승인' 또는 '거부'하세요.")
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.button(
+                            "✅ '대체' 및 최종 승인 (인증서 발행)",
+                            key=f"approve_sub_{cert_id}",
+                            on_click=approve_substitute_callback,
+                            args=(cert_id,),
+                            use_container_width=True,
+                            type="primary"
+                        )
+                    with col2:
+                        st.button(
+                            "👎 '대체' 거부 (→ MLOps 재검토)",
+                            key=f"reject_sub_{cert_id}",
+                            on_click=reject_substitute_callback,
+                            args=(cert_id,),
+                            use_container_width=True
+                        )
+            render_pager("substitute_approval", pending_substitute_approval_page, substitute_approval_total)
 
-                # [수정] 레이아웃 변경
-                st.text_input(
-                    "거부 사유 (필수)",
-                    key=f"reject_reason_sub_{cert_id}",
-                    placeholder="거부 사유를 MLOps에 전달합니다."
-                )
-
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.button(
-                        "✅ '대체' 및 최종 승인 (인증서 발행)",
-                        key=f"approve_sub_{cert_id}",
-                        on_click=approve_substitute_callback,
-                        args=(cert_id,),
-                        use_container_width=True,
-                        type="primary"
-                    )
-                with col2:
-                    st.button(
-                        "👎 '대체' 거부 (→ MLOps 재검토)",
-                        key=f"reject_sub_{cert_id}",
-                        on_click=reject_substitute_callback,
-                        args=(cert_id,),
-                        use_container_width=True
-                    )
+    queue_fragment("substitute_approval", render_substitute_approval_queue)
 
 # --- 🗂️ 인증서 조회 탭 ---
-with tab4:
+with tab4, timed_section("tab4"):
     st.header("🗂️ 인증서 조회 (전체)")
     st.markdown("모든 R2BF 인증서의 현재 상태와 최종 결과를 조회합니다.")
 
-    search_term = st.text_input("인증서 검색 (ID, 요청자, 내용 등으로 검색)", key="search_input").lower()
-
-    all_certs = st.session_state.certificate_db.values()
-    filtered_certs = []
-    if search_term:
-        for cert in all_certs:
-            if (search_term in cert["cert_id"].lower() or
-                    search_term in cert["requester_id"].lower() or
-                    (cert["operator_id"] and search_term in cert["operator_id"].lower()) or
-                    (cert["approver_id"] and search_term in cert["approver_id"].lower()) or
-                    search_term in cert["content"]["deleted_data"].lower()):
-                filtered_certs.append(cert)
-    else:
-        filtered_certs = list(all_certs)
-
-    sorted_certs = sorted(filtered_certs, key=lambda x: x['log'][0]['timestamp'], reverse=True)
-
-    if not sorted_certs:
-        st.info(f"'{search_term}'에 해당하는 인증서가 없습니다.")
-
-    for cert in sorted_certs:
-        status = cert["current_status"]
-        if status == "Completed":
-            color = "success"
-            status_text = "처리 완료"
-        elif "Pending" in status:
-            color = "warning"
-            status_text = "승인 대기 중"
+    def render_export_panel():
+        with st.expander("📤 내보내기 (규제 기관 제출용, 처리 로그 포함)"):
+            col1, col2 = st.columns(2)
+            with col1:
+                statuses = st.multiselect("상태", [status.value for status in Status], default=[Status.COMPLETED.value],
+                                          key="export_statuses", help="비워 두면 모든 상태")
+                model_name = st.text_input("대상 모델명 (정확히 일치)", key="export_model").strip()
+                requester_id = st.text_input("요청자 (정확히 일치)", key="export_requester").strip()
+            with col2:
+                date_field = st.radio("기간 기준", ("created_at", "completion_date"), horizontal=True,
+                                      format_func={"created_at": "발행일", "completion_date": "처리 완료일"}.get,
+                                      key="export_date_field")
+                since = st.date_input("시작일", value=None, key="export_since")
+                until = st.date_input("종료일 (포함)", value=None, key="export_until")
+                formats = [fmt for fmt in EXPORT_FORMATS if fmt != "parquet" or parquet_available()]
+                fmt = st.selectbox("형식", formats, format_func=str.upper, key="export_format",
+                                   help=None if parquet_available() else "Parquet 는 pyarrow 를 설치하면 사용할 수 있습니다.")
+            filters = dict(statuses=statuses, model_name=model_name or None, requester_id=requester_id or None,
+                           since=since.isoformat() if since else None,
+                           until=(until + datetime.timedelta(days=1)).isoformat() if until else None,
+                           date_field=date_field)
+
+            def build_export():
+                # 버튼을 누르면 별도 스레드에서 실행됨. 인증서는 청크 단위로 읽어 바로 파일 형식으로 씀
+                sink = io.BytesIO()
+                with metrics.timer("r2bf_export_seconds", format=fmt):
+                    certs = store.export(**filters)
+                    try:
+                        write_export(certs, fmt, sink)
+                    finally:
+                        certs.close()
+                return sink
+
+            cli_command = export_cli_command(fmt, filters)
+            export_count = store.export_count(**filters)
+            if export_count > UI_EXPORT_LIMIT:
+                st.warning(f"조건에 맞는 인증서가 {export_count:,}건으로 화면 내려받기 한도({UI_EXPORT_LIMIT:,}건)를 넘습니다. "
+                           f"조건을 좁히거나 CLI로 내보내세요:")
+                st.code(cli_command, language="bash")
+            else:
+                st.download_button(f"📤 내보내기 파일 만들기 및 내려받기 ({export_count:,}건)", build_export,
+                                   file_name=export_file_name(fmt), mime=EXPORT_FORMATS[fmt][0], on_click="ignore",
+                                   key="export_download", use_container_width=True)
+                st.caption(f"대량 내보내기나 야간 배치는 CLI를 사용하세요: `{cli_command}`")
+
+    queue_fragment("export", render_export_panel)
+
+    def render_browser():
+        search_term = st.text_input("인증서 검색 (ID, 요청자, 모델, 내용, 대체 문장, 로그 등으로 검색)", key="search_input")
+        fuzzy_search = st.toggle("유사 검색 (오타 허용)", key="search_fuzzy")
+
+        # 목록에는 헤더에 필요한 컬럼만 읽고, 본문(로그 포함)은 펼친 인증서만 따로 조회
+        if search_term:
+            # 역색인 검색 결과는 관련도 순 (동점이면 최신 순) 이므로 keyset 대신 순위 구간으로 페이지를 나눔
+            result_ids = search_index.search(search_term, fuzzy=fuzzy_search, limit=SEARCH_RESULT_LIMIT)
+            offset = st.session_state.get("page_search", {}).get("offset", 0)
+            if offset >= len(result_ids):
+                offset = 0
+            browse_page = Page(store.get_many(result_ids[offset:offset + PAGE_SIZE]),
+                               max(0, offset - PAGE_SIZE) if offset > 0 else None,
+                               offset + PAGE_SIZE if offset + PAGE_SIZE < len(result_ids) else None)
+            browse_total = len(result_ids)
+            st.caption(f"관련도 순 상위 {browse_total}건")
         else:
-            color = "info"
-            status_text = "처리 중"
-
-        with st.expander(f"**{cert['cert_id']}** | 상태: **{status_text}** | 요청자: {cert['requester_id']}"):
-            st.markdown(f"**1. 인증서 고유 번호:** `{cert['cert_id']}`")
-            st.markdown(f"**2. 요청자:** `{cert['requester_id']}`")
-            st.markdown(f"**3. 처리자 (MLOps):** `{cert['operator_id'] if cert['operator_id'] else 'N/A'}`")
-            st.markdown(f"**4. 최종 승인자 (R2BF):** `{cert['approver_id'] if cert['approver_id'] else 'N/A'}`")
-            st.markdown(f"**5. 처리 완료일:** `{cert['completion_date'] if cert['completion_date'] else 'N/A'}`")
+            browse_page = load_page("browse", with_logs=False)
+            browse_total = store.count()
 
-            st.markdown("---")
-            st.markdown("#### 처리 내용")
+        if not browse_page.certs:
+            st.info(f"'{search_term}'에 해당하는 인증서가 없습니다.")
 
-            # [수정] '대상 모델' 추가
-            st.markdown(f"**대상 모델:** {cert['content']['model_name']}")
+        # 보이는 인증서만 로그와 내용을 다시 해시해 저장된 해시 체인·인증서 해시 + 전역 루트 포함 증명과 대조 (한 번의 조회)
+        with metrics.timer("r2bf_audit_verify_seconds"):
+            verifications = audit_index.verify_many(store, [cert.cert_id for cert in browse_page.certs])
+        st.caption(f"전역 무결성 루트 (인증서 {len(audit_index)}건): `{audit_index.root()}`")
 
-            if cert['current_status'] in ["Pending_Forget", "Pending_Forget_Approval", "Forgetting_In_Progress"]:
-                st.caption("삭제 요청 데이터:")
+        for cert in browse_page.certs:
+            status = cert.current_status
+            if status == "Completed":
+                color = "success"
+                status_text = "처리 완료"
+            elif "Pending" in status:
+                color = "warning"
+                status_text = "승인 대기 중"
             else:
-                st.caption("삭제된 데이터:")
-
-            st.markdown(f"> {cert['content']['deleted_data']}")
-
-            st.caption("적용된 대체 정보 (최종 승인 시 표시):")
-
-            replacement_text = cert['content']['replacement_data']
-
-            if not replacement_text:
-                replacement_text = '(아직 "대체"가 완료되지 않았습니다.)'
+                color = "info"
+                status_text = "처리 중"
+
+            verification = verifications.get(cert.cert_id)
+            audit_badge = "🔒 검증됨" if verification and verification.ok else "⚠️ 검증 실패"
+            exp = lazy_expander(f"**{cert.cert_id}** | 상태: **{status_text}** | 요청자: {cert.requester_id} | "
+                                f"{audit_badge}", key=f"exp_browse_{cert.cert_id}")
+            if not exp.open:
+                continue
+            cert = store.get(cert.cert_id)
+            with exp:
+                st.markdown(f"**1. 인증서 고유 번호:** `{cert.cert_id}`")
+                st.markdown(f"**2. 요청자:** `{cert.requester_id}`")
+                st.markdown(f"**3. 처리자 (MLOps):** `{cert.operator_id if cert.operator_id else 'N/A'}`")
+                st.markdown(f"**4. 최종 승인자 (R2BF):** `{cert.approver_id if cert.approver_id else 'N/A'}`")
+                st.markdown(f"**5. 처리 완료일:** `{cert.completion_date if cert.completion_date else 'N/A'}`")
+
+                st.markdown("---")
+                st.markdown("#### 처리 내용")
+
+                # [수정] '대상 모델' 추가
+                st.markdown(f"**대상 모델:** {cert.model_name}")
+
+                if cert.current_status in ["Pending_Forget", "Pending_Forget_Approval", "Forgetting_In_Progress"]:
+                    st.caption("삭제 요청 데이터:")
+                else:
+                    st.caption("삭제된 데이터:")
+
+                st.markdown(f"> {cert.deleted_data}")
+
+                st.caption("적용된 대체 정보 (최종 승인 시 표시):")
+
+                replacement_text = cert.replacement_data
+
+                if not replacement_text:
+                    replacement_text = '(아직 "대체"가 완료되지 않았습니다.)'
+
+                st.markdown(f"{replacement_text}")
+
+                st.markdown("---")
+                st.markdown("#### 6. 처리 로그 (Log)")
+                log_data = [{"Timestamp": log.isoformat(), "Status": log.status.value, "Actor": log.actor,
+                             "Message": log.message, "Reason": log.reason} for log in cert.log]
+                st.dataframe(log_data, use_container_width=True)
+
+                st.markdown("#### 7. 무결성 검증")
+                if verification is None:
+                    st.warning("무결성 정보를 불러오지 못했습니다.")
+                elif verification.ok:
+                    st.success(f"로그 {len(cert.log)}건의 해시 체인과 전역 루트 포함 증명 "
+                               f"({len(verification.proof)}단계)이 모두 일치합니다.")
+                elif verification.bad_seq is not None:
+                    st.error(f"로그 {verification.bad_seq}번부터 저장된 해시와 내용이 일치하지 않습니다. (변조 의심)")
+                elif not verification.content_ok:
+                    st.error("인증서 내용(요청자, 대상 모델, 삭제 데이터, 대체 정보, 처리 완료일)이 기록 시점의 해시와 "
+                             "일치하지 않습니다. (변조 의심)")
+                else:
+                    st.error("인증서 해시가 전역 루트에 포함되어 있지 않습니다. (변조 의심)")
+                if verification is not None:
+                    st.caption(f"로그 Merkle 루트: `{verification.log_root}`")
+                    st.caption(f"인증서 해시: `{verification.cert_hash}`")
+
+        if search_term:
+            render_pager("search", browse_page, browse_total, cursor_names=("offset", "offset"))
+        else:
+            render_pager("browse", browse_page, browse_total)
 
-            st.markdown(f"{replacement_text}")
+    queue_fragment("browse", render_browser)
 
-            st.markdown("---")
-            st.markdown("#### 6. 처리 로그 (Log)")
-            log_data = [{"Timestamp": log["timestamp"], "Status": log["status"], "Actor": log["actor"],
-                         "Message": log["message"]} for log in cert["log"]]
-            st.dataframe(log_data, use_container_width=True)
\ No newline at end of file
+# 화면 스크립트 전체 재실행 시간 (부분 재실행인 fragment 는 제외)
+metrics.observe("r2bf_rerun_seconds", time.perf_counter() - rerun_started)
@@ -0,0 +1,252 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ----------------------------------------------------------------------
+# 핫 패스 계측 (소요 시간 히스토그램 + 오류율)
+# ----------------------------------------------------------------------
+# 화면 재실행, 탭 렌더링, 버튼 콜백, Gemini 호출 시간을 모든 세션이 공유하는 레지스트리에 기록합니다.
+# 누적 버킷은 Prometheus 텍스트 형식으로 내보내고(HTTP 또는 파일),
+# 최근 window_seconds 동안의 표본으로 사이드바 운영 패널의 p50/p95/오류율을 계산합니다.
+
+# 최근 구간 길이 (초, 기본 5분)
+DEFAULT_WINDOW_SECONDS = int(os.environ.get("R2BF_METRICS_WINDOW", "300"))
+
+# 지표별로 보관할 최근 표본 수 상한
+DEFAULT_WINDOW_SAMPLES = 2048
+
+# 히스토그램 버킷 상한 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Prometheus 노출: HTTP 포트 (예: 9464 -> http://localhost:9464/metrics) 와 텍스트 파일 경로, 파일 갱신 주기
+METRICS_PORT = int(os.environ.get("R2BF_METRICS_PORT", "0")) or None
+METRICS_FILE = os.environ.get("R2BF_METRICS_FILE") or None
+METRICS_FILE_INTERVAL = float(os.environ.get("R2BF_METRICS_FILE_INTERVAL", "15"))
+
+logger = logging.getLogger(__name__)
+
+
+def _quantile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else None
+
+
+class Histogram:
+    """누적 버킷(Prometheus) + 최근 표본(운영 패널)을 함께 보관하는 소요 시간 히스토그램"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window_seconds=DEFAULT_WINDOW_SECONDS,
+                 window_samples=DEFAULT_WINDOW_SAMPLES):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+        self.window_seconds = window_seconds
+        self._recent = deque(maxlen=window_samples)  # (monotonic 시각, 소요 시간, 오류 여부)
+
+    def observe(self, seconds, error=False):
+        self.bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if error:
+            self.errors += 1
+        self._recent.append((time.monotonic(), seconds, error))
+
+    def recent(self):
+        """최근 구간의 (소요 시간 목록, 오류 수)"""
+        cutoff = time.monotonic() - self.window_seconds
+        while self._recent and self._recent[0][0] < cutoff:
+            self._recent.popleft()
+        return [seconds for _, seconds, _ in self._recent], sum(1 for _, _, error in self._recent if error)
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _errors_name(name):
+    return name.removesuffix("_seconds") + "_errors_total"
+
+
+class MetricsRegistry:
+    """
+    이름 + 레이블별 히스토그램 모음 (모든 세션 공유, 스레드 안전).
+    오류로 끝난 호출도 소요 시간에 포함하고, 따로 <이름>_errors_total 로 집계합니다.
+    """
+
+    def __init__(self, window_seconds=DEFAULT_WINDOW_SECONDS, buckets=DEFAULT_BUCKETS):
+        self.window_seconds = window_seconds
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}  # (이름, ((레이블, 값), ...)) -> Histogram
+        self._help = {}
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def observe(self, name, seconds, error=False, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets, self.window_seconds)
+            histogram.observe(seconds, error)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        with 블록의 소요 시간을 기록 (예외가 나면 오류로 집계하고 다시 발생시킴).
+        st.rerun() 같은 Streamlit 제어 흐름 예외(BaseException)는 오류로 보지 않습니다.
+        """
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, error, **labels)
+
+    def timed(self, name, label="callback"):
+        """함수 호출 시간을 {label}=함수 이름 으로 기록하는 데코레이터"""
+
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **{label: fn.__name__}):
+                    return fn(*args, **kwargs)
+            return wrapper
+
+        return decorator
+
+    def summary(self):
+        """운영 패널용 최근 구간 요약 [{지표, 레이블, 호출 수, p50, p95, 최대, 오류율, 누적 호출 수}]"""
+        with self._lock:
+            rows = []
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                samples, errors = histogram.recent()
+                samples.sort()
+                rows.append({
+                    "metric": name,
+                    "labels": ", ".join(f"{key}={value}" for key, value in labels),
+                    "count": len(samples),
+                    "p50_ms": _quantile(samples, 0.5) * 1000 if samples else None,
+                    "p95_ms": _quantile(samples, 0.95) * 1000 if samples else None,
+                    "max_ms": samples[-1] * 1000 if samples else None,
+                    "error_rate": errors / len(samples) if samples else None,
+                    "total": histogram.count,
+                })
+            return rows
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 노출 형식 (버전 0.0.4)"""
+        families = {}
+        with self._lock:
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                families.setdefault(name, []).append((labels, histogram.bucket_counts[:], histogram.count,
+                                                      histogram.sum, histogram.errors))
+        lines = []
+        for name, series in families.items():
+            lines.append(f"# HELP {name} {self._help.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, bucket_counts, count, total, _ in series:
+                cumulative = 0
+                for bound, bucket_count in zip((*self.buckets, "+Inf"), bucket_counts):
+                    cumulative += bucket_count
+                    le = bound if bound == "+Inf" else repr(float(bound))
+                    lines.append(f"{name}_bucket{_label_text((*labels, ('le', le)))} {cumulative}")
+                lines.append(f"{name}_sum{_label_text(labels)} {total}")
+                lines.append(f"{name}_count{_label_text(labels)} {count}")
+            errors_name = _errors_name(name)
+            lines.append(f"# HELP {errors_name} {name} 중 오류로 끝난 호출 수")
+            lines.append(f"# TYPE {errors_name} counter")
+            for labels, _, _, _, errors in series:
+                lines.append(f"{errors_name}{_label_text(labels)} {errors}")
+        return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------
+# Prometheus 노출 (HTTP /metrics, 텍스트 파일)
+# ----------------------------------------------------------------------
+
+class MetricsExporter:
+    """
+    port 를 주면 http://<host>:<port>/metrics 로, path 를 주면 interval 초마다 파일로 지표를 내보냅니다.
+    (파일은 node_exporter textfile collector 등에서 읽도록 임시 파일에 쓴 뒤 교체)
+    """
+
+    def __init__(self, registry, port=METRICS_PORT, path=METRICS_FILE, interval=METRICS_FILE_INTERVAL,
+                 host="127.0.0.1"):
+        self.registry = registry
+        self.port = port
+        self.path = path
+        self.interval = interval
+        self.host = host
+        self._server = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self.port:
+            self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+            self.port = self._server.server_address[1]
+            threading.Thread(target=self._server.serve_forever, name="r2bf-metrics-http", daemon=True).start()
+            logger.info("지표 노출: http://%s:%d/metrics", self.host, self.port)
+        if self.path:
+            threading.Thread(target=self._write_loop, name="r2bf-metrics-file", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def write_file(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.registry.render_prometheus())
+        os.replace(tmp_path, self.path)
+
+    def _write_loop(self):
+        while True:
+            try:
+                self.write_file()
+            except OSError:
+                logger.exception("지표 파일 쓰기 실패: %s", self.path)
+            if self._stop.wait(self.interval):
+                return
+
+    def _handler(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # 수집 요청마다 표준 오류에 접근 로그를 남기지 않음
+                pass
+
+        return Handler
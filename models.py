@@ -0,0 +1,165 @@
+import datetime
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import List, Optional
+
+# ----------------------------------------------------------------------
+# 인증서 / 처리 로그 타입
+# ----------------------------------------------------------------------
+# 인증서와 로그 항목을 dict 대신 __slots__ 데이터클래스로 표현합니다.
+# 상태는 Enum, 처리자·메시지는 intern 된 문자열이라 같은 값은 한 객체를 공유하고,
+# 시각은 정수(마이크로초), 거부 사유는 메시지 문자열이 아닌 별도 필드(reason)에 둡니다.
+
+
+class Status(str, Enum):
+    """인증서 상태. str 을 상속하므로 기존처럼 문자열과 바로 비교할 수 있습니다."""
+    PENDING_FORGET = "Pending_Forget"
+    FORGETTING_IN_PROGRESS = "Forgetting_In_Progress"
+    PENDING_FORGET_APPROVAL = "Pending_Forget_Approval"
+    PENDING_SUBSTITUTE = "Pending_Substitute"
+    SUBSTITUTING_IN_PROGRESS = "Substituting_In_Progress"
+    SUBSTITUTE_FAILED = "Substitute_Failed"
+    PENDING_SUBSTITUTE_REVIEW_MLOPS = "Pending_Substitute_Review_MLOps"
+    PENDING_SUBSTITUTE_APPROVAL = "Pending_Substitute_Approval"
+    COMPLETED = "Completed"
+
+    # f-string / str() 에서 "Status.COMPLETED" 가 아닌 값 그대로 표시
+    __str__ = str.__str__
+    __format__ = str.__format__
+
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+# ----------------------------------------------------------------------
+# 인증서 ID (ULID 형식)
+# ----------------------------------------------------------------------
+# "CERT-" + 밀리초 시각 48비트 + 난수 80비트를 Crockford base32 26자로 씁니다.
+# 문자열 순서가 발행 순서와 같고, 같은 밀리초 안에서는 난수를 1씩 늘려 한 프로세스 안에서 단조 증가합니다.
+# 프로세스·세션이 달라도 80비트 난수 덕분에 충돌하지 않습니다. (예전 "CERT-2025-XXX" ID 는 그대로 유지)
+
+CERT_ID_PREFIX = "CERT-"
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_ulid_lock = threading.Lock()
+_last_ulid = (0, 0)  # (밀리초, 난수)
+
+
+def _base32(value, length):
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        chars.append(_CROCKFORD[digit])
+    return "".join(reversed(chars))
+
+
+def new_ulid():
+    """단조 증가 ULID (26자)"""
+    global _last_ulid
+    with _ulid_lock:
+        millis = time.time_ns() // 1_000_000
+        last_millis, last_random = _last_ulid
+        if millis <= last_millis:
+            # 같은 밀리초이거나 시계가 뒤로 간 경우: 직전 값에서 이어 감
+            millis, random = last_millis, last_random + 1
+            if random >= 1 << 80:
+                millis, random = millis + 1, int.from_bytes(os.urandom(10), "big")
+        else:
+            random = int.from_bytes(os.urandom(10), "big")
+        _last_ulid = (millis, random)
+    return _base32(millis, 10) + _base32(random, 16)
+
+
+def new_cert_id():
+    return CERT_ID_PREFIX + new_ulid()
+
+
+def to_micros(iso_timestamp):
+    """ISO 시각 문자열 -> 1970-01-01 기준 마이크로초 (시간대 없는 로컬 시각 그대로)"""
+    return (datetime.datetime.fromisoformat(iso_timestamp) - _EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def from_micros(micros):
+    return (_EPOCH + datetime.timedelta(microseconds=micros)).isoformat()
+
+
+def _intern(text):
+    return sys.intern(text) if text is not None else None
+
+
+@dataclass(slots=True)
+class LogEntry:
+    timestamp: int  # 마이크로초 (to_micros)
+    status: Status
+    actor: str
+    message: str
+    reason: Optional[str] = None  # 거부 사유
+
+    @classmethod
+    def from_dict(cls, log):
+        return cls(to_micros(log["timestamp"]), Status(log["status"]), _intern(log["actor"]),
+                   _intern(log["message"]), log.get("reason"))
+
+    def to_dict(self):
+        log = {"timestamp": self.isoformat(), "status": self.status.value, "actor": self.actor,
+               "message": self.message}
+        if self.reason is not None:
+            log["reason"] = self.reason
+        return log
+
+    def isoformat(self):
+        return from_micros(self.timestamp)
+
+
+@dataclass(slots=True)
+class Certificate:
+    cert_id: str
+    requester_id: str
+    operator_id: Optional[str]
+    approver_id: Optional[str]
+    completion_date: Optional[str]
+    model_name: str
+    deleted_data: str
+    replacement_data: Optional[str]
+    current_status: Status
+    internal_ai_suggestion: Optional[str]
+    log: List[LogEntry] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, cert):
+        """기존 dict 형태(content 하위 dict 포함)에서 변환"""
+        content = cert["content"]
+        return cls(
+            cert["cert_id"], _intern(cert["requester_id"]), _intern(cert["operator_id"]), _intern(cert["approver_id"]),
+            cert["completion_date"], _intern(content["model_name"]), content["deleted_data"],
+            content["replacement_data"], Status(cert["current_status"]), cert["internal_ai_suggestion"],
+            [LogEntry.from_dict(log) for log in cert["log"]])
+
+    def to_dict(self):
+        """기존 dict 형태 (저널 / 스냅숏 / 내보내기용)"""
+        return {
+            "cert_id": self.cert_id,
+            "requester_id": self.requester_id,
+            "operator_id": self.operator_id,
+            "approver_id": self.approver_id,
+            "completion_date": self.completion_date,
+            "content": {
+                "model_name": self.model_name,
+                "deleted_data": self.deleted_data,
+                "replacement_data": self.replacement_data
+            },
+            "log": [log.to_dict() for log in self.log],
+            "current_status": self.current_status.value,
+            "internal_ai_suggestion": self.internal_ai_suggestion
+        }
+
+    @property
+    def last_log(self):
+        return self.log[-1] if self.log else None
+
+    def last_rejection(self):
+        """마지막 로그가 R2BF 부서의 거부이면 그 로그 항목 (아니면 None)"""
+        last = self.last_log
+        return last if last is not None and last.reason is not None else None
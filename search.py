@@ -0,0 +1,277 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from array import array
+
+# ----------------------------------------------------------------------
+# '인증서 조회' 탭 전문 검색 인덱스 (문자 n-gram 역색인)
+# ----------------------------------------------------------------------
+# 한국어는 형태소 분석 없이도 부분 일치가 되도록 단어를 문자 2-gram 으로 쪼개 색인합니다.
+# (예: "주소데이터" -> "주소", "소데", "데이", "이터")
+# 한 글자 검색어는 색인된 2-gram 중 그 글자로 시작하는 것들로 확장해 찾습니다.
+
+NGRAM = 2
+
+# (필드 이름, 가중치) - 비트마스크 순서이므로 순서를 바꾸면 안 됩니다.
+FIELDS = (
+    ("cert_id", 3.0),
+    ("model_name", 2.0),
+    ("requester_id", 1.5),
+    ("operator_id", 1.5),
+    ("approver_id", 1.5),
+    ("deleted_data", 1.0),
+    ("replacement", 1.0),
+    ("log", 0.5),
+)
+# 필드 비트마스크 -> 가중치 합 (필드가 8개이므로 256가지)
+MASK_WEIGHTS = [sum(weight for bit, (_, weight) in enumerate(FIELDS) if mask & (1 << bit)) for mask in range(256)]
+
+# 퍼지 검색 시 검색어 n-gram 중 이 비율 이상이 일치하면 결과에 포함
+FUZZY_MIN_MATCH = 0.5
+
+_WORD_RE = re.compile(r"[0-9a-z가-힣ㄱ-ㅎㅏ-ㅣ一-鿿]+")
+
+
+def normalize(text):
+    return unicodedata.normalize("NFC", text or "").lower()
+
+
+def tokenize(text):
+    """텍스트를 단어별 문자 n-gram 목록으로 변환 (한 글자 단어는 그대로)"""
+    grams = []
+    for word in _WORD_RE.findall(normalize(text)):
+        if len(word) < NGRAM:
+            grams.append(word)
+        else:
+            grams.extend(word[i:i + NGRAM] for i in range(len(word) - NGRAM + 1))
+    return grams
+
+
+def cert_fields(cert):
+    """색인 대상 필드별 텍스트"""
+    return (
+        cert.cert_id,
+        cert.model_name,
+        cert.requester_id,
+        cert.operator_id,
+        cert.approver_id,
+        cert.deleted_data,
+        " ".join(filter(None, (cert.replacement_data, cert.internal_ai_suggestion))),
+        " ".join(filter(None, (text for log in cert.log for text in (log.message, log.reason)))),
+    )
+
+
+class SearchIndex:
+    """
+    인증서 전문 검색 인덱스.
+
+    포스팅은 n-gram 마다 (문서 번호 배열, 필드 비트마스크 배열)로 보관합니다.
+    인증서가 바뀌면 새 문서 번호로 다시 색인하고 이전 번호는 삭제 표시만 해 두었다가,
+    삭제된 문서가 절반을 넘으면 한 번에 정리(compact)합니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self):
+        self._postings = {}  # gram -> (array('I') 문서 번호, array('B') 필드 마스크)
+        self._doc_ids = []  # 문서 번호 -> cert_id (삭제된 문서는 None)
+        self._docno = {}  # cert_id -> 현재 문서 번호
+        self._max_weight = {}  # gram -> 포스팅 중 가장 큰 필드 가중치
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._docno)
+
+    # --- 색인 ---
+
+    def add(self, cert):
+        """인증서를 (재)색인합니다."""
+        masks = {}
+        for bit, text in enumerate(cert_fields(cert)):
+            for gram in tokenize(text):
+                masks[gram] = masks.get(gram, 0) | (1 << bit)
+
+        with self._lock:
+            self._remove(cert.cert_id)
+            docno = len(self._doc_ids)
+            self._doc_ids.append(cert.cert_id)
+            self._docno[cert.cert_id] = docno
+            for gram, mask in masks.items():
+                posting = self._postings.get(gram)
+                if posting is None:
+                    posting = self._postings[gram] = (array("I"), array("B"))
+                posting[0].append(docno)
+                posting[1].append(mask)
+                if MASK_WEIGHTS[mask] > self._max_weight.get(gram, 0.0):
+                    self._max_weight[gram] = MASK_WEIGHTS[mask]
+
+    def remove(self, cert_id):
+        with self._lock:
+            self._remove(cert_id)
+
+    def _remove(self, cert_id):
+        docno = self._docno.pop(cert_id, None)
+        if docno is None:
+            return
+        self._doc_ids[docno] = None
+        self._dead += 1
+        if self._dead > len(self._docno):
+            self._compact()
+
+    def _compact(self):
+        """삭제 표시된 문서를 포스팅에서 제거하고 문서 번호를 다시 매깁니다."""
+        remap = {}
+        doc_ids = []
+        for docno, cert_id in enumerate(self._doc_ids):
+            if cert_id is not None:
+                remap[docno] = len(doc_ids)
+                doc_ids.append(cert_id)
+
+        postings = {}
+        max_weight = {}
+        for gram, (docs, masks) in self._postings.items():
+            new_docs, new_masks = array("I"), array("B")
+            for docno, mask in zip(docs, masks):
+                new = remap.get(docno)
+                if new is not None:
+                    new_docs.append(new)
+                    new_masks.append(mask)
+            if new_docs:
+                postings[gram] = (new_docs, new_masks)
+                max_weight[gram] = max(MASK_WEIGHTS[mask] for mask in new_masks)
+
+        self._postings = postings
+        self._max_weight = max_weight
+        self._doc_ids = doc_ids
+        self._docno = {cert_id: docno for docno, cert_id in enumerate(doc_ids)}
+        self._dead = 0
+
+    def rebuild(self, certs):
+        with self._lock:
+            self._clear()
+            for cert in certs:
+                self.add(cert)
+
+    # --- 검색 ---
+
+    def search(self, query, fuzzy=False, limit=50):
+        """
+        검색어와 관련도가 높은 순으로 cert_id 목록을 반환합니다. (동점이면 최근 인증서 우선)
+        fuzzy=False 이면 모든 n-gram 이 포함된 인증서만, True 이면 일부(FUZZY_MIN_MATCH 이상)만 일치해도 찾습니다.
+        """
+        with self._lock:
+            terms = self._expand(tokenize(query))
+            if not terms:
+                return []
+            required = max(1, math.ceil(len(terms) * FUZZY_MIN_MATCH)) if fuzzy else len(terms)
+            return [self._doc_ids[docno] for docno in self._top(terms, required, limit)]
+
+    def _idf(self, gram):
+        return math.log(1 + max(1, len(self._docno)) / len(self._postings[gram][0]))
+
+    def _group_size(self, group):
+        return sum(len(self._postings[gram][0]) for gram in group)
+
+    def _group_upper(self, group):
+        """그룹 점수의 상한 (조기 종료 판단용)"""
+        return max(self._idf(gram) * self._max_weight[gram] for gram in group)
+
+    def _lookup(self, group, docno):
+        """
+        문서 하나의 그룹 점수 (없으면 0). 포스팅의 문서 번호는 오름차순이므로 이진 탐색하며,
+        한 글자 검색어가 여러 n-gram 으로 확장된 그룹은 가장 높은 n-gram 점수만 반영합니다.
+        """
+        best = 0.0
+        for gram in group:
+            docs, masks = self._postings[gram]
+            pos = bisect.bisect_left(docs, docno)
+            if pos < len(docs) and docs[pos] == docno:
+                best = max(best, self._idf(gram) * MASK_WEIGHTS[masks[pos]])
+        return best
+
+    def _stream_desc(self, groups):
+        """그룹들의 포스팅 합집합을 문서 번호 내림차순(최신 순)으로 중복 없이 흘려보냅니다."""
+        last = None
+        for docno in heapq.merge(*(reversed(self._postings[gram][0]) for group in groups for gram in group),
+                                 reverse=True):
+            if docno != last:
+                last = docno
+                yield docno
+
+    def _intersect_desc(self, grams):
+        """
+        여러 n-gram 포스팅의 교집합을 최신 순으로 흘려보냅니다. (leapfrog 조인)
+        후보 번호 이하에서 각 포스팅의 가장 큰 문서로 건너뛰므로 공통 문서가 적을수록 빨리 끝납니다.
+        """
+        arrays = [self._postings[gram][0] for gram in grams]
+        candidate = min(docs[-1] for docs in arrays)
+        while candidate >= 0:
+            for docs in arrays:
+                pos = bisect.bisect_right(docs, candidate) - 1
+                if pos < 0:
+                    return
+                if docs[pos] < candidate:
+                    candidate = docs[pos]
+                    break
+            else:
+                yield candidate
+                candidate -= 1
+
+    def _top(self, terms, required, limit):
+        """
+        required 개 이상의 그룹에 일치하는 문서 중 상위 limit 개.
+
+        required 개 이상 일치하려면 가장 작은 (그룹 수 - required + 1) 개 그룹 중 하나에는 반드시
+        포함되므로 그 그룹들의 문서만 최신 순으로 훑고, 나머지는 이진 탐색으로 확인합니다.
+        상위 limit 개가 모두 점수 상한에 도달하면 더 볼 필요가 없으므로 멈춥니다.
+        """
+        groups = sorted((group for group in terms if group), key=self._group_size)
+        if len(groups) < required:
+            return []
+        lead = groups[:len(groups) - required + 1]
+        upper = sum(self._group_upper(group) for group in groups) * len(groups) / len(terms) - 1e-9
+
+        if required == len(terms) and all(len(group) == 1 for group in groups):
+            stream = self._intersect_desc([group[0] for group in groups])
+        else:
+            stream = self._stream_desc(lead)
+
+        heap = []
+        for docno in stream:
+            if self._doc_ids[docno] is None:
+                continue
+            score, hits = 0.0, 0
+            for i, group in enumerate(groups):
+                group_score = self._lookup(group, docno)
+                if group_score:
+                    score += group_score
+                    hits += 1
+                elif hits + len(groups) - i - 1 < required:
+                    break
+            if hits < required:
+                continue
+            # 퍼지 검색에서는 일치한 그룹 비율만큼 가중
+            score = score * hits / len(terms)
+            if len(heap) < limit:
+                heapq.heappush(heap, (score, docno))
+            elif score > heap[0][0]:
+                heapq.heapreplace(heap, (score, docno))
+            if len(heap) == limit and heap[0][0] >= upper:
+                break
+        return [docno for _, docno in sorted(heap, reverse=True)]
+
+    def _expand(self, grams):
+        """검색어 n-gram 을 색인에 있는 n-gram 그룹으로 변환 (없는 n-gram 은 빈 그룹)"""
+        terms = []
+        for gram in dict.fromkeys(grams):
+            if len(gram) < NGRAM:
+                group = [g for g in self._postings if g.startswith(gram)]
+            else:
+                group = [gram] if gram in self._postings else []
+            terms.append(group)
+        return terms
@@ -0,0 +1,850 @@
+import bisect
+import datetime
+import heapq
+import os
+import sqlite3
+import sys
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+from audit import GENESIS, content_hash, entry_hash, merkle_root
+from models import Certificate, LogEntry, Status, to_micros
+
+# ----------------------------------------------------------------------
+# R2BF 인증서 저장소 (SQLite, WAL 모드)
+# ----------------------------------------------------------------------
+# 모든 콜백은 st.session_state 대신 이 저장소를 통해 인증서를 읽고 씁니다.
+# 인증서는 models.Certificate (로그는 models.LogEntry) 로 반환됩니다.
+
+DATA_DIR = os.environ.get("R2BF_DATA_DIR", "r2bf_data")
+DB_PATH = os.path.join(DATA_DIR, "certificates.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS certificates (
+    cert_id                TEXT PRIMARY KEY,
+    requester_id           TEXT NOT NULL,
+    operator_id            TEXT,
+    approver_id            TEXT,
+    completion_date        TEXT,
+    model_name             TEXT NOT NULL,
+    deleted_data           TEXT NOT NULL,
+    replacement_data       TEXT,
+    current_status         TEXT NOT NULL,
+    internal_ai_suggestion TEXT,
+    created_at             TEXT NOT NULL,
+    hash                   TEXT  -- 쓰기 시점의 인증서 해시 (audit.py)
+);
+CREATE INDEX IF NOT EXISTS idx_cert_status ON certificates (current_status, created_at, cert_id);
+CREATE INDEX IF NOT EXISTS idx_cert_requester ON certificates (requester_id, created_at, cert_id);
+CREATE INDEX IF NOT EXISTS idx_cert_model ON certificates (model_name);
+CREATE INDEX IF NOT EXISTS idx_cert_request ON certificates (model_name, deleted_data);
+CREATE INDEX IF NOT EXISTS idx_cert_created ON certificates (created_at, cert_id);
+
+CREATE TABLE IF NOT EXISTS cert_log (
+    cert_id   TEXT NOT NULL,
+    seq       INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    status    TEXT NOT NULL,
+    actor     TEXT NOT NULL,
+    message   TEXT NOT NULL,
+    reason    TEXT,
+    hash      TEXT,  -- 처리 로그 해시 체인 (audit.py)
+    PRIMARY KEY (cert_id, seq)
+);
+
+-- 저널(journal.py)에서 마지막으로 반영한 레코드 번호
+CREATE TABLE IF NOT EXISTS journal_state (
+    id  INTEGER PRIMARY KEY CHECK (id = 0),
+    lsn INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO journal_state VALUES (0, 0);
+"""
+
+# update()로 변경할 수 있는 컬럼 (cert_id, created_at 은 발행 후 변경 불가, current_status 는 transition() 전용)
+UPDATABLE_FIELDS = (
+    "operator_id", "approver_id", "completion_date", "model_name", "deleted_data",
+    "replacement_data", "internal_ai_suggestion",
+)
+
+# 목록 화면의 한 페이지 크기
+PAGE_SIZE = 20
+
+# keyset 페이지. certs 는 발행 시각 역순이며, newer / older 는 이전 / 다음 페이지 커서 (없으면 None)
+Page = namedtuple("Page", ["certs", "newer", "older"])
+
+# 무결성 검증용 레코드. hashes 는 cert.log 순서대로 저장된 로그 해시, cert_hash 는 저장된 인증서 해시 (audit.py)
+AuditRecord = namedtuple("AuditRecord", ["created_at", "cert", "hashes", "cert_hash"])
+
+# 허용되는 상태 전이. transition() 은 지금 상태가 from_status 일 때 여기 있는 다음 상태로만 옮기며,
+# 같은 상태로의 전이는 허용하지 않습니다. (상태를 두고 컬럼·로그만 바꿀 때는 amend())
+TRANSITIONS = {
+    "Pending_Forget": {"Forgetting_In_Progress"},
+    "Forgetting_In_Progress": {"Pending_Forget_Approval", "Pending_Forget"},
+    "Pending_Forget_Approval": {"Pending_Substitute", "Pending_Forget"},
+    "Pending_Substitute": {"Substituting_In_Progress"},
+    "Substituting_In_Progress": {"Pending_Substitute_Review_MLOps", "Pending_Substitute", "Substitute_Failed"},
+    # AI 제안 생성 실패: 다시 생성하거나, 이전 제안이 있으면 그 제안으로 검토를 이어 감
+    "Substitute_Failed": {"Substituting_In_Progress", "Pending_Substitute_Review_MLOps"},
+    "Pending_Substitute_Review_MLOps": {"Pending_Substitute_Approval", "Substituting_In_Progress"},
+    "Pending_Substitute_Approval": {"Completed", "Pending_Substitute_Review_MLOps"},
+    "Completed": set(),
+}
+
+
+class StatusConflict(ValueError):
+    """인증서의 지금 상태가 호출한 쪽이 기대한 상태가 아님 (다른 세션이 먼저 처리한 경우 등)"""
+
+    def __init__(self, cert_id, expected, current):
+        super().__init__(f"[{cert_id}] 다른 곳에서 이미 처리된 인증서입니다. (현재 상태: {current})")
+        self.cert_id = cert_id
+        self.expected = expected
+        self.current = current
+
+
+def is_terminal(status):
+    """더 이상 전이할 수 없는 (처리가 끝난) 상태인지"""
+    return not TRANSITIONS[str(status)]
+
+
+def _statuses(status_or_statuses):
+    if isinstance(status_or_statuses, str):
+        return {str(status_or_statuses)}
+    return {str(status) for status in status_or_statuses}
+
+
+class QueueIndex:
+    """
+    상태별 / 요청자별 인증서 ID 버킷. 상태 전이 때마다 증분 갱신되므로
+    큐를 그릴 때 전체 인증서가 아닌 해당 큐 크기만큼만 비용이 듭니다.
+    버킷은 (발행 시각, cert_id) 순으로 정렬된 채 유지되어 조회할 때마다 다시 정렬하지 않습니다.
+    (새 ULID 형식 ID 는 발행 순서대로 커지므로 같은 시각이어도 발행 순서가 유지됨)
+    """
+
+    def __init__(self):
+        self.by_status = {}  # status -> [(created_at, cert_id), ...] (발행 순)
+        self.by_requester = {}  # requester_id -> [(created_at, cert_id), ...] (발행 순)
+        self.status_of = {}  # cert_id -> status
+        self.created_of = {}  # cert_id -> created_at
+
+    @staticmethod
+    def _insert(bucket, key):
+        # 새 인증서는 대개 가장 최근이므로 끝에 붙이는 경우가 대부분
+        if not bucket or bucket[-1] <= key:
+            bucket.append(key)
+        else:
+            bisect.insort(bucket, key)
+
+    def add(self, cert_id, requester_id, status, created_at):
+        key = (created_at, cert_id)
+        self._insert(self.by_status.setdefault(status, []), key)
+        self._insert(self.by_requester.setdefault(requester_id, []), key)
+        self.status_of[cert_id] = status
+        self.created_of[cert_id] = created_at
+
+    def move(self, cert_id, new_status):
+        key = (self.created_of[cert_id], cert_id)
+        bucket = self.by_status[self.status_of[cert_id]]
+        del bucket[bisect.bisect_left(bucket, key)]
+        self._insert(self.by_status.setdefault(new_status, []), key)
+        self.status_of[cert_id] = new_status
+
+    def ids(self, statuses, newest_first=True):
+        """해당 상태들의 인증서 ID (발행 순서, 여러 상태면 정렬된 버킷을 병합)"""
+        buckets = [self.by_status.get(status, []) for status in statuses]
+        keys = buckets[0] if len(buckets) == 1 else list(heapq.merge(*buckets))
+        return [cert_id for _, cert_id in (reversed(keys) if newest_first else keys)]
+
+    def requester_ids(self, requester_id, newest_first=True):
+        keys = self.by_requester.get(requester_id, [])
+        return [cert_id for _, cert_id in (reversed(keys) if newest_first else keys)]
+
+
+# 예전 버전은 거부 사유를 로그 메시지 끝에 "(사유: ...)" 로 붙여 저장했습니다.
+LEGACY_REASON_MARKER = "(사유: "
+
+
+def _intern(text):
+    return sys.intern(text) if text is not None else None
+
+
+def _row_to_cert(row, log):
+    """DB 행을 Certificate 로 변환 (반복되는 처리자 / 모델명은 intern)"""
+    return Certificate(
+        row["cert_id"], _intern(row["requester_id"]), _intern(row["operator_id"]), _intern(row["approver_id"]),
+        row["completion_date"], _intern(row["model_name"]), row["deleted_data"], row["replacement_data"],
+        Status(row["current_status"]), row["internal_ai_suggestion"], log)
+
+
+def _split_legacy_reason(message, reason=None):
+    """
+    예전 형식 메시지 "'잊힘' 거부 (사유: XXX). MLOps 재작업 요청." -> ("'잊힘' 거부. MLOps 재작업 요청.", "XXX").
+    사유가 따로 있거나 예전 형식이 아니면 그대로 돌려줍니다.
+    """
+    if reason is None and LEGACY_REASON_MARKER in message:
+        head, _, rest = message.partition(LEGACY_REASON_MARKER)
+        reason, _, tail = rest.rpartition(")")
+        return head.rstrip() + tail, reason
+    return message, reason
+
+
+def _migrate(conn):
+    """
+    이전 버전 DB 에 cert_log.reason 컬럼을 추가하고 메시지에 붙어 있던 거부 사유를 옮긴 뒤,
+    cert_log.hash / certificates.hash 컬럼을 추가해 기존 로그의 해시 체인과 인증서 해시를 한 번만 계산해 둡니다.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(cert_log)")}
+    cert_columns = {row[1] for row in conn.execute("PRAGMA table_info(certificates)")}
+    if "reason" in columns and "hash" in columns and "hash" in cert_columns:
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    if "reason" not in columns:
+        conn.execute("ALTER TABLE cert_log ADD COLUMN reason TEXT")
+        rows = conn.execute("SELECT cert_id, seq, message FROM cert_log WHERE instr(message, ?) > 0",
+                            (LEGACY_REASON_MARKER,)).fetchall()
+        conn.executemany("UPDATE cert_log SET message = ?, reason = ? WHERE cert_id = ? AND seq = ?",
+                         [(*_split_legacy_reason(message), cert_id, seq) for cert_id, seq, message in rows])
+    if "hash" not in columns:
+        conn.execute("ALTER TABLE cert_log ADD COLUMN hash TEXT")
+        updates, prev = [], {}
+        for cert_id, seq, timestamp, status, actor, message, reason in conn.execute(
+                "SELECT cert_id, seq, timestamp, status, actor, message, reason FROM cert_log ORDER BY cert_id, seq"):
+            prev[cert_id] = entry_hash(prev.get(cert_id, GENESIS), cert_id, seq, timestamp, status, actor, message,
+                                       reason)
+            updates.append((prev[cert_id], cert_id, seq))
+        conn.executemany("UPDATE cert_log SET hash = ? WHERE cert_id = ? AND seq = ?", updates)
+    if "hash" not in cert_columns:
+        conn.execute("ALTER TABLE certificates ADD COLUMN hash TEXT")
+        log_hashes = {}
+        for cert_id, log_hash in conn.execute("SELECT cert_id, hash FROM cert_log ORDER BY cert_id, seq"):
+            log_hashes.setdefault(cert_id, []).append(log_hash)
+        conn.executemany("UPDATE certificates SET hash = ? WHERE cert_id = ?", [
+            (content_hash(cert_id, *fields, merkle_root(log_hashes.get(cert_id, []))), cert_id)
+            for cert_id, *fields in conn.execute(
+                "SELECT cert_id, requester_id, model_name, deleted_data, replacement_data, completion_date "
+                "FROM certificates").fetchall()])
+    conn.execute("COMMIT")
+
+
+def _export_where(statuses, model_name, requester_id, since, until, date_field):
+    """내보내기 조건 -> (WHERE 절, 파라미터)"""
+    if date_field not in ("created_at", "completion_date"):
+        raise ValueError(f"날짜 조건을 걸 수 없는 컬럼입니다: {date_field}")
+    conditions, params = [], []
+    if statuses:
+        conditions.append(f"current_status IN ({', '.join('?' for _ in statuses)})")
+        params.extend(str(status) for status in statuses)
+    if model_name:
+        conditions.append("model_name = ?")
+        params.append(model_name)
+    if requester_id:
+        conditions.append("requester_id = ?")
+        params.append(requester_id)
+    if since:
+        conditions.append(f"{date_field} >= ?")
+        params.append(since)
+    if until:
+        conditions.append(f"{date_field} < ?")
+        params.append(until)
+    return ("WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+
+class CertificateStore:
+    """
+    인증서 저장소. 하나의 연결을 여러 세션(스레드)이 공유하므로 모든 접근은 잠금으로 직렬화합니다.
+
+    journal(journal.Journal)을 주면 모든 변경을 insert / update / status / log 연산으로 기록해
+    트랜잭션마다 커밋 직전에 저널 레코드 하나로 남기고 (커밋이 실패하면 지움), 저장소는 그 재생 결과(projection)가 됩니다.
+    """
+
+    def __init__(self, path=DB_PATH, journal=None):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.RLock()
+        self._tx_depth = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        _migrate(self._conn)
+
+        # 큐 인덱스는 커밋된 변경만 반영 (트랜잭션 중 변경은 _pending_index 에 쌓아 두었다가 커밋 시 적용)
+        self._index = None
+        self._index_version = None
+        self._pending_index = []
+        self._rebuild_index()
+
+        # 커밋된 변경을 구독하는 리스너 (예: 검색 인덱스). listener(cert_ids) 형태로 호출되며,
+        # 다른 프로세스의 변경처럼 범위를 알 수 없을 때는 cert_ids=None 으로 호출됩니다.
+        self._listeners = []
+        self._changed_ids = set()
+
+        self._journal = journal
+        self._pending_ops = []
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        여러 변경을 하나의 트랜잭션으로 묶습니다. 중첩 호출 시 가장 바깥 블록에서만 커밋합니다.
+        """
+        with self._lock:
+            if self._tx_depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._tx_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    self._conn.execute("ROLLBACK")
+                    self._pending_index.clear()
+                    self._changed_ids.clear()
+                    self._pending_ops.clear()
+                raise
+            else:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    lsn = None
+                    try:
+                        if self._pending_ops:
+                            # 저널에 먼저 기록한 뒤 커밋 (커밋 전에 중단되면 다음 시작 때 저널에서 재생)
+                            lsn = self._journal.append(self._pending_ops)
+                            self._conn.execute("UPDATE journal_state SET lsn = ?", (lsn,))
+                        self._conn.execute("COMMIT")
+                    except BaseException:
+                        # 커밋하지 못한 변경은 저널에서도 지움 (재생되면 저장소에 없던 변경이 생김)
+                        if lsn is not None:
+                            self._journal.discard(lsn)
+                        if self._conn.in_transaction:
+                            self._conn.execute("ROLLBACK")
+                        self._pending_index.clear()
+                        self._changed_ids.clear()
+                        raise
+                    finally:
+                        self._pending_ops = []
+                    for apply in self._pending_index:
+                        apply(self._index)
+                    self._pending_index.clear()
+                    self._index_version = self._data_version()
+                    changed, self._changed_ids = frozenset(self._changed_ids), set()
+                    if changed:
+                        self._notify(changed)
+
+    def subscribe(self, listener):
+        """커밋된 변경 알림을 받을 리스너 등록"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def attach_index(self, index, iter_fn=None, fetch_fn=None):
+        """
+        index 를 저장소 전체로 만들고(rebuild), 이후 커밋되는 변경을 증분 반영(add)하도록 구독합니다.
+        iter_fn() 은 전체 항목을, fetch_fn(cert_ids) 는 바뀐 인증서들의 항목을 돌려줍니다. (기본: 인증서)
+        """
+        iter_fn = iter_fn or self.iter_all
+        fetch_fn = fetch_fn or self.get_many
+
+        def on_change(cert_ids):
+            if cert_ids is None:
+                index.rebuild(iter_fn())
+                return
+            for item in fetch_fn(list(cert_ids)):
+                index.add(item)
+
+        index.rebuild(iter_fn())
+        self.subscribe(on_change)
+        return index
+
+    def _notify(self, cert_ids):
+        for listener in self._listeners:
+            listener(cert_ids)
+
+    # --- 큐 인덱스 ---
+
+    def _data_version(self):
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _rebuild_index(self):
+        """저장소 전체를 한 번 훑어 큐 인덱스를 만듭니다. (시작 시, 또는 다른 프로세스가 DB를 바꾼 경우)"""
+        index = QueueIndex()
+        # 발행 순서로 읽어 버킷 끝에 붙이기만 하도록 함 (idx_cert_created 인덱스 사용)
+        for row in self._conn.execute("SELECT cert_id, requester_id, current_status, created_at FROM certificates "
+                                      "ORDER BY created_at, cert_id"):
+            index.add(row["cert_id"], row["requester_id"], row["current_status"], row["created_at"])
+        self._index = index
+        self._index_version = self._data_version()
+
+    def _queue_index(self):
+        # PRAGMA data_version 은 다른 연결(예: 다른 프로세스)이 커밋했을 때만 바뀝니다.
+        if self._tx_depth == 0 and self._data_version() != self._index_version:
+            self._rebuild_index()
+            self._notify(None)
+        return self._index
+
+    # --- 쓰기 ---
+
+    def _record(self, op):
+        """변경 연산 하나를 저장소에 반영하고, 저널이 있으면 커밋 때 기록할 목록에 추가"""
+        self._apply(op)
+        if self._journal is not None:
+            self._pending_ops.append(op)
+
+    def _apply(self, op):
+        """변경 연산 반영 (쓰기 메서드와 저널 재생이 공유). 트랜잭션 안에서 호출해야 합니다."""
+        kind = op["op"]
+        if kind == "insert":
+            cert = op["cert"]  # Certificate.to_dict() 형태
+            cert_id = cert["cert_id"]
+            content = cert["content"]
+            created_at = cert["log"][0]["timestamp"]
+            rows, prev = [], GENESIS
+            for seq, log in enumerate(cert["log"]):
+                message, reason = _split_legacy_reason(log["message"], log.get("reason"))
+                prev = entry_hash(prev, cert_id, seq, log["timestamp"], log["status"], log["actor"], message, reason)
+                rows.append((cert_id, seq, log["timestamp"], log["status"], log["actor"], message, reason, prev))
+            cert_hash = content_hash(cert_id, cert["requester_id"], content["model_name"], content["deleted_data"],
+                                     content["replacement_data"], cert["completion_date"],
+                                     merkle_root([row[-1] for row in rows]))
+            self._conn.execute(
+                "INSERT INTO certificates VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (cert_id, cert["requester_id"], cert["operator_id"], cert["approver_id"],
+                 cert["completion_date"], content["model_name"], content["deleted_data"],
+                 content["replacement_data"], cert["current_status"], cert["internal_ai_suggestion"],
+                 created_at, cert_hash))
+            self._conn.executemany("INSERT INTO cert_log VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._pending_index.append(
+                lambda index: index.add(cert_id, cert["requester_id"], cert["current_status"], created_at))
+        elif kind == "update":
+            cert_id = op["cert_id"]
+            assignments = ", ".join(f"{name} = ?" for name in op["fields"])
+            cursor = self._conn.execute(f"UPDATE certificates SET {assignments} WHERE cert_id = ?",
+                                        (*op["fields"].values(), cert_id))
+            if cursor.rowcount == 0:
+                raise KeyError(cert_id)
+            self._seal(cert_id)
+        elif kind == "status":
+            cert_id, new_status = op["cert_id"], op["status"]
+            row = self._conn.execute("SELECT current_status FROM certificates WHERE cert_id = ?",
+                                     (cert_id,)).fetchone()
+            if row is None:
+                raise KeyError(cert_id)
+            self._conn.execute("UPDATE certificates SET current_status = ? WHERE cert_id = ?", (new_status, cert_id))
+            if new_status != row["current_status"]:
+                self._pending_index.append(lambda index: index.move(cert_id, new_status))
+        elif kind == "log":
+            cert_id = op["cert_id"]
+            # 예전 저널 레코드는 사유가 메시지에 붙어 있으므로 재생 시 분리
+            message, reason = _split_legacy_reason(op["message"], op.get("reason"))
+            last = self._conn.execute("SELECT seq, hash FROM cert_log WHERE cert_id = ? ORDER BY seq DESC LIMIT 1",
+                                      (cert_id,)).fetchone()
+            seq, prev = (last["seq"] + 1, last["hash"]) if last else (0, GENESIS)
+            self._conn.execute(
+                "INSERT INTO cert_log VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (cert_id, seq, op["timestamp"], op["status"], op["actor"], message, reason,
+                 entry_hash(prev, cert_id, seq, op["timestamp"], op["status"], op["actor"], message, reason)))
+            self._seal(cert_id)
+        else:
+            raise ValueError(f"알 수 없는 저널 연산입니다: {kind}")
+        self._changed_ids.add(cert_id)
+
+    def _seal(self, cert_id):
+        """
+        인증서 해시(certificates.hash)를 지금 내용 + 로그 해시로 다시 계산해 둡니다.
+        이후 저장소 밖에서 내용만 고치면 다시 계산한 해시가 이 값과 어긋납니다.
+        """
+        fields = self._conn.execute("SELECT requester_id, model_name, deleted_data, replacement_data, completion_date "
+                                    "FROM certificates WHERE cert_id = ?", (cert_id,)).fetchone()
+        log_hashes = [row[0] for row in self._conn.execute("SELECT hash FROM cert_log WHERE cert_id = ? ORDER BY seq",
+                                                           (cert_id,))]
+        self._conn.execute("UPDATE certificates SET hash = ? WHERE cert_id = ?",
+                           (content_hash(cert_id, *fields, merkle_root(log_hashes)), cert_id))
+
+    def insert(self, cert):
+        """신규 인증서 발행 (Certificate)"""
+        with self.transaction():
+            self._record({"op": "insert", "cert": cert.to_dict()})
+
+    def update(self, cert_id, **fields):
+        """인증서 컬럼 갱신 (예: update(cert_id, operator_id="박엔진 (MLOps팀)"))"""
+        unknown = set(fields) - set(UPDATABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"변경할 수 없는 필드입니다: {', '.join(sorted(unknown))}")
+        if not fields:
+            return
+        with self.transaction():
+            self._record({"op": "update", "cert_id": cert_id, "fields": fields})
+
+    def _expect_status(self, cert_id, from_status):
+        """지금 상태가 from_status (상태 하나 또는 여러 개) 중 하나인지 확인하고 지금 상태를 반환"""
+        row = self._conn.execute("SELECT current_status FROM certificates WHERE cert_id = ?", (cert_id,)).fetchone()
+        if row is None:
+            raise KeyError(cert_id)
+        current_status = row["current_status"]
+        if current_status not in _statuses(from_status):
+            raise StatusConflict(cert_id, from_status, current_status)
+        return current_status
+
+    def transition(self, cert_id, from_status, new_status, actor, message=None, timestamp=None, reason=None,
+                   **fields):
+        """
+        인증서 상태 변경의 단일 진입점. 지금 상태가 from_status (하나 또는 여러 개) 가 아니면 StatusConflict 를,
+        TRANSITIONS 에 없는 전이(같은 상태로의 전이 포함)면 ValueError 를 던집니다.
+        상태와 함께 바뀌는 컬럼(fields)을 갱신하고, message 가 있으면 처리 로그(거부 시 reason 포함)를 남기며,
+        커밋 시 큐 인덱스를 증분 갱신합니다.
+        """
+        with self.transaction():
+            current_status = self._expect_status(cert_id, from_status)
+            if new_status not in TRANSITIONS[current_status]:
+                raise ValueError(f"[{cert_id}] 허용되지 않는 상태 전이입니다: {current_status} -> {new_status}")
+
+            self.update(cert_id, **fields)
+            self._record({"op": "status", "cert_id": cert_id, "status": str(new_status)})
+            if message is not None:
+                self.append_log(cert_id, timestamp or datetime.datetime.now().isoformat(), new_status, actor, message,
+                                reason)
+
+    def transition_many(self, cert_ids, from_status, new_status, actor, message=None, timestamp=None, reason=None,
+                        fields_of=None, **fields):
+        """
+        여러 인증서를 한 트랜잭션(저널 레코드 하나)으로 전이합니다. (일괄 승인/거부)
+        지금 상태가 from_status 가 아닌 인증서(다른 세션이 먼저 처리한 건 등)는 건너뛰며,
+        하나라도 실패하면 전체를 되돌립니다. fields_of(cert_id) 는 인증서마다 다른 컬럼 값을 돌려줍니다.
+        반환: 실제로 전이한 ID 목록
+        """
+        timestamp = timestamp or datetime.datetime.now().isoformat()
+        expected = _statuses(from_status)
+        applied = []
+        with self.transaction():
+            for cert_id in cert_ids:
+                row = self._conn.execute("SELECT current_status FROM certificates WHERE cert_id = ?",
+                                         (cert_id,)).fetchone()
+                if row is None or row["current_status"] not in expected:
+                    continue
+                self.transition(cert_id, from_status, new_status, actor, message, timestamp, reason,
+                                **fields, **(fields_of(cert_id) if fields_of else {}))
+                applied.append(cert_id)
+        return applied
+
+    def amend(self, cert_id, status, actor, message, timestamp=None, reason=None, **fields):
+        """
+        상태는 그대로 두고 컬럼(fields)을 갱신하며 처리 로그를 남깁니다. (예: 검토 중 제안 교체)
+        지금 상태가 status 가 아니면 StatusConflict.
+        """
+        with self.transaction():
+            self._expect_status(cert_id, status)
+            self.update(cert_id, **fields)
+            self.append_log(cert_id, timestamp or datetime.datetime.now().isoformat(), status, actor, message, reason)
+
+    def append_log(self, cert_id, timestamp, status, actor, message, reason=None):
+        """처리 로그 한 줄 추가 (timestamp 는 ISO 문자열)"""
+        op = {"op": "log", "cert_id": cert_id, "timestamp": timestamp, "status": str(status), "actor": actor,
+              "message": message}
+        if reason is not None:
+            op["reason"] = reason
+        with self.transaction():
+            self._record(op)
+
+    # --- 저널 복구 / 스냅숏 ---
+
+    def journal_lsn(self):
+        """저장소에 반영된 마지막 저널 레코드 번호"""
+        with self._lock:
+            return self._conn.execute("SELECT lsn FROM journal_state").fetchone()[0]
+
+    def recover(self):
+        """
+        저널로 저장소를 최신 상태로 맞춥니다. 저장소보다 새로운 스냅숏이 있으면 (예: DB 파일 유실)
+        스냅숏을 먼저 불러온 뒤 그 이후 레코드만 재생하므로, 시작 시간은 전체 이력이 아닌
+        스냅숏 크기 + 마지막 스냅숏 이후 레코드 수에 비례합니다. 재생한 레코드 수를 반환합니다.
+        """
+        journal = self._journal
+        with self._lock:
+            lsn = self.journal_lsn()
+            if lsn >= journal.last_lsn:
+                journal.advance_to(lsn)
+                return 0
+
+            with self.transaction():
+                snapshot = journal.latest_snapshot()
+                if snapshot is not None:
+                    snapshot_lsn, certs = journal.read_snapshot(snapshot)
+                    if snapshot_lsn > lsn:
+                        self._conn.execute("DELETE FROM cert_log")
+                        self._conn.execute("DELETE FROM certificates")
+                        for cert in certs:
+                            self._apply({"op": "insert", "cert": cert})
+                        lsn = snapshot_lsn
+
+                first = journal.first_lsn()
+                if lsn < journal.last_lsn and (first is None or first > lsn + 1):
+                    raise RuntimeError(f"저널 복구 불가: 저장소 lsn={lsn}, 남아 있는 저널 시작 lsn={first}")
+
+                replayed = 0
+                for record in journal.replay(lsn):
+                    for op in record["ops"]:
+                        self._apply(op)
+                    lsn = record["lsn"]
+                    replayed += 1
+                self._conn.execute("UPDATE journal_state SET lsn = ?", (lsn,))
+                # 스냅숏으로 통째로 바꿨을 수 있으므로 증분 대신 전체 재구성
+                self._pending_index.clear()
+                self._changed_ids.clear()
+            self._rebuild_index()
+            self._notify(None)
+            return replayed
+
+    def _snapshot_connection(self):
+        """별도 연결의 읽기 트랜잭션 (WAL 스냅숏). 오래 순회해도 다른 세션의 쓰기를 막지 않습니다."""
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("BEGIN")
+        return conn
+
+    def _iter_snapshot(self, conn, where="", params=(), batch_size=1000):
+        """conn 에서 조건에 맞는 인증서(로그 포함)를 batch_size 건씩 읽어 발행 순으로 흘려보내고, 끝나면 conn 을 닫음"""
+        try:
+            cursor = conn.execute(f"SELECT * FROM certificates {where} ORDER BY created_at, cert_id", params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from self._attach_logs(rows, conn)
+        finally:
+            conn.close()
+
+    def export_snapshot(self):
+        """
+        현재 커밋된 상태의 (lsn, 인증서 dict 제너레이터). 별도 연결의 읽기 트랜잭션(WAL 스냅숏)을 쓰므로
+        순회하는 동안에도 다른 세션의 쓰기를 막지 않습니다.
+        """
+        conn = self._snapshot_connection()
+        lsn = conn.execute("SELECT lsn FROM journal_state").fetchone()[0]
+        return lsn, (cert.to_dict() for cert in self._iter_snapshot(conn))
+
+    def export(self, statuses=(), model_name=None, requester_id=None, since=None, until=None,
+               date_field="created_at", batch_size=1000):
+        """
+        조건에 맞는 인증서(Certificate, 로그 포함)를 batch_size 건씩 읽어 흘려보내는 제너레이터 (규제 기관 제출용 내보내기).
+        since / until 은 date_field(created_at: 발행일, completion_date: 처리 완료일) 의 ISO 날짜·시각 범위 [since, until).
+        export_snapshot 과 같이 별도 연결의 읽기 트랜잭션을 씁니다.
+        """
+        where, params = _export_where(statuses, model_name, requester_id, since, until, date_field)
+        return self._iter_snapshot(self._snapshot_connection(), where, params, batch_size)
+
+    def export_count(self, statuses=(), model_name=None, requester_id=None, since=None, until=None,
+                     date_field="created_at"):
+        """export() 가 내보낼 인증서 수"""
+        where, params = _export_where(statuses, model_name, requester_id, since, until, date_field)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM certificates {where}", params).fetchone()[0]
+
+    # --- 무결성 검증 (audit.py) ---
+
+    def _audit_records(self, rows, conn=None, with_logs=True):
+        hashes = {}
+        if with_logs:
+            certs = self._attach_logs(rows, conn, hashes)
+        else:
+            # 전역 트리(잎 = 저장된 해시로 만든 인증서 해시)에는 로그 본문이 필요 없으므로 해시만 읽음
+            conn = conn or self._conn
+            certs = [_row_to_cert(row, []) for row in rows]
+            hashes = {cert.cert_id: [] for cert in certs}
+            ids = list(hashes)
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                for cert_id, log_hash in conn.execute(
+                        f"SELECT cert_id, hash FROM cert_log WHERE cert_id IN ({placeholders}) ORDER BY cert_id, seq",
+                        chunk):
+                    hashes[cert_id].append(log_hash)
+        return [AuditRecord(row["created_at"], cert, hashes[cert.cert_id], row["hash"])
+                for row, cert in zip(rows, certs)]
+
+    def audit_records(self, cert_ids, with_logs=True):
+        """ID 목록 순서대로 AuditRecord 조회 (없는 ID 는 건너뜀). with_logs=False 면 cert.log 는 비어 있음"""
+        if not cert_ids:
+            return []
+        with self._lock:
+            rows = {}
+            for start in range(0, len(cert_ids), 500):
+                chunk = cert_ids[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                for row in self._conn.execute(f"SELECT * FROM certificates WHERE cert_id IN ({placeholders})", chunk):
+                    rows[row["cert_id"]] = row
+            return self._audit_records([rows[cert_id] for cert_id in cert_ids if cert_id in rows], with_logs=with_logs)
+
+    def iter_audit(self, batch_size=1000, with_logs=True):
+        """전체 AuditRecord 를 발행 순으로 batch_size 건씩 흘려보내는 제너레이터 (export 와 같은 읽기 트랜잭션)"""
+        return self._iter_audit(self._snapshot_connection(), batch_size, with_logs)
+
+    def audit_snapshot(self, batch_size=1000, with_logs=True):
+        """(lsn, iter_audit 제너레이터). 같은 읽기 트랜잭션이므로 레코드는 정확히 그 lsn 시점의 상태입니다."""
+        conn = self._snapshot_connection()
+        lsn = conn.execute("SELECT lsn FROM journal_state").fetchone()[0]
+        return lsn, self._iter_audit(conn, batch_size, with_logs)
+
+    def _iter_audit(self, conn, batch_size, with_logs):
+        try:
+            cursor = conn.execute("SELECT * FROM certificates ORDER BY created_at, cert_id")
+            while rows := cursor.fetchmany(batch_size):
+                yield from self._audit_records(rows, conn, with_logs)
+        finally:
+            conn.close()
+
+    # --- 읽기 ---
+
+    def get(self, cert_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM certificates WHERE cert_id = ?", (cert_id,)).fetchone()
+            if row is None:
+                raise KeyError(cert_id)
+            return self._attach_logs([row])[0]
+
+    def __contains__(self, cert_id):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM certificates WHERE cert_id = ?", (cert_id,)).fetchone() is not None
+
+    def count(self, status=None, requester_id=None):
+        """상태별 / 요청자별 인증서 수 (큐 인덱스 버킷 크기)"""
+        with self._lock:
+            index = self._queue_index()
+            if requester_id is not None:
+                return len(index.by_requester.get(requester_id, ()))
+            if status is None:
+                return len(index.status_of)
+            return len(index.by_status.get(status, ()))
+
+    def status_of(self, cert_id):
+        with self._lock:
+            return self._queue_index().status_of[cert_id]
+
+    def ids_by_status(self, *statuses, newest_first=True):
+        """상태별 인증서 ID 목록 (큐 인덱스 버킷만 사용, DB 조회 없음)"""
+        with self._lock:
+            return self._queue_index().ids(statuses, newest_first)
+
+    def by_status(self, *statuses, newest_first=True):
+        """상태별 큐 조회 (큐 인덱스 버킷 -> 해당 ID만 조회)"""
+        with self._lock:
+            return self.get_many(self._queue_index().ids(statuses, newest_first))
+
+    def by_requester(self, requester_id, newest_first=True):
+        """요청자별 인증서 조회 (요청자 버킷 -> 해당 ID만 조회)"""
+        with self._lock:
+            return self.get_many(self._queue_index().requester_ids(requester_id, newest_first))
+
+    def by_model(self, model_name, newest_first=True):
+        """대상 모델별 인증서 조회 (idx_cert_model 인덱스 사용)"""
+        return self._select("WHERE model_name = ?", (model_name,), newest_first)
+
+    def existing_requests(self, pairs):
+        """(대상 모델명, 삭제 데이터) 쌍 중 이미 인증서가 발행된 쌍의 집합 (idx_cert_request 인덱스 사용)"""
+        with self._lock:
+            return {pair for pair in pairs if self._conn.execute(
+                "SELECT 1 FROM certificates WHERE model_name = ? AND deleted_data = ? LIMIT 1", pair).fetchone()}
+
+    def get_many(self, cert_ids):
+        """ID 목록 순서대로 인증서 조회"""
+        if not cert_ids:
+            return []
+        with self._lock:
+            rows = {}
+            for start in range(0, len(cert_ids), 500):
+                chunk = cert_ids[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                for row in self._conn.execute(f"SELECT * FROM certificates WHERE cert_id IN ({placeholders})", chunk):
+                    rows[row["cert_id"]] = row
+            return self._attach_logs([rows[cert_id] for cert_id in cert_ids if cert_id in rows])
+
+    def page(self, statuses=(), requester_id=None, before=None, after=None, limit=PAGE_SIZE, with_logs=True):
+        """
+        발행 시각 역순 keyset 페이지 조회. 커서는 (created_at, cert_id) 이며,
+        before 를 주면 그보다 오래된 (다음) 페이지, after 를 주면 그보다 최신인 (이전) 페이지를 돌려줍니다.
+        OFFSET 을 쓰지 않으므로 몇 번째 페이지든 인덱스에서 limit 개만 읽습니다.
+        """
+        where, params = [], []
+        if statuses:
+            where.append(f"current_status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        if requester_id is not None:
+            where.append("requester_id = ?")
+            params.append(requester_id)
+        if after is not None:
+            where.append("(created_at, cert_id) > (?, ?)")
+            params.extend(after)
+            order = "ASC"
+        else:
+            if before is not None:
+                where.append("(created_at, cert_id) < (?, ?)")
+                params.extend(before)
+            order = "DESC"
+        sql = (f"SELECT * FROM certificates {'WHERE ' + ' AND '.join(where) if where else ''} "
+               f"ORDER BY created_at {order}, cert_id {order} LIMIT ?")
+
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit + 1)).fetchall()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            if after is not None:
+                rows.reverse()
+            certs = self._attach_logs(rows) if with_logs else [_row_to_cert(row, []) for row in rows]
+
+        if not rows:
+            return Page([], None, None)
+        first = (rows[0]["created_at"], rows[0]["cert_id"])
+        last = (rows[-1]["created_at"], rows[-1]["cert_id"])
+        if after is not None:
+            return Page(certs, first if has_more else None, last)
+        return Page(certs, first if before is not None else None, last if has_more else None)
+
+    def iter_all(self, batch_size=1000):
+        """
+        전체 인증서를 발행 순서대로 batch_size 개씩 나누어 읽는 제너레이터.
+        배치 사이에는 잠금을 풀어 두므로 긴 순회 중에도 다른 세션의 쓰기가 막히지 않습니다.
+        """
+        last = ("", "")
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT * FROM certificates WHERE (created_at, cert_id) > (?, ?) "
+                    "ORDER BY created_at, cert_id LIMIT ?", (*last, batch_size)).fetchall()
+                if not rows:
+                    return
+                certs = self._attach_logs(rows)
+            last = (rows[-1]["created_at"], rows[-1]["cert_id"])
+            yield from certs
+
+    def _select(self, where, params, newest_first):
+        order = "DESC" if newest_first else "ASC"
+        with self._lock:
+            rows = self._conn.execute(f"SELECT * FROM certificates {where} ORDER BY created_at {order}",
+                                      params).fetchall()
+            return self._attach_logs(rows)
+
+    def _attach_logs(self, rows, conn=None, hashes=None):
+        """여러 인증서의 로그를 한 번의 쿼리로 불러와 붙입니다. hashes(dict)를 주면 cert_id 별 로그 해시도 채웁니다."""
+        if not rows:
+            return []
+        conn = conn or self._conn
+        logs = {row["cert_id"]: [] for row in rows}
+        if hashes is not None:
+            hashes.update((cert_id, []) for cert_id in logs)
+        # SQLite 변수 개수 제한을 피하기 위해 나누어 조회
+        ids = list(logs)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            for log in conn.execute(
+                    f"SELECT cert_id, timestamp, status, actor, message, reason, hash FROM cert_log "
+                    f"WHERE cert_id IN ({placeholders}) ORDER BY cert_id, seq", chunk):
+                logs[log["cert_id"]].append(LogEntry(to_micros(log["timestamp"]), Status(log["status"]),
+                                                     sys.intern(log["actor"]), sys.intern(log["message"]),
+                                                     log["reason"]))
+                if hashes is not None:
+                    hashes[log["cert_id"]].append(log["hash"])
+        return [_row_to_cert(row, logs[row["cert_id"]]) for row in rows]
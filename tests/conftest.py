@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# 저장소 모듈은 불러올 때 환경 변수를 읽으므로, 테스트 모듈을 불러오기 전에 임시 데이터 디렉터리를 지정
+os.environ.setdefault("R2BF_DATA_DIR", tempfile.mkdtemp(prefix="r2bf-test-"))
+os.environ.setdefault("R2BF_GEMINI_MAX_ATTEMPTS", "2")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,142 @@
+import copy
+import sqlite3
+
+import pytest
+
+import audit
+from bench import make_synthetic_cert
+from models import Certificate
+from store import CertificateStore
+
+CERT_ID = "CERT-BENCH-00000003"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CertificateStore(str(tmp_path / "certificates.db"))
+    for i in range(5):
+        store.insert(Certificate.from_dict(make_synthetic_cert(i, "Completed" if i % 2 else "Pending_Forget")))
+    yield store
+    store.close()
+
+
+def tamper(store, sql, *params):
+    """앱을 거치지 않고 DB 를 직접 고침 (해시 컬럼은 그대로)"""
+    conn = sqlite3.connect(store.path)
+    with conn:
+        conn.execute(sql, params)
+    conn.close()
+
+
+def index_of(store):
+    return store.attach_index(audit.AuditIndex(), lambda: store.iter_audit(with_logs=False),
+                              lambda cert_ids: store.audit_records(cert_ids, with_logs=False))
+
+
+def verify(index, store, cert_id=CERT_ID):
+    return index.verify_many(store, [cert_id])[cert_id]
+
+
+# ----------------------------------------------------------------------
+# 포함 증명
+# ----------------------------------------------------------------------
+
+def test_certificate_proof_verifies_without_store(store):
+    bundle = audit.certificate_proof(store, CERT_ID)
+
+    assert bundle["root"] == index_of(store).root()
+    assert audit.verify_bundle(bundle)
+
+
+def test_log_entry_proof_verifies(store):
+    bundle = audit.certificate_proof(store, CERT_ID, seq=1)
+
+    assert bundle["entry"]["message"] == "벤치마크 상태 전이"
+    assert audit.verify_bundle(bundle)
+
+
+@pytest.mark.parametrize("path, value", [
+    (("certificate", 3), "다른 삭제 데이터"),
+    (("entry", "message"), "고친 메시지"),
+    (("log_root",), "0" * 64),
+    (("root",), "0" * 64),
+])
+def test_altered_bundle_is_rejected(store, path, value):
+    bundle = copy.deepcopy(audit.certificate_proof(store, CERT_ID, seq=1))
+    target = bundle
+    for key in path[:-1]:
+        target = target[key]
+    target[path[-1]] = value
+
+    assert not audit.verify_bundle(bundle)
+
+
+def test_proof_of_missing_cert_raises_key_error(store):
+    with pytest.raises(KeyError):
+        audit.certificate_proof(store, "CERT-NONE")
+
+
+# ----------------------------------------------------------------------
+# 변조 탐지
+# ----------------------------------------------------------------------
+
+def test_untouched_store_verifies(store):
+    index = index_of(store)
+
+    results = index.verify_many(store, store.ids_by_status("Completed", "Pending_Forget"))
+    assert len(results) == 5 and all(result.ok for result in results.values())
+    count, failures, root = audit.verify_store(store.iter_audit(), workers=1)
+    assert (count, failures, root) == (5, [], index.root())
+
+
+def test_edited_certificate_content_is_detected(store):
+    index = index_of(store)
+    tamper(store, "UPDATE certificates SET deleted_data = ? WHERE cert_id = ?", "다른 데이터셋", CERT_ID)
+
+    result = verify(index, store)
+    assert not result.ok
+    assert not result.content_ok
+    assert result.bad_seq is None
+    assert audit.verify_store(store.iter_audit(), workers=1)[1] == [(CERT_ID, None)]
+
+
+def test_edited_log_entry_is_detected(store):
+    index = index_of(store)
+    tamper(store, "UPDATE cert_log SET message = ? WHERE cert_id = ? AND seq = 1", "고친 메시지", CERT_ID)
+
+    result = verify(index, store)
+    assert not result.ok
+    assert result.bad_seq == 1
+    assert audit.verify_store(store.iter_audit(), workers=1)[1] == [(CERT_ID, 1)]
+
+
+def test_rewritten_hashes_change_the_global_root(store, tmp_path):
+    """내용과 해시를 모두 고치면 저장소 안에서는 맞아 보이지만 공개한 루트와 달라짐"""
+    roots_path = str(tmp_path / "audit_roots.jsonl")
+    lsn, records = store.audit_snapshot()
+    count, _, root = audit.verify_store(records, workers=1)
+    audit.publish_root(root, count, lsn, path=roots_path)
+    assert audit.published_root(lsn, path=roots_path)["root"] == root
+
+    record = store.audit_records([CERT_ID])[0]
+    cert = record.cert
+    cert.deleted_data = "다른 데이터셋"
+    forged = audit.certificate_hash(cert, audit.merkle_root(record.hashes))
+    tamper(store, "UPDATE certificates SET deleted_data = ?, hash = ? WHERE cert_id = ?", cert.deleted_data, forged,
+           CERT_ID)
+
+    _, failures, new_root = audit.verify_store(store.iter_audit(), workers=1)
+    assert failures == []
+    assert new_root != audit.published_root(lsn, path=roots_path)["root"]
+
+
+def test_published_root_is_looked_up_by_lsn(tmp_path):
+    roots_path = str(tmp_path / "audit_roots.jsonl")
+    assert audit.published_root(1, path=roots_path) is None
+
+    audit.publish_root("a" * 64, 3, 1, path=roots_path)
+    audit.publish_root("b" * 64, 4, 2, path=roots_path)
+
+    assert audit.published_root(1, path=roots_path)["root"] == "a" * 64
+    assert audit.published_root(2, path=roots_path)["certificates"] == 4
+    assert audit.published_root(3, path=roots_path) is None
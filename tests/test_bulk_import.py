@@ -0,0 +1,105 @@
+import csv
+import io
+
+import pytest
+
+from bulk_import import SNIFF_BYTES, ImportFormatError, ImportProgress, detect_encoding, import_requests
+from store import CertificateStore
+
+HEADER = "AI 모델명,삭제 요청 데이터셋,요청자\n"
+ROWS = "신용평가 AI 모델,구(舊) 주소 데이터셋 (편향성 원인),김감사\n대출 한도 AI 모델,2019년 상담 녹취록,\n"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CertificateStore(str(tmp_path / "certificates.db"))
+    yield store
+    store.close()
+
+
+def run_import(store, data, fmt="csv"):
+    progress = ImportProgress("TEST", total_bytes=len(data))
+    import_requests(store, io.BytesIO(data), fmt, progress)
+    return progress
+
+
+def imported(store):
+    return sorted((cert.model_name, cert.deleted_data, cert.requester_id) for cert in store.iter_all())
+
+
+# ----------------------------------------------------------------------
+# 인코딩 감지
+# ----------------------------------------------------------------------
+
+@pytest.mark.parametrize("encoding, expected", [("utf-8", "utf-8-sig"), ("utf-8-sig", "utf-8-sig"), ("cp949", "cp949")])
+def test_detect_encoding_keeps_position(encoding, expected):
+    binary = io.BytesIO((HEADER + ROWS).encode(encoding))
+
+    assert detect_encoding(binary) == expected
+    assert binary.tell() == 0
+
+
+def test_detect_encoding_ignores_character_cut_at_sniff_boundary():
+    # UTF-8 한글(3바이트)이 SNIFF_BYTES 경계에서 잘려도 UTF-8 로 봄
+    data = b"a" * (SNIFF_BYTES - 1) + "가".encode("utf-8")
+
+    assert detect_encoding(io.BytesIO(data)) == "utf-8-sig"
+
+
+def test_unknown_encoding_is_format_error():
+    with pytest.raises(ImportFormatError):
+        detect_encoding(io.BytesIO(b"\xff\xff\xff\xff"))
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "utf-8-sig", "cp949"])
+def test_csv_is_imported_in_any_supported_encoding(store, encoding):
+    progress = run_import(store, (HEADER + ROWS).encode(encoding))
+
+    assert (progress.rows, progress.inserted, progress.invalid, progress.error) == (2, 2, 0, None)
+    assert imported(store) == [
+        ("대출 한도 AI 모델", "2019년 상담 녹취록", "김감사 (AI 윤리팀)"),
+        ("신용평가 AI 모델", "구(舊) 주소 데이터셋 (편향성 원인)", "김감사"),
+    ]
+
+
+# ----------------------------------------------------------------------
+# 파일 전체 오류
+# ----------------------------------------------------------------------
+
+def test_other_encoding_after_sniffed_head_is_format_error(store):
+    # 앞부분은 UTF-8 (ASCII) 이고 뒤쪽에 CP949 로 저장된 행이 섞인 파일
+    filler = "".join(f"model,data {i}\n" for i in range(SNIFF_BYTES // 10))
+    data = ("model_name,deleted_data\n" + filler).encode("utf-8") + "신용평가,주소\n".encode("cp949")
+
+    with pytest.raises(ImportFormatError) as excinfo:
+        run_import(store, data)
+    assert "UTF-8" in str(excinfo.value)
+
+
+def test_format_error_is_recorded_on_progress(store):
+    progress = ImportProgress("TEST")
+    with pytest.raises(ImportFormatError):
+        import_requests(store, io.BytesIO("model_name,요청자\n모델,김감사\n".encode("utf-8")), "csv", progress)
+
+    assert "deleted_data" in progress.error
+    assert progress.finished
+    assert imported(store) == []
+
+
+def test_csv_parser_error_is_format_error(store):
+    long_field = "x" * (csv.field_size_limit() + 1)
+    data = f"model_name,deleted_data\n모델,\"{long_field}\"\n".encode("utf-8")
+
+    progress = ImportProgress("TEST")
+    with pytest.raises(ImportFormatError) as excinfo:
+        import_requests(store, io.BytesIO(data), "csv", progress)
+    assert "CSV 형식 오류" in str(excinfo.value)
+    assert progress.error == str(excinfo.value)
+
+
+def test_bad_jsonl_line_is_skipped_not_fatal(store):
+    data = '{"model_name": "모델", "deleted_data": "데이터"}\n{잘못된 줄\n[1, 2]\n'.encode("utf-8")
+
+    progress = run_import(store, data, fmt="jsonl")
+
+    assert (progress.rows, progress.inserted, progress.invalid, progress.error) == (3, 1, 2, None)
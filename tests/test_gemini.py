@@ -0,0 +1,257 @@
+import time
+
+import google.generativeai as genai
+import pytest
+
+import gemini
+from fake_gemini import FakeGeminiServer
+from gemini import GeminiCallError, GeminiCaller
+
+MODEL_ID = "gemini-2.0-flash"
+
+
+@pytest.fixture
+def server():
+    with FakeGeminiServer(latency=0.01, jitter=0.0, seed=1) as server:
+        yield server
+
+
+def fake_model(server):
+    model = genai.GenerativeModel(MODEL_ID)
+    model._client = gemini._service_client("test-key", server.url)
+    return model
+
+
+def generate(model, after=None):
+    """caller.call 에 넘길 한 번 호출 함수. after 는 시도가 끝날 때마다 (성공·실패 무관) 호출"""
+
+    def call_once(timeout):
+        try:
+            return model.generate_content("프롬프트", request_options=gemini.request_options(timeout)).text
+        finally:
+            if after is not None:
+                after()
+
+    return call_once
+
+
+@pytest.fixture
+def backoffs(monkeypatch):
+    """백오프 대기 상한을 기록하고, 지터 없이 상한만큼 기다리도록 함"""
+    bounds = []
+
+    def uniform(low, high):
+        bounds.append(high)
+        return high
+
+    monkeypatch.setattr(gemini.random, "uniform", uniform)
+    return bounds
+
+
+# ----------------------------------------------------------------------
+# 재시도
+# ----------------------------------------------------------------------
+
+@pytest.mark.parametrize("code, kind", [(429, "rate_limited"), (503, "server"), (500, "server")])
+def test_retryable_error_is_retried(server, code, kind):
+    server.error_rate, server.error_codes = 1.0, (code,)
+    caller = GeminiCaller(max_attempts=3, backoff_base=0.01, hedge=False)
+
+    def recover():
+        server.error_rate = 0.0
+
+    assert caller.call(MODEL_ID, generate(fake_model(server), after=recover)) == "모든 신청자는 동일한 기준으로 평가됩니다."
+    assert server.stats["errors"] == 1
+    assert caller.stats["attempts"] == 2
+    assert caller.stats["retries"] == 1
+
+
+def test_retries_back_off_exponentially(server, backoffs):
+    server.error_rate, server.error_codes = 1.0, (503,)
+    caller = GeminiCaller(max_attempts=4, backoff_base=0.05, backoff_cap=1.0, hedge=False)
+
+    started = time.monotonic()
+    with pytest.raises(GeminiCallError) as excinfo:
+        caller.call(MODEL_ID, generate(fake_model(server)))
+
+    assert excinfo.value.kind == "server"
+    assert excinfo.value.attempts == 4
+    assert server.stats["requests"] == 4
+    # 마지막 시도 뒤에는 기다리지 않음
+    assert backoffs == [0.05, 0.1, 0.2, 0.4]
+    assert time.monotonic() - started >= 0.05 + 0.1 + 0.2
+
+
+def test_backoff_is_capped(server, backoffs):
+    server.error_rate, server.error_codes = 1.0, (429,)
+    caller = GeminiCaller(max_attempts=4, backoff_base=0.05, backoff_cap=0.1, hedge=False)
+
+    with pytest.raises(GeminiCallError) as excinfo:
+        caller.call(MODEL_ID, generate(fake_model(server)))
+
+    assert excinfo.value.kind == "rate_limited"
+    assert backoffs == [0.05, 0.1, 0.1, 0.1]
+
+
+@pytest.mark.parametrize("code", [400, 403, 404])
+def test_client_error_is_not_retried(server, code):
+    server.error_rate, server.error_codes = 1.0, (code,)
+    caller = GeminiCaller(max_attempts=4, backoff_base=0.01, hedge=False)
+
+    with pytest.raises(GeminiCallError) as excinfo:
+        caller.call(MODEL_ID, generate(fake_model(server)))
+
+    assert excinfo.value.kind == "client"
+    assert excinfo.value.attempts == 1
+    assert server.stats["requests"] == 1
+    assert caller.stats["retries"] == 0
+    # 응답은 받았으므로 회로 차단기의 실패로 세지 않음
+    assert caller.breaker_states()[MODEL_ID] == "closed"
+
+
+# ----------------------------------------------------------------------
+# 마감 시간
+# ----------------------------------------------------------------------
+
+def test_deadline_raises_timeout(server):
+    server.latency = 2.0
+    caller = GeminiCaller(deadline=0.3, max_attempts=3, backoff_base=0.01, hedge=False)
+
+    started = time.monotonic()
+    with pytest.raises(GeminiCallError) as excinfo:
+        caller.call(MODEL_ID, generate(fake_model(server)))
+
+    assert excinfo.value.kind == "timeout"
+    assert excinfo.value.label == gemini.ERROR_LABELS["timeout"]
+    assert time.monotonic() - started < 1.0
+
+
+def test_inline_call_passes_remaining_deadline_to_sdk(server):
+    server.latency = 2.0
+    caller = GeminiCaller(deadline=0.3, max_attempts=1, hedge=False)
+
+    with pytest.raises(GeminiCallError) as excinfo:
+        caller.call(MODEL_ID, generate(fake_model(server)), inline=True)
+
+    assert excinfo.value.kind == "timeout"
+
+
+# ----------------------------------------------------------------------
+# 회로 차단기
+# ----------------------------------------------------------------------
+
+def test_circuit_breaker_opens_half_opens_and_closes(server):
+    server.error_rate, server.error_codes = 1.0, (503,)
+    caller = GeminiCaller(max_attempts=1, failure_threshold=2, reset_seconds=0.3, hedge=False)
+    call_once = generate(fake_model(server))
+
+    for _ in range(2):
+        with pytest.raises(GeminiCallError) as excinfo:
+            caller.call(MODEL_ID, call_once)
+        assert excinfo.value.kind == "server"
+    assert caller.breaker_states()[MODEL_ID] == "open"
+
+    # 열려 있는 동안에는 서버를 부르지 않고 바로 거절
+    requests = server.stats["requests"]
+    with pytest.raises(GeminiCallError) as excinfo:
+        caller.call(MODEL_ID, call_once)
+    assert excinfo.value.kind == "circuit_open"
+    assert server.stats["requests"] == requests
+    assert caller.stats["rejected"] == 1
+
+    time.sleep(0.35)
+    assert caller.breaker_states()[MODEL_ID] == "half_open"
+
+    server.error_rate = 0.0
+    assert caller.call(MODEL_ID, call_once)
+    assert caller.breaker_states()[MODEL_ID] == "closed"
+
+
+def test_failed_probe_reopens_circuit(server):
+    server.error_rate, server.error_codes = 1.0, (503,)
+    caller = GeminiCaller(max_attempts=1, failure_threshold=1, reset_seconds=0.2, hedge=False)
+    call_once = generate(fake_model(server))
+
+    with pytest.raises(GeminiCallError):
+        caller.call(MODEL_ID, call_once)
+    time.sleep(0.25)
+    assert caller.breaker_states()[MODEL_ID] == "half_open"
+
+    with pytest.raises(GeminiCallError) as excinfo:
+        caller.call(MODEL_ID, call_once)
+    assert excinfo.value.kind == "server"
+    assert caller.breaker_states()[MODEL_ID] == "open"
+
+
+def test_expired_deadline_does_not_hold_probe(server):
+    server.error_rate, server.error_codes = 1.0, (503,)
+    caller = GeminiCaller(max_attempts=1, failure_threshold=1, reset_seconds=0.2, hedge=False)
+    call_once = generate(fake_model(server))
+
+    with pytest.raises(GeminiCallError):
+        caller.call(MODEL_ID, call_once)
+    time.sleep(0.25)
+
+    # 마감이 이미 지난 호출은 시험 호출 자리를 잡지 않아야 함
+    with pytest.raises(GeminiCallError) as excinfo:
+        caller.call(MODEL_ID, call_once, deadline=1e-9)
+    assert excinfo.value.kind == "timeout"
+    assert caller.stats["rejected"] == 0
+
+    server.error_rate = 0.0
+    assert caller.call(MODEL_ID, call_once)
+    assert caller.breaker_states()[MODEL_ID] == "closed"
+
+
+def test_interrupted_probe_is_released(server):
+    caller = GeminiCaller(max_attempts=1, failure_threshold=1, reset_seconds=0.05, hedge=False)
+    caller.breaker(MODEL_ID).record_failure()
+    time.sleep(0.06)
+
+    def interrupted(timeout):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        caller.call(MODEL_ID, interrupted, inline=True)
+    assert caller.call(MODEL_ID, generate(fake_model(server)))
+    assert caller.breaker_states()[MODEL_ID] == "closed"
+
+
+def test_half_open_allows_single_probe():
+    breaker = gemini.CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+# ----------------------------------------------------------------------
+# 헤지 요청
+# ----------------------------------------------------------------------
+
+def test_hedged_request_wins_over_slow_first_request():
+    with FakeGeminiServer(latency=2.0, jitter=0.0) as slow, FakeGeminiServer(latency=0.01, jitter=0.0) as fast:
+        caller = GeminiCaller(deadline=5.0, max_attempts=1, hedge=True)
+        for _ in range(gemini.HEDGE_MIN_SAMPLES):
+            caller._latency_of(MODEL_ID).add(0.01)
+        models = iter((fake_model(slow), fake_model(fast)))
+
+        def call_once(timeout):
+            return generate(next(models))(timeout)
+
+        started = time.monotonic()
+        assert caller.call(MODEL_ID, call_once)
+        elapsed = time.monotonic() - started
+
+    assert caller.stats["hedges"] == 1
+    assert caller.stats["hedge_wins"] == 1
+    assert gemini.HEDGE_MIN_DELAY <= elapsed < 1.0
+    assert slow.stats["requests"] == 1 and fast.stats["requests"] == 1
+
+
+def test_no_hedge_without_enough_samples(server):
+    caller = GeminiCaller(max_attempts=1, hedge=True)
+    assert caller.hedge_delay(MODEL_ID) is None
+    assert caller.call(MODEL_ID, generate(fake_model(server)))
+    assert caller.stats["hedges"] == 0
@@ -0,0 +1,132 @@
+import pytest
+
+from bench import make_synthetic_cert
+from models import Certificate
+from store import TRANSITIONS, CertificateStore, StatusConflict, is_terminal
+
+ACTOR = "박엔진 (MLOps팀)"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CertificateStore(str(tmp_path / "certificates.db"))
+    yield store
+    store.close()
+
+
+def insert(store, i, status):
+    cert = Certificate.from_dict(make_synthetic_cert(i, status))
+    store.insert(cert)
+    return cert.cert_id
+
+
+# ----------------------------------------------------------------------
+# 상태 전이
+# ----------------------------------------------------------------------
+
+def test_transition_updates_status_fields_and_log(store):
+    cert_id = insert(store, 0, "Pending_Forget")
+
+    store.transition(cert_id, "Pending_Forget", "Forgetting_In_Progress", ACTOR, "'잊힘' 수행 시작", operator_id=ACTOR)
+
+    cert = store.get(cert_id)
+    assert cert.current_status == "Forgetting_In_Progress"
+    assert cert.operator_id == ACTOR
+    assert (cert.log[-1].status, cert.log[-1].message) == ("Forgetting_In_Progress", "'잊힘' 수행 시작")
+    assert store.ids_by_status("Forgetting_In_Progress") == [cert_id]
+    assert store.ids_by_status("Pending_Forget") == []
+
+
+def test_transition_without_message_leaves_log(store):
+    cert_id = insert(store, 0, "Pending_Forget")
+    logs = len(store.get(cert_id).log)
+
+    store.transition(cert_id, "Pending_Forget", "Forgetting_In_Progress", ACTOR)
+
+    assert len(store.get(cert_id).log) == logs
+
+
+def test_transition_from_other_status_raises_conflict(store):
+    cert_id = insert(store, 0, "Pending_Forget_Approval")
+
+    with pytest.raises(StatusConflict) as excinfo:
+        store.transition(cert_id, "Pending_Forget", "Forgetting_In_Progress", ACTOR, "m")
+    assert excinfo.value.cert_id == cert_id
+    assert excinfo.value.current == "Pending_Forget_Approval"
+    assert store.get(cert_id).current_status == "Pending_Forget_Approval"
+
+
+def test_transition_accepts_any_of_several_from_statuses(store):
+    cert_id = insert(store, 0, "Substitute_Failed")
+
+    store.transition(cert_id, ("Pending_Substitute", "Substitute_Failed"), "Substituting_In_Progress", ACTOR)
+
+    assert store.get(cert_id).current_status == "Substituting_In_Progress"
+
+
+@pytest.mark.parametrize("current, new", [
+    ("Pending_Forget", "Completed"),
+    ("Pending_Forget", "Pending_Forget"),  # 같은 상태로의 전이도 허용하지 않음
+    ("Completed", "Pending_Forget"),
+])
+def test_transition_outside_table_is_rejected(store, current, new):
+    cert_id = insert(store, 0, current)
+    logs = len(store.get(cert_id).log)
+
+    with pytest.raises(ValueError):
+        store.transition(cert_id, current, new, ACTOR, "m")
+
+    cert = store.get(cert_id)
+    assert cert.current_status == current
+    assert len(cert.log) == logs
+
+
+def test_transition_of_missing_cert_raises_key_error(store):
+    with pytest.raises(KeyError):
+        store.transition("CERT-NONE", "Pending_Forget", "Forgetting_In_Progress", ACTOR)
+
+
+def test_transition_many_skips_certs_in_other_states(store):
+    pending = [insert(store, i, "Pending_Forget_Approval") for i in range(3)]
+    other = insert(store, 3, "Pending_Forget")
+
+    applied = store.transition_many(pending + [other, "CERT-NONE"], "Pending_Forget_Approval", "Pending_Forget",
+                                    "R2BF 부서", "반려", reason="근거 부족")
+
+    assert applied == pending
+    for cert_id in pending:
+        cert = store.get(cert_id)
+        assert cert.current_status == "Pending_Forget"
+        assert (cert.log[-1].message, cert.log[-1].reason) == ("반려", "근거 부족")
+    assert store.get(other).current_status == "Pending_Forget"
+    assert len(store.get(other).log) == 1
+
+
+def test_failed_transition_rolls_back_whole_transaction(store):
+    first = insert(store, 0, "Pending_Forget")
+    second = insert(store, 1, "Completed")
+
+    with pytest.raises(ValueError):
+        with store.transaction():
+            store.transition(first, "Pending_Forget", "Forgetting_In_Progress", ACTOR, "m")
+            store.transition(second, "Completed", "Pending_Forget", ACTOR, "m")
+
+    assert store.get(first).current_status == "Pending_Forget"
+    assert store.ids_by_status("Forgetting_In_Progress") == []
+
+
+def test_amend_keeps_status_and_checks_it(store):
+    cert_id = insert(store, 0, "Pending_Substitute_Review_MLOps")
+
+    store.amend(cert_id, "Pending_Substitute_Review_MLOps", ACTOR, "제안 교체", internal_ai_suggestion="새 제안")
+    cert = store.get(cert_id)
+    assert cert.current_status == "Pending_Substitute_Review_MLOps"
+    assert cert.internal_ai_suggestion == "새 제안"
+
+    with pytest.raises(StatusConflict):
+        store.amend(cert_id, "Pending_Substitute_Approval", ACTOR, "제안 교체", internal_ai_suggestion="다른 제안")
+    assert store.get(cert_id).internal_ai_suggestion == "새 제안"
+
+
+def test_only_completed_is_terminal():
+    assert [status for status in TRANSITIONS if is_terminal(status)] == ["Completed"]
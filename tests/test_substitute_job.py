@@ -0,0 +1,70 @@
+import time
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import gemini
+from bench import make_synthetic_cert
+from fake_gemini import FakeGeminiServer
+from models import Certificate
+from store import DB_PATH, CertificateStore
+
+CERT_ID = "CERT-BENCH-00000000"
+MAIN = __file__.rsplit("tests", 1)[0] + "main.py"
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with FakeGeminiServer(latency=0.01, jitter=0.0, error_rate=1.0, error_codes=(503,), seed=1) as server:
+        monkeypatch.setattr(gemini, "GEMINI_ENDPOINT", server.url)
+        yield server
+
+
+@pytest.fixture
+def store():
+    store = CertificateStore(DB_PATH)
+    store.insert(Certificate.from_dict(make_synthetic_cert(0, "Pending_Substitute")))
+    yield store
+    store.close()
+
+
+def wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def test_substitute_job_moves_cert_to_failure_state(server, store):
+    at = AppTest.from_file(MAIN, default_timeout=60)
+    at.run()
+    assert not at.exception, at.exception
+    at.session_state["stream_ai"] = False
+    at.text_input(key="api_key_input").set_value("test-key").run()
+    next(b for b in at.button if b.label == "API 키 설정").click().run()
+    assert not at.exception, at.exception
+    at.session_state[f"exp_sub_{CERT_ID}"] = True
+    at.run()
+
+    at.button(key=f"run_sub_{CERT_ID}").click().run()
+    assert not at.exception, at.exception
+    assert wait_for(lambda: store.get(CERT_ID).current_status == "Substitute_Failed")
+
+    cert = store.get(CERT_ID)
+    # 오류 문구를 '대체' 제안으로 저장하지 않고, 실패 사유는 처리 로그에만 남김
+    assert cert.internal_ai_suggestion is None
+    assert cert.log[-1].message.startswith("'대체' AI 제안 생성 실패")
+    assert gemini.ERROR_LABELS["server"] in cert.log[-1].message
+    assert server.stats["errors"] >= 1
+
+    # 장애가 풀리면 실패 상태에서 다시 생성할 수 있음
+    server.error_rate = 0.0
+    at.run()
+    at.session_state[f"exp_failed_{CERT_ID}"] = True
+    at.run()
+    at.button(key=f"run_sub_{CERT_ID}").click().run()
+    assert not at.exception, at.exception
+    assert wait_for(lambda: store.get(CERT_ID).current_status == "Pending_Substitute_Review_MLOps")
+    assert store.get(CERT_ID).internal_ai_suggestion
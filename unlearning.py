@@ -0,0 +1,298 @@
+import datetime
+import importlib
+import logging
+import os
+import queue
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from multiprocessing.connection import Client
+
+from jobs import JobAlreadyRunning
+
+# ----------------------------------------------------------------------
+# '잊힘'(Unlearning) 작업 실행기
+# ----------------------------------------------------------------------
+# 실제 '잊힘'은 수 분 이상 걸리는 무거운 작업이므로 UI 프로세스와 분리된 프로세스 풀에서 실행합니다.
+# 프로세스 풀은 UI 프로세스가 띄운 unlearning_worker.py 프로세스가 관리합니다.
+# 작업은 report(진행률, 메시지)로 진행 상황을 알리고, 실행기는 이를 콜백으로 UI 프로세스에 전달합니다.
+# 작업 구현은 R2BF_UNLEARNING_JOB="모듈:클래스" 로 교체할 수 있습니다.
+#
+# 같은 대상 모델에 대한 '잊힘' 요청은 묶음 대기 시간(batch window) 동안 모아 한 번의 작업으로 실행합니다.
+# 모델 하나에 대한 '잊힘'은 삭제 데이터가 여러 건이어도 한 번의 학습 패스로 처리할 수 있기 때문입니다.
+
+DEFAULT_WORKERS = int(os.environ.get("R2BF_UNLEARNING_WORKERS", "2"))
+DEFAULT_JOB = os.environ.get("R2BF_UNLEARNING_JOB", "unlearning:SimulatedUnlearningJob")
+DEFAULT_BATCH_WINDOW = float(os.environ.get("R2BF_FORGET_BATCH_WINDOW", "3"))
+WORKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "unlearning_worker.py")
+AUTHKEY_ENV = "R2BF_UNLEARNING_AUTHKEY"
+
+# on_done 으로 전달되는 작업 결과
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+class UnlearningCancelled(Exception):
+    """작업이 취소되었을 때 (report() 호출 시점에 발생)"""
+
+
+class UnlearningJob:
+    """
+    '잊힘' 작업 인터페이스. 작업 프로세스에서 '모듈:클래스' 로 불러와 인자 없이 만들므로,
+    구현 클래스는 __main__ 이 아닌 불러올 수 있는 모듈에 있어야 합니다.
+    run() 은 같은 대상 모델에 대한 인증서 묶음(certs)을 한 번에 처리하며,
+    진행 중 report(percent, message) 를 호출하고 완료 요약 문자열을 반환합니다.
+    report() 는 취소 요청이 있으면 UnlearningCancelled 를 발생시킵니다.
+    """
+
+    def run(self, certs, report):
+        raise NotImplementedError
+
+
+class SimulatedUnlearningJob(UnlearningJob):
+    """
+    로컬 테스트용 가상 작업. 단계마다 잠시 대기하며 진행률을 보고합니다.
+    묶음 크기와 무관하게 한 번의 패스로 처리하며, fail_rate 확률로 실패해 재시도 흐름을 확인할 수 있습니다.
+    """
+
+    STAGES = (
+        "모델 체크포인트 로드",
+        "삭제 대상 데이터 영향 분석",
+        "그래디언트 역적용 (Unlearn)",
+        "잔존 기억 검증",
+        "체크포인트 저장",
+    )
+
+    def __init__(self, seconds=None, fail_rate=None):
+        self.seconds = float(seconds if seconds is not None else os.environ.get("R2BF_SIMULATED_UNLEARNING_SECONDS", "1.5"))
+        self.fail_rate = float(fail_rate if fail_rate is not None else os.environ.get("R2BF_SIMULATED_UNLEARNING_FAIL_RATE", "0"))
+
+    def run(self, certs, report):
+        for i, stage in enumerate(self.STAGES):
+            report(i * 100 // len(self.STAGES), stage)
+            time.sleep(self.seconds / len(self.STAGES))
+            if random.random() < self.fail_rate / len(self.STAGES):
+                raise RuntimeError(f"'{stage}' 단계에서 오류가 발생했습니다. (시뮬레이션)")
+        report(100, "완료")
+        return f"{certs[0].model_name}: 삭제 데이터 {len(certs)}건 잊힘 완료 (시뮬레이션)"
+
+
+def load_job(spec=DEFAULT_JOB):
+    """'모듈:클래스' 형식의 작업 구현을 불러와 인스턴스를 만듭니다."""
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def run_in_worker(job_spec, batch_id, certs, progress_queue, cancel_flags):
+    """[작업 프로세스] job_spec('모듈:클래스') 작업의 run 실행. 진행 상황은 큐로 전달합니다."""
+    cert_ids = [cert.cert_id for cert in certs]
+
+    def report(percent, message):
+        if cancel_flags.get(batch_id):
+            raise UnlearningCancelled(batch_id)
+        progress_queue.put(("progress", batch_id, cert_ids, percent, message))
+
+    return load_job(job_spec).run(certs, report)
+
+
+class _PendingBatch:
+    """묶음 대기 중인 같은 모델의 인증서들"""
+
+    def __init__(self, batch_id, timer):
+        self.batch_id = batch_id
+        self.certs = []
+        self.timer = timer
+
+
+def new_batch_id():
+    return f"FORGET-{datetime.datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:4].upper()}"
+
+
+class UnlearningExecutor:
+    """
+    '잊힘' 작업을 대상 모델별로 묶어 프로세스 풀에서 실행합니다.
+
+    submit() 된 인증서는 같은 모델의 첫 요청부터 window_seconds 동안 모였다가 한 번의 작업으로 실행되며,
+    결과는 묶음의 모든 인증서에 전달됩니다.
+    on_progress(cert_ids, percent, message, batch_id) 는 진행 보고마다,
+    on_done(cert_ids, outcome, detail, batch_id) 는 작업이 끝나면 (outcome: COMPLETED / CANCELLED / FAILED)
+    UI 프로세스의 스레드에서 호출됩니다.
+    """
+
+    def __init__(self, on_progress, on_done, job_spec=DEFAULT_JOB, max_workers=DEFAULT_WORKERS, window_seconds=DEFAULT_BATCH_WINDOW):
+        # 작업은 인스턴스 대신 '모듈:클래스' 로 넘겨 작업 프로세스에서 불러옴. 잘못된 지정은 여기서 바로 드러나도록 한 번 불러 봄
+        load_job(job_spec)
+        self._job_spec = job_spec
+        # 작업 프로세스가 UI 프로세스와 같은 모듈 경로에서 작업 구현을 찾도록 sys.path 를 넘김
+        authkey = os.urandom(32)
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+        env[AUTHKEY_ENV] = authkey.hex()
+        self._worker = subprocess.Popen([sys.executable, WORKER_PATH, str(max_workers)], stdout=subprocess.PIPE,
+                                        env=env, text=True)
+        port = self._worker.stdout.readline().strip()
+        self._worker.stdout.close()
+        if not port:
+            raise RuntimeError(f"'잊힘' 작업 프로세스를 시작하지 못했습니다. (종료 코드 {self._worker.wait()})")
+        self._conn = Client(("127.0.0.1", int(port)), authkey=authkey)
+        self._events = queue.Queue()  # 작업 프로세스의 보고 + 이 프로세스에서 끝낸 묶음의 완료 통지
+        self._on_progress = on_progress
+        self._on_done = on_done
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._closing = False
+        self._connected = True
+        self._pending = {}  # model_name -> _PendingBatch
+        self._running = {}  # batch_id -> cert_ids
+        self._batch_of = {}  # cert_id -> batch_id (묶음 대기 + 실행 중)
+        self.progress = {}  # cert_id -> (percent, message) 최근 보고
+        self._receiver = threading.Thread(target=self._receive, name="r2bf-unlearning-receive", daemon=True)
+        self._receiver.start()
+        self._listener = threading.Thread(target=self._listen, name="r2bf-unlearning-progress", daemon=True)
+        self._listener.start()
+
+    def _receive(self):
+        """작업 프로세스의 보고를 이벤트 큐로 옮김. 작업 프로세스가 죽으면 실행 중인 묶음을 모두 실패 처리"""
+        while True:
+            try:
+                item = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            if item[0] == "done":
+                self._release(item[1], item[2])
+            self._events.put(item)
+        with self._lock:
+            self._connected = False
+            running = dict(self._running)
+            closing = self._closing
+        for batch_id, cert_ids in running.items():
+            self._release(batch_id, cert_ids)
+            if closing:
+                self._events.put(("done", batch_id, cert_ids, CANCELLED, None))
+            else:
+                self._events.put(("done", batch_id, cert_ids, FAILED, "'잊힘' 작업 프로세스가 종료되었습니다."))
+        if closing:
+            self._events.put(None)
+
+    def _release(self, batch_id, cert_ids):
+        with self._lock:
+            self._running.pop(batch_id, None)
+            for cert_id in cert_ids:
+                self._batch_of.pop(cert_id, None)
+
+    def _listen(self):
+        """진행 보고와 완료 통지를 큐에 들어온 순서대로 처리 (완료 뒤에 진행 로그가 남지 않도록)"""
+        while True:
+            item = self._events.get()
+            if item is None:
+                return
+            kind, batch_id, cert_ids, *payload = item
+            try:
+                if kind == "progress":
+                    for cert_id in cert_ids:
+                        self.progress[cert_id] = tuple(payload)
+                    self._on_progress(cert_ids, *payload, batch_id)
+                else:
+                    for cert_id in cert_ids:
+                        self.progress.pop(cert_id, None)
+                    self._on_done(cert_ids, *payload, batch_id)
+            except Exception:
+                logger.exception("'잊힘' 작업 통지 처리 실패 [%s]", batch_id)
+
+    def submit(self, cert):
+        """인증서를 대상 모델의 묶음에 추가하고 묶음 ID 를 반환합니다."""
+        cert_id = cert.cert_id
+        model_name = cert.model_name
+        with self._lock:
+            if cert_id in self._batch_of:
+                raise JobAlreadyRunning(cert_id)
+            batch = self._pending.get(model_name)
+            if batch is None:
+                timer = threading.Timer(self.window_seconds, self._flush, args=(model_name,))
+                timer.daemon = True
+                batch = self._pending[model_name] = _PendingBatch(new_batch_id(), timer)
+                timer.start()
+            batch.certs.append(cert)
+            self._batch_of[cert_id] = batch.batch_id
+            self.progress[cert_id] = (0, f"묶음 대기 중 ({len(batch.certs)}건)")
+            return batch.batch_id
+
+    def _flush(self, model_name):
+        """묶음 대기 시간이 끝난 모델의 인증서들을 한 번의 작업으로 제출"""
+        with self._lock:
+            batch = self._pending.pop(model_name, None)
+            if batch is None or not batch.certs:
+                return
+            cert_ids = [cert.cert_id for cert in batch.certs]
+            try:
+                if not self._connected:
+                    raise BrokenPipeError("'잊힘' 작업 프로세스가 종료되었습니다.")
+                self._conn.send(("run", batch.batch_id, self._job_spec, batch.certs))
+            except (OSError, ValueError) as e:
+                # 작업 프로세스가 죽었거나 종료 중 -> 묶음을 실패로 알려 '잊힘 중' 에 머물지 않도록 함
+                logger.error("'잊힘' 묶음 작업 제출 실패 [%s]: %s", batch.batch_id, e)
+                for cert_id in cert_ids:
+                    self._batch_of.pop(cert_id, None)
+                self._events.put(("done", batch.batch_id, cert_ids, FAILED, f"작업을 제출하지 못했습니다: {e}"))
+                return
+            self._running[batch.batch_id] = cert_ids
+            for cert_id in cert_ids:
+                self.progress[cert_id] = (0, f"실행 대기 중 ({len(cert_ids)}건 묶음)")
+        logger.info("'잊힘' 묶음 작업 제출 [%s] %s: %d건", batch.batch_id, model_name, len(cert_ids))
+
+    def cancel(self, cert_id):
+        """
+        작업 취소를 요청합니다. 묶음 대기 중이면 그 인증서만 빠지고,
+        이미 실행 중인 묶음이면 묶음 전체가 다음 진행 보고 때 중단됩니다.
+        """
+        with self._lock:
+            batch_id = self._batch_of.get(cert_id)
+            if batch_id is None:
+                return False
+            for model_name, batch in self._pending.items():
+                if batch.batch_id == batch_id:
+                    batch.certs = [cert for cert in batch.certs if cert.cert_id != cert_id]
+                    if not batch.certs:
+                        batch.timer.cancel()
+                        del self._pending[model_name]
+                    del self._batch_of[cert_id]
+                    self._events.put(("done", batch_id, [cert_id], CANCELLED, None))
+                    return True
+            if not self._connected:
+                return False  # 작업 프로세스가 이미 종료됨 (실행 중이던 묶음은 실패로 통지됨)
+            try:
+                self._conn.send(("cancel", batch_id))
+            except (OSError, ValueError):
+                return False
+        return True
+
+    def batch_id_of(self, cert_id):
+        with self._lock:
+            return self._batch_of.get(cert_id)
+
+    def batch_size(self, batch_id):
+        """묶음의 인증서 수"""
+        with self._lock:
+            return sum(1 for member in self._batch_of.values() if member == batch_id)
+
+    def shutdown(self, wait=True):
+        """묶음 대기 중인 요청과 풀에서 대기 중인 작업은 취소하고, 실행 중인 작업이 끝나면 작업 프로세스를 종료"""
+        with self._lock:
+            for batch in self._pending.values():
+                batch.timer.cancel()
+            self._pending.clear()
+            self._closing = True
+            if not self._connected:
+                self._events.put(None)  # 작업 프로세스가 먼저 죽어 통지 스레드만 남은 경우
+            try:
+                self._conn.send(("shutdown",))
+            except (OSError, ValueError):
+                pass
+        if wait:
+            self._worker.wait()
+            self._listener.join()
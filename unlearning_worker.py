@@ -0,0 +1,103 @@
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.connection import Listener
+
+from unlearning import AUTHKEY_ENV, CANCELLED, COMPLETED, FAILED, UnlearningCancelled, run_in_worker
+
+# ----------------------------------------------------------------------
+# '잊힘' 작업 프로세스 (python unlearning_worker.py <작업 프로세스 수>)
+# ----------------------------------------------------------------------
+# Streamlit 은 main.py 를 __main__ 모듈로 실행하므로, UI 프로세스에서 바로 spawn 하면 작업 프로세스가
+# main.py 를 다시 실행합니다. UnlearningExecutor 는 이 모듈을 별도 프로세스로 띄우고,
+# 여기서 만드는 프로세스 풀은 이 모듈을 __main__ 으로 보므로 화면 코드가 실행되지 않습니다.
+#
+# UI 프로세스와는 multiprocessing.connection 으로 주고받습니다.
+#   UI -> 작업: ("run", batch_id, job_spec, certs) / ("cancel", batch_id) / ("shutdown",)
+#   작업 -> UI: ("progress", batch_id, cert_ids, percent, message) / ("done", batch_id, cert_ids, outcome, detail)
+
+
+def outcome_of(future):
+    if future.cancelled() or isinstance(future.exception(), UnlearningCancelled):
+        return CANCELLED, None
+    if future.exception() is not None:
+        return FAILED, str(future.exception())
+    return COMPLETED, future.result()
+
+
+def serve(conn, max_workers):
+    """연결이 끊기거나 shutdown 을 받을 때까지 작업 요청 처리"""
+    context = multiprocessing.get_context("spawn")
+    manager = context.Manager()
+    pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+    # 진행 보고(작업 프로세스)와 완료 통지(이 프로세스)를 한 큐에 넣어 보낸 순서를 지킴
+    events = manager.Queue()
+    cancel_flags = manager.dict()
+    futures = {}  # batch_id -> Future
+
+    def forward():
+        while True:
+            item = events.get()
+            if item is None:
+                return
+            try:
+                conn.send(item)
+            except OSError:
+                return  # UI 프로세스가 먼저 종료됨
+
+    forwarder = threading.Thread(target=forward, name="r2bf-unlearning-forward", daemon=True)
+    forwarder.start()
+
+    def finish(batch_id, cert_ids, future):
+        futures.pop(batch_id, None)
+        cancel_flags.pop(batch_id, None)
+        events.put(("done", batch_id, cert_ids, *outcome_of(future)))
+
+    try:
+        while True:
+            try:
+                command, *args = conn.recv()
+            except (EOFError, OSError):
+                break  # UI 프로세스가 종료됨
+            if command == "run":
+                batch_id, job_spec, certs = args
+                cert_ids = [cert.cert_id for cert in certs]
+                try:
+                    future = pool.submit(run_in_worker, job_spec, batch_id, certs, events, cancel_flags)
+                except Exception as e:
+                    # 작업 프로세스가 죽어 풀이 깨진 경우(BrokenProcessPool) 등
+                    events.put(("done", batch_id, cert_ids, FAILED, str(e) or type(e).__name__))
+                    continue
+                futures[batch_id] = future
+                future.add_done_callback(lambda f, batch_id=batch_id, cert_ids=cert_ids: finish(batch_id, cert_ids, f))
+            elif command == "cancel":
+                cancel_flags[args[0]] = True
+                future = futures.get(args[0])
+                if future is not None:
+                    future.cancel()
+            elif command == "shutdown":
+                break
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        events.put(None)
+        forwarder.join()
+        manager.shutdown()
+        conn.close()
+
+
+def main():
+    max_workers = int(sys.argv[1])
+    authkey = bytes.fromhex(os.environ[AUTHKEY_ENV])
+    with Listener(("127.0.0.1", 0), authkey=authkey) as listener:
+        # 접속 주소를 한 줄로 알리고 UI 프로세스의 연결 하나만 받음
+        print(listener.address[1], flush=True)
+        # 이후 작업이 출력하는 내용은 stderr 로 (UI 프로세스는 stdout 을 더 읽지 않음)
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+        conn = listener.accept()
+    serve(conn, max_workers)
+
+
+if __name__ == "__main__":
+    main()